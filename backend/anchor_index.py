@@ -0,0 +1,135 @@
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional
+
+from utf16_offsets import Utf16Offsets
+
+# Fallback tiers, tried in this order for each anchor
+EXACT = "exact"
+FINGERPRINT = "fingerprint"   # first 20 characters, for anchors the model reworded near the end
+KEYWORDS = "keywords"         # first three long words, for anchors reworded throughout
+
+_FINGERPRINT_CHARS = 20
+_MIN_FINGERPRINT_CHARS = 5
+_KEYWORD_MIN_CHARS = 5
+
+
+class AnchorMatch(NamedTuple):
+    start: int          # code-point offsets into the indexed text (for Python slicing)
+    end: int
+    utf16_start: int    # UTF-16 offsets (what the Flutter client indexes by)
+    utf16_end: int
+    method: str
+
+
+class _AhoCorasick:
+    """Multi-pattern automaton reporting the first occurrence of every pattern in one scan."""
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = patterns
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        for pattern_id, pattern in enumerate(patterns):
+            node = 0
+            for char in pattern:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = next_node
+            self._out[node].append(pattern_id)
+        self._link()
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def first_occurrences(self, text: str) -> Dict[int, int]:
+        found: Dict[int, int] = {}
+        remaining = len(self.patterns)
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self.patterns
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for pattern_id in out[node]:
+                if pattern_id not in found:
+                    found[pattern_id] = position - len(patterns[pattern_id]) + 1
+                    remaining -= 1
+            if not remaining:
+                break
+        return found
+
+
+def anchor_fallbacks(anchor: str) -> List[tuple]:
+    """(method, pattern) candidates for an anchor, in priority order."""
+    candidates = [(EXACT, anchor)]
+    fingerprint = anchor[:_FINGERPRINT_CHARS]
+    if len(fingerprint) >= _MIN_FINGERPRINT_CHARS and fingerprint != anchor:
+        candidates.append((FINGERPRINT, fingerprint))
+    keywords = [w for w in anchor.split() if len(w) >= _KEYWORD_MIN_CHARS]
+    if len(keywords) >= 3:
+        candidates.append((KEYWORDS, " ".join(keywords[:3])))
+    return candidates
+
+
+class AnchorIndex:
+    """
+    Locates grounding anchors (cited segment texts) in an analysis.
+
+    All anchors, with their fingerprint and keyword fallbacks, are compiled
+    into one Aho-Corasick automaton and resolved in a single scan of the text,
+    instead of one str.find() per anchor and tier. Matches carry both
+    code-point offsets and UTF-16 offsets.
+    """
+
+    def __init__(self, text: str, offsets: Optional[Utf16Offsets] = None):
+        self.text = text
+        self._shared_offsets = offsets
+        self._offsets: Optional[Utf16Offsets] = None
+
+    @property
+    def offsets(self) -> Utf16Offsets:
+        # Built (or adopted from the caller) on the first match only
+        if self._offsets is None:
+            self._offsets = Utf16Offsets.for_text(self.text, self._shared_offsets)
+        return self._offsets
+
+    def utf16_offset(self, index: int) -> int:
+        return self.offsets.offset(index)
+
+    def locate_all(self, anchors: List[str]) -> List[Optional[AnchorMatch]]:
+        """Returns one AnchorMatch (or None) per anchor, in input order."""
+        candidates = [anchor_fallbacks(a) if a else [] for a in anchors]
+        pattern_ids: Dict[str, int] = {}
+        for options in candidates:
+            for _, pattern in options:
+                pattern_ids.setdefault(pattern, len(pattern_ids))
+        if not pattern_ids:
+            return [None] * len(anchors)
+
+        found = _AhoCorasick(list(pattern_ids)).first_occurrences(self.text)
+
+        matches: List[Optional[AnchorMatch]] = []
+        for anchor, options in zip(anchors, candidates):
+            match = None
+            for method, pattern in options:
+                start = found.get(pattern_ids[pattern])
+                if start is not None:
+                    end = min(start + len(anchor), len(self.text))
+                    match = AnchorMatch(start, end, self.utf16_offset(start), self.utf16_offset(end), method)
+                    break
+            matches.append(match)
+        return matches
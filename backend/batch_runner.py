@@ -0,0 +1,50 @@
+import asyncio
+import logging
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+BATCH_MAX_PARALLELISM = int(os.getenv("BATCH_MAX_PARALLELISM", "8"))
+BATCH_MAX_CLAIMS = int(os.getenv("BATCH_MAX_CLAIMS", "5000"))
+# Bulk jobs would rather queue for quota than fail fast like interactive requests
+BATCH_QUEUE_DEADLINE_SECONDS = float(os.getenv("BATCH_QUEUE_DEADLINE_SECONDS", "300"))
+
+
+async def run_batch(items: List[Any], worker: Callable[[int, Any], Awaitable[Dict[str, Any]]], parallelism: int = BATCH_MAX_PARALLELISM) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Runs worker(index, item) over items with at most `parallelism` in flight,
+    yielding each outcome as soon as it completes (not in input order).
+
+    A failing item yields {"index", "status": "error", "error"} and the rest of
+    the batch carries on. A worker may set its own "status" to override "ok". If the consumer stops early (client disconnect), the
+    remaining workers are cancelled.
+    """
+    parallelism = max(1, min(parallelism, len(items) or 1))
+    pending: "asyncio.Queue[int]" = asyncio.Queue()
+    for index in range(len(items)):
+        pending.put_nowait(index)
+    results: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+    async def _drain():
+        while True:
+            try:
+                index = pending.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                outcome = await worker(index, items[index])
+                outcome = {"index": index, "status": "ok", **outcome}
+            except Exception as e:
+                logger.error(f"Batch item {index} failed: {e}")
+                outcome = {"index": index, "status": "error", "error": str(e)}
+            await results.put(outcome)
+
+    workers = [asyncio.ensure_future(_drain()) for _ in range(parallelism)]
+    try:
+        for _ in range(len(items)):
+            yield await results.get()
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
@@ -0,0 +1,115 @@
+"""
+Query plans and latency of the hot community queries at scale.
+
+    python benchmarks/community_query_benchmark.py [votes] [claims]
+
+Builds a throwaway file database (default 1,000,000 verdicts over 50,000
+claims and 100,000 users) through the normal migrations, then prints the
+EXPLAIN QUERY PLAN of each hot query and its best-of-5 latency (the
+re-weigh UPDATE runs with a zero delta), after timing the trust score
+repair job over the whole table.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from community_database import CommunityDatabase
+
+# (name, sql, params) - the statements CommunityDatabase runs per request
+HOT_QUERIES = [
+    ("claim by id", "SELECT * FROM claims WHERE claim_id = ?", ("claim-42",)),
+    ("top claims", "SELECT * FROM claims ORDER BY total_votes DESC, created_at DESC LIMIT ?", (5,)),
+    ("trust score", """
+        SELECT trust_numerator, trust_denominator, trust_vote_count
+        FROM claims WHERE claim_id = ?
+    """, ("claim-42",)),
+    ("voter re-weigh", """
+        UPDATE claims SET
+            trust_numerator = trust_numerator + ? * (
+                SELECT v.vote FROM community_verdicts v
+                WHERE v.claim_id = claims.claim_id AND v.user_id = ?
+            ),
+            trust_denominator = trust_denominator + ?
+        WHERE claim_id IN (
+            SELECT claim_id FROM community_verdicts WHERE user_id = ? AND claim_id != ?
+        )
+    """, (0.0, "user-7", 0.0, "user-7", "claim-42")),
+    ("user votes", """
+        SELECT v.vote, c.ai_verdict
+        FROM community_verdicts v
+        JOIN claims c ON v.claim_id = c.claim_id
+        WHERE v.user_id = ?
+    """, ("user-7",)),
+    ("user vote count", "SELECT COUNT(*) as total_votes FROM community_verdicts WHERE user_id = ?", ("user-7",)),
+    ("discussion", """
+        SELECT user_id, user_verdict, notes, timestamp
+        FROM community_verdicts
+        WHERE claim_id = ?
+        ORDER BY timestamp DESC
+    """, ("claim-42",)),
+    ("reputation", "SELECT * FROM user_reputation WHERE user_id = ?", ("user-7",)),
+]
+
+
+def populate(db: CommunityDatabase, n_votes: int, n_claims: int, n_users: int, seed: int = 1) -> None:
+    rng = random.Random(seed)
+    now = datetime.now()
+    votes_per_claim = [0] * n_claims
+    seen = set()
+    verdicts = []
+    while len(verdicts) < n_votes:
+        claim, user = rng.randrange(n_claims), rng.randrange(n_users)
+        if (claim, user) in seen:
+            continue
+        seen.add((claim, user))
+        votes_per_claim[claim] += 1
+        vote = rng.random() < 0.5
+        verdicts.append((f"claim-{claim}", f"user-{user}", "LEGIT" if vote else "FAKE", None, vote, now - timedelta(seconds=len(verdicts))))
+    with db.pool.writer() as conn:
+        conn.executemany(
+            "INSERT INTO claims (claim_id, claim_text, ai_verdict, created_at, total_votes) VALUES (?, ?, ?, ?, ?)",
+            ((f"claim-{i}", f"Claim number {i}", rng.choice(["REAL", "FAKE"]), now - timedelta(minutes=i), votes_per_claim[i]) for i in range(n_claims)),
+        )
+        conn.executemany(
+            "INSERT INTO community_verdicts (claim_id, user_id, user_verdict, notes, vote, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+            verdicts,
+        )
+        conn.executemany(
+            "INSERT INTO user_reputation (user_id, total_votes, accurate_votes, reputation_score) VALUES (?, 0, 0, ?)",
+            ((f"user-{i}", rng.random()) for i in range(n_users)),
+        )
+
+
+def main():
+    n_votes = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n_claims = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    with tempfile.TemporaryDirectory() as tmp:
+        db = CommunityDatabase(os.path.join(tmp, "community.db"))
+        start = time.perf_counter()
+        populate(db, n_votes, n_claims, n_users=max(1, n_votes // 10))
+        print(f"Populated {n_votes} verdicts / {n_claims} claims in {time.perf_counter() - start:.1f}s")
+        start = time.perf_counter()
+        db.rebuild_trust_scores()
+        print(f"Rebuilt trust scores in {time.perf_counter() - start:.1f}s\n")
+        # The writer connection, since one of the statements is an UPDATE
+        with db.pool.writer() as conn:
+            for name, sql, params in HOT_QUERIES:
+                plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+                best = float("inf")
+                for _ in range(5):
+                    start = time.perf_counter()
+                    conn.execute(sql, params).fetchall()
+                    best = min(best, time.perf_counter() - start)
+                print(f"{name:<16} {best * 1000:>8.3f} ms")
+                for step in plan:
+                    print(f"    {step}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Loop vs vectorized reliability engine.
+
+    python benchmarks/reliability_benchmark.py [repeats]
+
+Both engines score the same synthetic grounding sets (20 chunks, 1-4 chunk
+indices per support) at 10, 100 and 1000 supports; stdout of the engines
+is discarded so terminal speed does not skew the numbers.
+"""
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import logic
+
+SIZES = [10, 100, 1000]
+DOMAINS = ["nasa.gov", "reuters.com", "apnews.com", "x.com", "example.com", "who.int", "bbc.co.uk"]
+
+
+def build_case(n_supports: int, n_chunks: int = 20, seed: int = 1):
+    rng = random.Random(seed)
+    chunks = [
+        SimpleNamespace(web=SimpleNamespace(uri=f"https://{rng.choice(DOMAINS)}/{i}", title=rng.choice(DOMAINS), domain=None))
+        for i in range(n_chunks)
+    ]
+    supports = []
+    for i in range(n_supports):
+        indices = rng.sample(range(n_chunks), rng.randint(1, 4))
+        supports.append({
+            "segment": {"text": f"Segment {i} of the analysis."},
+            "groundingChunkIndices": indices,
+            "confidenceScores": [round(rng.random(), 3) for _ in indices],
+        })
+    citations = [{"url": f"https://{DOMAINS[i % len(DOMAINS)]}/{i}", "snippet": f"Snippet {i}"} for i in range(n_chunks)]
+    return supports, chunks, citations
+
+
+def time_engine(vectorized: bool, case, repeats: int) -> float:
+    supports, chunks, citations = case
+    best = float("inf")
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeats):
+            start = time.perf_counter()
+            logic.calculate_reliability(supports, chunks, citations, False, vectorized=vectorized)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    if not logic._NUMPY_AVAILABLE:
+        print("NumPy is not installed; only the loop engine can run.")
+    print(f"{'supports':>8} | {'loop ms':>9} | {'vectorized ms':>13} | {'speedup':>7}")
+    for size in SIZES:
+        case = build_case(size)
+        loop = time_engine(False, case, repeats)
+        if logic._NUMPY_AVAILABLE:
+            vectorized = time_engine(True, case, repeats)
+            print(f"{size:>8} | {loop * 1000:>9.2f} | {vectorized * 1000:>13.2f} | {loop / vectorized:>6.1f}x")
+        else:
+            print(f"{size:>8} | {loop * 1000:>9.2f} | {'-':>13} | {'-':>7}")
+
+
+if __name__ == "__main__":
+    main()
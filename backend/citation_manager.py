@@ -1,7 +1,9 @@
 import logging
 import re
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 from models import Source
+from anchor_index import AnchorIndex
+from utf16_offsets import Utf16Offsets
 
 logger = logging.getLogger(__name__)
 
@@ -11,7 +13,7 @@ class CitationManager:
     and constructs the list of Source objects from grounding metadata.
     """
 
-    def process_grounding(self, target_text: str, grounding_metadata: Any, raw_response_text: str = None) -> Tuple[str, List[Source]]:
+    def process_grounding(self, target_text: str, grounding_metadata: Any, raw_response_text: str = None, offsets: Optional[Utf16Offsets] = None) -> Tuple[str, List[Source]]:
         """
         Processes the grounding metadata to inject citations into the target_text.
         
@@ -19,6 +21,7 @@ class CitationManager:
             target_text: The text where citations should be injected (e.g. from JSON).
             grounding_metadata: The metadata object from Vertex AI.
             raw_response_text: The full raw text response from Vertex AI (used to extract segment text).
+            offsets: UTF-16 offset table already built for target_text, shared with the anchor index.
             
         Returns:
             Tuple[str, List[Source]]: The modified text with [x] tags and the list of sources.
@@ -40,6 +43,7 @@ class CitationManager:
         
         # Flatten supports to a list of injection points
         segments_to_inject = []
+        anchored = []
         
         for support in supports:
             segment = support.segment
@@ -64,46 +68,22 @@ class CitationManager:
             clean_segment = segment_text.strip()
             if not clean_segment:
                 continue
+            anchored.append((support, clean_segment))
 
-            # Find this text in the target_text
-            # Note: This is a simple find. For production, consider fuzzy matching or normalizing whitespace.
-            start_in_target = target_text.find(clean_segment)
-            
-            if start_in_target == -1:
-                # Fallback: Keyword/Fuzzy Match
-                # If exact sentence isn't found, try to find a sentence that shares significant keywords.
-                # This handles cases where Gemini slightly rephrased the summary in JSON.
-                
-                # 1. Split segment into keywords (long words > 4 chars)
-                keywords = [w for w in clean_segment.split() if len(w) > 4]
-                if not keywords:
-                     keywords = clean_segment.split() # Fallback to all words if short
-                
-                best_match_idx = -1
-                max_score = 0
-                
-                # Simple sliding window or sentence split could work. 
-                # Let's search for the first occurrence of the most significant chunk of keywords?
-                # A safer heuristic: Find the first 3 consecutive keywords?
-                
-                if len(keywords) >= 3:
-                    trigram = " ".join(keywords[:3])
-                    start_in_target = target_text.find(trigram)
-                
-                if start_in_target == -1:
-                     logger.warning(f"CITATION: Segment text not found in target (even with fallback). Segment: '{clean_segment[:30]}...'")
-                     continue
-            
-            end_in_target = start_in_target + len(clean_segment)
-            
-            # Clamp end index if fuzzy match went weird (though find returns exact start)
-            if end_in_target > len(target_text): 
-                end_in_target = len(target_text)
+        # Find every segment in the target_text in one pass. When the exact sentence is
+        # missing (Gemini slightly rephrased the summary in JSON), the shared index falls
+        # back to a 20-character fingerprint and then to the first three long keywords.
+        matches = AnchorIndex(target_text, offsets).locate_all([clean_segment for _, clean_segment in anchored])
+        for (support, clean_segment), match in zip(anchored, matches):
+            if match is None:
+                logger.warning(f"CITATION: Segment text not found in target (even with fallback). Segment: '{clean_segment[:30]}...'")
+                continue
             
             segments_to_inject.append({
-                'start': start_in_target,
-                'end': end_in_target,
-                'chunk_indices': support.grounding_chunk_indices
+                'start': match.start,
+                'end': match.end,
+                'chunk_indices': support.grounding_chunk_indices,
+                'clean_segment': clean_segment
             })
             
         # Sort by end index descending to safely inject into string
@@ -131,7 +111,7 @@ class CitationManager:
                     # Store the referenced text segment
                     cited_segment_text = target_text[segment['start']:segment['end']]
                     if len(cited_segment_text) < 5: # If fuzzy match failed to get text, use original
-                         cited_segment_text = clean_segment
+                         cited_segment_text = segment['clean_segment']
 
                     if chunks and chunk_idx < len(chunks):
                         chunk = chunks[chunk_idx]
@@ -1,11 +1,15 @@
+import asyncio
 import sqlite3
 import hashlib
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from typing import Any, Callable, List, Dict, Optional, Tuple
 import math
 
+from sqlite_pool import SQLitePool, SQLITE_POOL_READERS
+
 logger = logging.getLogger(__name__)
 
 # On Cloud Run, the filesystem is read-only except for /tmp
@@ -13,40 +17,38 @@ logger = logging.getLogger(__name__)
 _IS_CLOUD_RUN = os.environ.get('K_SERVICE') is not None  # Cloud Run sets this env var
 _DEFAULT_DB_PATH = '/tmp/community.db' if _IS_CLOUD_RUN else 'community.db'
 
-class CommunityDatabase:
-    def __init__(self, db_path: str = _DEFAULT_DB_PATH):
-        self.db_path = db_path
-        self._connection = None
-        # For in-memory databases, we need to keep connection alive
-        self._is_memory = (db_path == ':memory:')
-        self.init_database()
-    
-    def get_connection(self):
-        """Get a database connection."""
-        if self._is_memory:
-            # For in-memory databases, reuse the same connection
-            if self._connection is None:
-                self._connection = sqlite3.connect(self.db_path)
-                self._connection.row_factory = sqlite3.Row
-            return self._connection
-        else:
-            # For file-based databases, create new connections
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            return conn
-    
-    def _close_connection(self, conn):
-        """Close connection if not using in-memory database."""
-        if not self._is_memory:
-            conn.close()
-    
-    def init_database(self):
-        """Initialize database tables."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
+# Threads serving AsyncCommunityDatabase: enough for every pooled reader plus the writer
+COMMUNITY_DB_WORKERS = int(os.getenv("COMMUNITY_DB_WORKERS", str(SQLITE_POOL_READERS + 1)))
+
+# Voters without a reputation row, or below the floor, weigh MIN_TRUST_WEIGHT
+MIN_TRUST_WEIGHT = 0.1
+
+# Recomputes the materialized T_s terms of claims from community_verdicts (see rebuild_trust_scores)
+_REBUILD_TRUST_SCORES_SQL = f"""
+    UPDATE claims SET
+        trust_numerator = COALESCE((
+            SELECT SUM(CASE WHEN v.vote THEN MAX(COALESCE(ur.reputation_score, {MIN_TRUST_WEIGHT}), {MIN_TRUST_WEIGHT}) ELSE 0 END)
+            FROM community_verdicts v
+            LEFT JOIN user_reputation ur ON v.user_id = ur.user_id
+            WHERE v.claim_id = claims.claim_id
+        ), 0),
+        trust_denominator = COALESCE((
+            SELECT SUM(MAX(COALESCE(ur.reputation_score, {MIN_TRUST_WEIGHT}), {MIN_TRUST_WEIGHT}))
+            FROM community_verdicts v
+            LEFT JOIN user_reputation ur ON v.user_id = ur.user_id
+            WHERE v.claim_id = claims.claim_id
+        ), 0),
+        trust_vote_count = (
+            SELECT COUNT(*) FROM community_verdicts v WHERE v.claim_id = claims.claim_id
+        )
+"""
+
+# Ordered (version, statements). Applied once each at startup and tracked in
+# PRAGMA user_version; append new versions, never edit applied ones.
+SCHEMA_MIGRATIONS: List[Tuple[int, List[str]]] = [
+    (1, [
         # Claims table
-        cursor.execute("""
+        """
             CREATE TABLE IF NOT EXISTS claims (
                 claim_id TEXT PRIMARY KEY,
                 claim_text TEXT NOT NULL,
@@ -54,10 +56,9 @@ class CommunityDatabase:
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 total_votes INTEGER DEFAULT 0
             )
-        """)
-        
+        """,
         # Votes table (legacy)
-        cursor.execute("""
+        """
             CREATE TABLE IF NOT EXISTS votes (
                 vote_id INTEGER PRIMARY KEY AUTOINCREMENT,
                 claim_id TEXT NOT NULL,
@@ -67,10 +68,9 @@ class CommunityDatabase:
                 FOREIGN KEY (claim_id) REFERENCES claims(claim_id),
                 UNIQUE(claim_id, user_id)
             )
-        """)
-
+        """,
         # Community verdicts table (active)
-        cursor.execute("""
+        """
             CREATE TABLE IF NOT EXISTS community_verdicts (
                 verdict_id INTEGER PRIMARY KEY AUTOINCREMENT,
                 claim_id TEXT NOT NULL,
@@ -82,10 +82,9 @@ class CommunityDatabase:
                 FOREIGN KEY (claim_id) REFERENCES claims(claim_id),
                 UNIQUE(claim_id, user_id)
             )
-        """)
-        
+        """,
         # User reputation table
-        cursor.execute("""
+        """
             CREATE TABLE IF NOT EXISTS user_reputation (
                 user_id TEXT PRIMARY KEY,
                 total_votes INTEGER DEFAULT 0,
@@ -93,11 +92,77 @@ class CommunityDatabase:
                 reputation_score REAL DEFAULT 0.0,
                 last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
-        """)
-        
-        conn.commit()
-        if not self._is_memory:
-            self._close_connection(conn)
+        """,
+    ]),
+    (2, [
+        # Reputation: verdicts of one user, joined to claims by claim_id (covering)
+        "CREATE INDEX IF NOT EXISTS idx_verdicts_user ON community_verdicts(user_id, claim_id, vote)",
+        # Trust score: verdicts of one claim with the vote and voter (covering)
+        "CREATE INDEX IF NOT EXISTS idx_verdicts_claim_vote ON community_verdicts(claim_id, vote, user_id)",
+        # Discussion view: verdicts of one claim, newest first, without a sort step
+        "CREATE INDEX IF NOT EXISTS idx_verdicts_claim_time ON community_verdicts(claim_id, timestamp DESC)",
+        # Top claims: read in order instead of sorting the whole table
+        "CREATE INDEX IF NOT EXISTS idx_claims_top ON claims(total_votes DESC, created_at DESC)",
+    ]),
+    (3, [
+        # Materialized weighted trust score: T_s = trust_numerator / trust_denominator
+        "ALTER TABLE claims ADD COLUMN trust_numerator REAL NOT NULL DEFAULT 0",
+        "ALTER TABLE claims ADD COLUMN trust_denominator REAL NOT NULL DEFAULT 0",
+        "ALTER TABLE claims ADD COLUMN trust_vote_count INTEGER NOT NULL DEFAULT 0",
+        _REBUILD_TRUST_SCORES_SQL,
+    ]),
+]
+SCHEMA_VERSION = SCHEMA_MIGRATIONS[-1][0]
+
+
+def migrate_schema(conn) -> List[int]:
+    """
+    Applies the migrations newer than the database's user_version, in order.
+    Run inside the caller's write transaction, so a failed step leaves the
+    schema and user_version as they were. Returns the versions applied.
+    """
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    applied = []
+    for version, statements in SCHEMA_MIGRATIONS:
+        if version <= current:
+            continue
+        for statement in statements:
+            conn.execute(statement)
+        conn.execute(f"PRAGMA user_version = {int(version)}")
+        applied.append(version)
+    return applied
+
+
+def _trust_weight(reputation: Optional[float]) -> float:
+    """R_u as used in T_s: the stored reputation, floored at MIN_TRUST_WEIGHT."""
+    return max(reputation or 0.0, MIN_TRUST_WEIGHT)
+
+
+def _trust_score(row) -> Tuple[float, int]:
+    """(trust_percentage, vote_count) from a claims row's materialized columns."""
+    denominator = row['trust_denominator']
+    if not denominator:
+        return 0.0, row['trust_vote_count']
+    return (row['trust_numerator'] / denominator) * 100, row['trust_vote_count']
+
+
+class CommunityDatabase:
+    def __init__(self, db_path: str = _DEFAULT_DB_PATH):
+        self.db_path = db_path
+        # Long-lived WAL connections: one writer, pooled readers (a single shared one for :memory:)
+        self.pool = SQLitePool(db_path)
+        self.init_database()
+    
+    def close(self):
+        """Close all pooled connections."""
+        self.pool.close()
+    
+    def init_database(self):
+        """Initialize database tables (applies any pending schema migrations)."""
+        with self.pool.writer() as conn:
+            applied = migrate_schema(conn)
+        if applied:
+            logger.info(f"Community database migrated to schema version {applied[-1]}")
         logger.info("Community database initialized successfully")
     
     def generate_claim_id(self, claim_text: str) -> str:
@@ -108,34 +173,24 @@ class CommunityDatabase:
         """Post a new claim to the community."""
         claim_id = self.generate_claim_id(claim_text)
         
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute("""
-                INSERT INTO claims (claim_id, claim_text, ai_verdict, created_at)
-                VALUES (?, ?, ?, ?)
-            """, (claim_id, claim_text, ai_verdict, datetime.now()))
-            conn.commit()
+            with self.pool.writer() as conn:
+                conn.execute("""
+                    INSERT INTO claims (claim_id, claim_text, ai_verdict, created_at)
+                    VALUES (?, ?, ?, ?)
+                """, (claim_id, claim_text, ai_verdict, datetime.now()))
             logger.info(f"Claim posted: {claim_id}")
         except sqlite3.IntegrityError:
             logger.info(f"Claim already exists: {claim_id}")
-        finally:
-            self._close_connection(conn)
         
         return claim_id
     
     def get_claim(self, claim_id: str) -> Optional[Dict]:
         """Get claim details."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM claims WHERE claim_id = ?
-        """, (claim_id,))
-        
-        row = cursor.fetchone()
-        self._close_connection(conn)
+        with self.pool.reader() as conn:
+            row = conn.execute("""
+                SELECT * FROM claims WHERE claim_id = ?
+            """, (claim_id,)).fetchone()
         
         if row:
             return dict(row)
@@ -155,35 +210,67 @@ class CommunityDatabase:
         notes: Optional[str] = None,
     ) -> bool:
         """Submit a vote for a claim."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
+        normalized_verdict = (user_verdict or ('LEGIT' if vote else 'FAKE')).strip().upper()
+
         try:
-            cursor.execute("""
-                SELECT claim_id FROM claims WHERE claim_id = ?
-            """, (claim_id,))
-
-            if cursor.fetchone() is None:
-                logger.warning(f"Claim not found for vote submission: {claim_id}")
-                return False
-
-            normalized_verdict = (user_verdict or ('LEGIT' if vote else 'FAKE')).strip().upper()
-
-            # Insert verdict
-            cursor.execute("""
-                INSERT INTO community_verdicts
-                (claim_id, user_id, user_verdict, notes, vote, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (claim_id, user_id, normalized_verdict, notes, vote, datetime.now()))
-            
-            # Update claim vote count
-            cursor.execute("""
-                UPDATE claims
-                SET total_votes = total_votes + 1
-                WHERE claim_id = ?
-            """, (claim_id,))
-            
-            conn.commit()
+            # Vote, vote count and reputation land in one write transaction
+            with self.pool.writer() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT claim_id FROM claims WHERE claim_id = ?
+                """, (claim_id,))
+
+                if cursor.fetchone() is None:
+                    logger.warning(f"Claim not found for vote submission: {claim_id}")
+                    return False
+
+                cursor.execute("""
+                    SELECT reputation_score FROM user_reputation WHERE user_id = ?
+                """, (user_id,))
+                row = cursor.fetchone()
+                old_weight = _trust_weight(row['reputation_score'] if row else None)
+
+                # Insert verdict
+                cursor.execute("""
+                    INSERT INTO community_verdicts
+                    (claim_id, user_id, user_verdict, notes, vote, timestamp)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (claim_id, user_id, normalized_verdict, notes, vote, datetime.now()))
+                
+                # Update claim vote count
+                cursor.execute("""
+                    UPDATE claims
+                    SET total_votes = total_votes + 1
+                    WHERE claim_id = ?
+                """, (claim_id,))
+                
+                # Update user reputation
+                new_weight = _trust_weight(self._update_user_reputation(cursor, user_id))
+
+                # Keep T_s materialized: re-weigh the voter's earlier verdicts...
+                delta = new_weight - old_weight
+                if delta:
+                    cursor.execute("""
+                        UPDATE claims SET
+                            trust_numerator = trust_numerator + ? * (
+                                SELECT v.vote FROM community_verdicts v
+                                WHERE v.claim_id = claims.claim_id AND v.user_id = ?
+                            ),
+                            trust_denominator = trust_denominator + ?
+                        WHERE claim_id IN (
+                            SELECT claim_id FROM community_verdicts WHERE user_id = ? AND claim_id != ?
+                        )
+                    """, (delta, user_id, delta, user_id, claim_id))
+
+                # ...and add this verdict to its claim
+                cursor.execute("""
+                    UPDATE claims SET
+                        trust_numerator = trust_numerator + ?,
+                        trust_denominator = trust_denominator + ?,
+                        trust_vote_count = trust_vote_count + 1
+                    WHERE claim_id = ?
+                """, (new_weight if vote else 0.0, new_weight, claim_id))
+
             logger.info(
                 "Vote submitted: claim=%s, user=%s, vote=%s, verdict=%s",
                 claim_id,
@@ -191,25 +278,20 @@ class CommunityDatabase:
                 vote,
                 normalized_verdict,
             )
-            
-            # Update user reputation
-            self._update_user_reputation(user_id)
-            
             return True
         except sqlite3.IntegrityError:
             logger.warning(f"User {user_id} already voted on claim {claim_id}")
             return False
-        finally:
-            self._close_connection(conn)
     
     def calculate_user_reputation(self, user_id: str) -> float:
         """
         Calculate user reputation score.
         Formula: R_u = (accurate_votes / total_votes) × log(total_votes + 1)
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
+        with self.pool.reader() as conn:
+            return self._calculate_user_reputation(conn.cursor(), user_id)
+    
+    def _calculate_user_reputation(self, cursor, user_id: str) -> float:
         # Get user's votes
         cursor.execute("""
             SELECT v.vote, c.ai_verdict
@@ -219,7 +301,6 @@ class CommunityDatabase:
         """, (user_id,))
         
         votes = cursor.fetchall()
-        self._close_connection(conn)
         
         if not votes:
             return 0.0
@@ -244,12 +325,9 @@ class CommunityDatabase:
         
         return reputation
     
-    def _update_user_reputation(self, user_id: str):
-        """Update user reputation in database."""
-        reputation = self.calculate_user_reputation(user_id)
-        
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def _update_user_reputation(self, cursor, user_id: str) -> float:
+        """Update user reputation in database (inside the caller's write transaction). Returns the new score."""
+        reputation = self._calculate_user_reputation(cursor, user_id)
         
         # Get vote counts
         cursor.execute("""
@@ -275,108 +353,69 @@ class CommunityDatabase:
                 reputation_score = excluded.reputation_score,
                 last_updated = excluded.last_updated
         """, (user_id, total_votes, accurate_votes, reputation, datetime.now()))
-        
-        conn.commit()
-        self._close_connection(conn)
+        return reputation
     
     def calculate_weighted_trust_score(self, claim_id: str) -> Tuple[float, int]:
         """
         Calculate weighted trust score for a claim.
         Formula: T_s = Σ(V_i × R_{u,i}) / Σ(R_{u,i})
+        Both sums are materialized on the claims row by submit_vote.
         Returns: (trust_percentage, vote_count)
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Get all votes with user reputations
-        cursor.execute("""
-            SELECT v.vote, COALESCE(ur.reputation_score, 0.1) as reputation
-            FROM community_verdicts v
-            LEFT JOIN user_reputation ur ON v.user_id = ur.user_id
-            WHERE v.claim_id = ?
-        """, (claim_id,))
+        with self.pool.reader() as conn:
+            row = conn.execute("""
+                SELECT trust_numerator, trust_denominator, trust_vote_count
+                FROM claims WHERE claim_id = ?
+            """, (claim_id,)).fetchone()
         
-        votes = cursor.fetchall()
-        self._close_connection(conn)
-        
-        if not votes:
+        if not row:
             return 0.0, 0
-        
-        numerator = 0.0
-        denominator = 0.0
-        
-        for vote in votes:
-            vote_value = 1.0 if vote['vote'] else 0.0
-            reputation = max(vote['reputation'], 0.1)  # Minimum reputation of 0.1
-            
-            numerator += vote_value * reputation
-            denominator += reputation
-        
-        if denominator == 0:
-            return 0.0, len(votes)
-        
-        trust_score = (numerator / denominator) * 100  # Convert to percentage
-        return trust_score, len(votes)
+        return _trust_score(row)
+    
+    def rebuild_trust_scores(self) -> int:
+        """
+        Repair job: recomputes every claim's materialized trust score from
+        community_verdicts and current reputations (drops accumulated float
+        drift or rows touched outside submit_vote). Returns the claims updated.
+        """
+        with self.pool.writer() as conn:
+            updated = conn.execute(_REBUILD_TRUST_SCORES_SQL).rowcount
+        logger.info(f"Rebuilt trust scores of {updated} claims")
+        return updated
     
     def get_top_claims(self, limit: int = 5) -> List[Dict]:
         """Get top voted claims."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM claims
-            ORDER BY total_votes DESC, created_at DESC
-            LIMIT ?
-        """, (limit,))
-        
-        rows = cursor.fetchall()
-        self._close_connection(conn)
-        
-        claims = []
-        for row in rows:
-            claim_dict = dict(row)
-            trust_score, vote_count = self.calculate_weighted_trust_score(row['claim_id'])
-            claim_dict['trust_score'] = trust_score
-            claim_dict['vote_count'] = vote_count
-            claims.append(claim_dict)
-        
-        return claims
+        with self.pool.reader() as conn:
+            rows = conn.execute("""
+                SELECT * FROM claims
+                ORDER BY total_votes DESC, created_at DESC
+                LIMIT ?
+            """, (limit,)).fetchall()
+        
+        return [self._with_trust_score(row) for row in rows]
     
     def search_claims(self, query: str) -> List[Dict]:
         """Search claims by text."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM claims
-            WHERE claim_text LIKE ?
-            ORDER BY total_votes DESC, created_at DESC
-        """, (f"%{query}%",))
-        
-        rows = cursor.fetchall()
-        self._close_connection(conn)
-        
-        claims = []
-        for row in rows:
-            claim_dict = dict(row)
-            trust_score, vote_count = self.calculate_weighted_trust_score(row['claim_id'])
-            claim_dict['trust_score'] = trust_score
-            claim_dict['vote_count'] = vote_count
-            claims.append(claim_dict)
-        
-        return claims
+        with self.pool.reader() as conn:
+            rows = conn.execute("""
+                SELECT * FROM claims
+                WHERE claim_text LIKE ?
+                ORDER BY total_votes DESC, created_at DESC
+            """, (f"%{query}%",)).fetchall()
+        
+        return [self._with_trust_score(row) for row in rows]
+    
+    def _with_trust_score(self, row) -> Dict:
+        claim_dict = dict(row)
+        claim_dict['trust_score'], claim_dict['vote_count'] = _trust_score(row)
+        return claim_dict
     
     def get_user_reputation(self, user_id: str) -> Dict:
         """Get user reputation statistics."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM user_reputation WHERE user_id = ?
-        """, (user_id,))
-        
-        row = cursor.fetchone()
-        self._close_connection(conn)
+        with self.pool.reader() as conn:
+            row = conn.execute("""
+                SELECT * FROM user_reputation WHERE user_id = ?
+            """, (user_id,)).fetchone()
         
         if row:
             return dict(row)
@@ -392,36 +431,28 @@ class CommunityDatabase:
     
     def get_claim_discussion(self, claim_id: str) -> Dict:
         """Get claim details with all votes/notes for discussion view."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Get claim details
-        cursor.execute("""
-            SELECT * FROM claims WHERE claim_id = ?
-        """, (claim_id,))
-        
-        claim_row = cursor.fetchone()
-        if not claim_row:
-            self._close_connection(conn)
-            return None
+        with self.pool.reader() as conn:
+            # Get claim details
+            claim_row = conn.execute("""
+                SELECT * FROM claims WHERE claim_id = ?
+            """, (claim_id,)).fetchone()
+            
+            if not claim_row:
+                return None
+            
+            # Get all votes with notes
+            votes_rows = conn.execute("""
+                SELECT user_id, user_verdict, notes, timestamp
+                FROM community_verdicts
+                WHERE claim_id = ?
+                ORDER BY timestamp DESC
+            """, (claim_id,)).fetchall()
         
         claim_data = dict(claim_row)
         
-        # Get all votes with notes
-        cursor.execute("""
-            SELECT user_id, user_verdict, notes, timestamp
-            FROM community_verdicts
-            WHERE claim_id = ?
-            ORDER BY timestamp DESC
-        """, (claim_id,))
-        
-        votes_rows = cursor.fetchall()
-        self._close_connection(conn)
-        
         votes = [dict(row) for row in votes_rows]
         
-        # Calculate trust score
-        trust_score, vote_count = self.calculate_weighted_trust_score(claim_id)
+        trust_score, vote_count = _trust_score(claim_row)
         
         return {
             'claim_id': claim_data['claim_id'],
@@ -432,3 +463,63 @@ class CommunityDatabase:
             'created_at': claim_data['created_at'],
             'votes': votes
         }
+
+
+class AsyncCommunityDatabase:
+    """
+    Awaitable facade over CommunityDatabase for the async community routes.
+
+    Every call runs on a dedicated thread pool, so SQLite queries, commits and
+    fsyncs never block the event loop that also serves /analyze. The pool is
+    sized to the connection pool (readers + writer); a burst of votes queues on
+    these threads and the writer lock rather than on the loop. Works with any
+    running loop, including the per-request loops of the Cloud Function entry.
+    """
+
+    def __init__(self, db: Optional[CommunityDatabase] = None, max_workers: int = COMMUNITY_DB_WORKERS):
+        self.db = db if db is not None else CommunityDatabase()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="community-db")
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Runs fn(*args, **kwargs) on the database thread pool."""
+        return await asyncio.wrap_future(self._executor.submit(fn, *args, **kwargs))
+
+    async def post_claim(self, claim_text: str, ai_verdict: str) -> str:
+        return await self.run(self.db.post_claim, claim_text, ai_verdict)
+
+    async def get_claim_by_text(self, claim_text: str) -> Optional[Dict]:
+        return await self.run(self.db.get_claim_by_text, claim_text)
+
+    async def submit_vote(self, claim_id: str, user_id: str, vote: bool, user_verdict: Optional[str] = None, notes: Optional[str] = None) -> bool:
+        return await self.run(self.db.submit_vote, claim_id, user_id, vote, user_verdict, notes)
+
+    async def calculate_weighted_trust_score(self, claim_id: str) -> Tuple[float, int]:
+        return await self.run(self.db.calculate_weighted_trust_score, claim_id)
+
+    async def rebuild_trust_scores(self) -> int:
+        return await self.run(self.db.rebuild_trust_scores)
+
+    async def get_top_claims(self, limit: int = 5) -> List[Dict]:
+        return await self.run(self.db.get_top_claims, limit)
+
+    async def search_claims(self, query: str) -> List[Dict]:
+        return await self.run(self.db.search_claims, query)
+
+    async def get_user_reputation(self, user_id: str) -> Dict:
+        return await self.run(self.db.get_user_reputation, user_id)
+
+    async def get_claim_discussion(self, claim_id: str) -> Optional[Dict]:
+        return await self.run(self.db.get_claim_discussion, claim_id)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self.db.close()
+
+
+if __name__ == "__main__":
+    # Repair job: python community_database.py [db_path]
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    db = CommunityDatabase(sys.argv[1] if len(sys.argv) > 1 else _DEFAULT_DB_PATH)
+    db.rebuild_trust_scores()
+    db.close()
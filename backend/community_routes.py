@@ -2,12 +2,12 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional, List
 import logging
-from community_database import CommunityDatabase
+from community_database import AsyncCommunityDatabase
 
 logger = logging.getLogger(__name__)
 
-# Initialize database
-community_db = CommunityDatabase()
+# Initialize database (queries run on its own thread pool, off the event loop)
+community_db = AsyncCommunityDatabase()
 
 # Create router
 router = APIRouter(prefix="/community", tags=["community"])
@@ -35,7 +35,7 @@ class SearchRequest(BaseModel):
 async def get_claim_data(request: ClaimRequest):
     """Get community data for a specific claim."""
     try:
-        claim = community_db.get_claim_by_text(request.claim_text)
+        claim = await community_db.get_claim_by_text(request.claim_text)
         
         if not claim:
             return {
@@ -44,7 +44,7 @@ async def get_claim_data(request: ClaimRequest):
                 "message": "Claim not found in community database"
             }
         
-        trust_score, vote_count = community_db.calculate_weighted_trust_score(claim['claim_id'])
+        trust_score, vote_count = await community_db.calculate_weighted_trust_score(claim['claim_id'])
         
         return {
             "exists": True,
@@ -63,7 +63,7 @@ async def get_claim_data(request: ClaimRequest):
 async def post_claim(request: PostClaimRequest):
     """Post a new claim to the community."""
     try:
-        claim_id = community_db.post_claim(request.claim_text, request.ai_verdict)
+        claim_id = await community_db.post_claim(request.claim_text, request.ai_verdict)
         
         return {
             "success": True,
@@ -96,7 +96,7 @@ async def submit_vote(request: VoteRequest):
         if not normalized_verdict:
             normalized_verdict = 'LEGIT' if resolved_vote else 'FAKE'
 
-        success = community_db.submit_vote(
+        success = await community_db.submit_vote(
             claim_id=request.claim_id,
             user_id=request.user_id,
             vote=resolved_vote,
@@ -111,7 +111,7 @@ async def submit_vote(request: VoteRequest):
             }
         
         # Get updated trust score
-        trust_score, vote_count = community_db.calculate_weighted_trust_score(request.claim_id)
+        trust_score, vote_count = await community_db.calculate_weighted_trust_score(request.claim_id)
         
         return {
             "success": True,
@@ -127,7 +127,7 @@ async def submit_vote(request: VoteRequest):
 async def get_top_claims(limit: int = 5):
     """Get top voted claims."""
     try:
-        claims = community_db.get_top_claims(limit)
+        claims = await community_db.get_top_claims(limit)
         
         return {
             "success": True,
@@ -151,7 +151,7 @@ async def get_top_claims(limit: int = 5):
 async def search_claims(request: SearchRequest):
     """Search community claims by text."""
     try:
-        claims = community_db.search_claims(request.query)
+        claims = await community_db.search_claims(request.query)
         
         return {
             "success": True,
@@ -176,7 +176,7 @@ async def search_claims(request: SearchRequest):
 async def get_user_reputation(user_id: str):
     """Get user reputation statistics."""
     try:
-        reputation = community_db.get_user_reputation(user_id)
+        reputation = await community_db.get_user_reputation(user_id)
         
         return {
             "success": True,
@@ -200,7 +200,7 @@ async def get_claim_discussion(claim_id: str):
     """Get claim discussion with all votes and notes."""
     try:
         logger.info(f"Fetching discussion for claim_id: {claim_id}")
-        discussion = community_db.get_claim_discussion(claim_id)
+        discussion = await community_db.get_claim_discussion(claim_id)
         
         if not discussion:
             logger.warning(f"Claim not found: {claim_id}")
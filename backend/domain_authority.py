@@ -0,0 +1,302 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import urllib.parse
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+VERIFIED_DOMAINS_FILE = 'verified_domains.json'
+AUTHORITY_RULES_FILE = 'authority_rules.json'   # optional, extends/overrides DEFAULT_AUTHORITY_RULES
+
+AUTHORITY_CACHE_SIZE = int(os.getenv("AUTHORITY_CACHE_SIZE", "4096"))
+# How often the registry checks the data files for a new signatory list (0 disables polling)
+VERIFIED_DOMAINS_POLL_SECONDS = float(os.getenv("VERIFIED_DOMAINS_POLL_SECONDS", "30"))
+
+DEFAULT_AUTHORITY = 0.7     # unknown .com/.net/...
+VERIFIED_AUTHORITY = 1.0    # Tier 1 override for verified fact-checkers
+
+# Rule scopes
+EXACT = "exact"             # the domain itself
+SUBDOMAINS = "subdomains"   # strictly below the suffix (TLDs / public suffixes)
+BOTH = "both"               # the domain and everything below it
+_SCOPES = (EXACT, SUBDOMAINS, BOTH)
+
+# (suffix, scope, authority). The longest matching suffix wins.
+DEFAULT_AUTHORITY_RULES: List[Tuple[str, str, float]] = [
+    # Highest authority: government, education, intergovernmental
+    ("gov", SUBDOMAINS, 1.0), ("edu", SUBDOMAINS, 1.0), ("int", SUBDOMAINS, 1.0),
+    # Country-level public suffixes for the same institutions
+    ("gov.uk", SUBDOMAINS, 1.0), ("gov.au", SUBDOMAINS, 1.0), ("gov.sg", SUBDOMAINS, 1.0),
+    ("gov.my", SUBDOMAINS, 1.0), ("gov.in", SUBDOMAINS, 1.0), ("gc.ca", SUBDOMAINS, 1.0),
+    ("ac.uk", SUBDOMAINS, 1.0), ("edu.au", SUBDOMAINS, 1.0), ("edu.sg", SUBDOMAINS, 1.0),
+    ("edu.my", SUBDOMAINS, 1.0),
+    # High authority orgs/news
+    ("org", SUBDOMAINS, 0.9),
+    ("bbc.com", BOTH, 0.9), ("bbc.co.uk", BOTH, 0.9), ("reuters.com", BOTH, 0.9),
+    ("apnews.com", BOTH, 0.9), ("npr.org", BOTH, 0.9),
+    # Commendable but crowd-sourced
+    ("wikipedia.org", BOTH, 0.8),
+    # Social media / UGC
+    ("twitter.com", BOTH, 0.4), ("x.com", BOTH, 0.4), ("facebook.com", BOTH, 0.4),
+    ("instagram.com", BOTH, 0.4), ("tiktok.com", BOTH, 0.4), ("reddit.com", BOTH, 0.4),
+    ("youtube.com", BOTH, 0.4),
+    # File extensions (an uploaded file used as ground truth): direct user-provided evidence
+    ("pdf", SUBDOMAINS, 1.0), ("jpg", SUBDOMAINS, 1.0), ("jpeg", SUBDOMAINS, 1.0),
+    ("png", SUBDOMAINS, 1.0), ("txt", SUBDOMAINS, 1.0), ("docx", SUBDOMAINS, 1.0),
+]
+
+
+# Helper for enforcing strict domain checks
+def normalize_domain_name(domain: str) -> str:
+    if not domain:
+        return ""
+    domain = urllib.parse.unquote(domain).strip().lower()
+    if domain.startswith("http://") or domain.startswith("https://"):
+        try:
+            domain = urllib.parse.urlparse(domain).netloc
+        except Exception:
+            pass
+    if domain.startswith("www."):
+        domain = domain[4:]
+    return domain
+
+
+class _Node:
+    __slots__ = ("children", "exact", "subtree")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.exact: Optional[float] = None     # authority of the domain ending exactly here
+        self.subtree: Optional[float] = None   # authority of any domain strictly below
+
+
+class AuthorityIndex:
+    """
+    Domain authority rules compiled into a trie keyed by reversed labels
+    ("news.bbc.co.uk" is walked uk -> co -> bbc -> news).
+
+    A lookup is one walk over the domain's labels, keeping the deepest rule
+    that applies, so "x.com" matches x.com and its subdomains but not
+    netflix.com. Results are memoized per index; indexes are immutable and
+    replaced whole (see swap_authority_index), which also drops the memo.
+    """
+
+    def __init__(self, rules: Iterable[Tuple[str, str, float]] = DEFAULT_AUTHORITY_RULES, verified_domains: Iterable[str] = (), version: str = "builtin"):
+        self.version = version
+        self._root = _Node()
+        self.rule_count = 0
+        for suffix, scope, authority in rules:
+            self.add_rule(suffix, scope, authority)
+        self.verified_domains = frozenset(normalize_domain_name(d) for d in verified_domains if d)
+        for domain in self.verified_domains:
+            self.add_rule(domain, EXACT, VERIFIED_AUTHORITY)
+        self._memo: Dict[str, float] = {}
+
+    def add_rule(self, suffix: str, scope: str, authority: float) -> None:
+        if scope not in _SCOPES:
+            raise ValueError(f"Unknown authority rule scope: {scope}")
+        node = self._root
+        for label in reversed(suffix.strip(".").lower().split(".")):
+            node = node.children.setdefault(label, _Node())
+        if scope in (EXACT, BOTH):
+            node.exact = authority
+        if scope in (SUBDOMAINS, BOTH):
+            node.subtree = authority
+        self.rule_count += 1
+
+    @staticmethod
+    def _host(domain: str) -> str:
+        # Drop a port and a trailing root dot
+        return normalize_domain_name(domain).split(":", 1)[0].rstrip(".")
+
+    def _lookup(self, host: str) -> float:
+        labels = host.split(".")
+        node = self._root
+        best = None
+        for depth, label in enumerate(reversed(labels)):
+            node = node.children.get(label)
+            if node is None:
+                break
+            if depth == len(labels) - 1:
+                if node.exact is not None:
+                    best = node.exact
+            elif node.subtree is not None:
+                best = node.subtree
+        return DEFAULT_AUTHORITY if best is None else best
+
+    def authority(self, domain: str) -> float:
+        # Memoized on the raw input, so hot domains skip normalization too
+        cached = self._memo.get(domain)
+        if cached is None:
+            cached = self._lookup(self._host(domain))
+            if len(self._memo) >= AUTHORITY_CACHE_SIZE:
+                self._memo.clear()
+            self._memo[domain] = cached
+        return cached
+
+    def is_verified(self, domain: str) -> bool:
+        return normalize_domain_name(domain) in self.verified_domains
+
+
+def _read_json(path: str, default, strict: bool = False) -> Tuple[Any, Optional[str]]:
+    """(parsed JSON, short content hash) of a data file; (default, None) when it is missing."""
+    if not os.path.exists(path):
+        return default, None
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        return json.loads(raw), hashlib.sha256(raw).hexdigest()[:12]
+    except Exception as e:
+        if strict:
+            raise
+        logger.warning(f"Could not load {path}: {e}")
+        return default, None
+
+
+def build_authority_index(data_dir: str = DATA_DIR, strict: bool = False) -> AuthorityIndex:
+    """
+    Default rules plus data/authority_rules.json, with data/verified_domains.json as the Tier 1 list.
+
+    verified_domains.json is either a plain list of domains or a versioned
+    snapshot {"version": ..., "domains": [...]}; without an explicit version the
+    content hash is used. With strict=True unreadable files raise instead of
+    being treated as empty, so a half-written update never replaces a good index.
+    """
+    rules = list(DEFAULT_AUTHORITY_RULES)
+    extra_rules, rules_hash = _read_json(os.path.join(data_dir, AUTHORITY_RULES_FILE), [], strict)
+    for rule in extra_rules:
+        try:
+            suffix, scope, authority = rule["suffix"], rule.get("scope", BOTH), float(rule["authority"])
+            if scope not in _SCOPES:
+                raise ValueError(f"unknown scope {scope!r}")
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Skipping malformed authority rule {rule!r}: {e}")
+            continue
+        rules.append((suffix, scope, authority))
+
+    snapshot, verified_hash = _read_json(os.path.join(data_dir, VERIFIED_DOMAINS_FILE), [], strict)
+    version = None
+    if isinstance(snapshot, dict):
+        version = snapshot.get("version")
+        snapshot = snapshot.get("domains", [])
+    if not isinstance(snapshot, list):
+        if strict:
+            raise ValueError(f"{VERIFIED_DOMAINS_FILE} must hold a list of domains")
+        snapshot = []
+    version = str(version or verified_hash or "builtin")
+    if rules_hash:
+        version += f"+rules.{rules_hash}"
+    return AuthorityIndex(rules, snapshot, version)
+
+
+# Built once at import; readers always see either the old or the new index
+_authority_index = build_authority_index()
+
+
+def get_authority_index() -> AuthorityIndex:
+    return _authority_index
+
+
+def swap_authority_index(index: AuthorityIndex) -> AuthorityIndex:
+    """Atomically replaces the live index; returns the previous one."""
+    global _authority_index
+    previous, _authority_index = _authority_index, index
+    return previous
+
+
+def reload_authority_index(data_dir: str = DATA_DIR) -> AuthorityIndex:
+    """Rebuilds the index from the data files and swaps it in."""
+    index = build_authority_index(data_dir)
+    swap_authority_index(index)
+    logger.info(f"Authority index reloaded: {index.rule_count} rules, {len(index.verified_domains)} verified domains")
+    return index
+
+
+class DomainRegistry:
+    """
+    Keeps the live AuthorityIndex in step with the data files, without restarts.
+
+    A daemon thread polls the files' (mtime, size) signature every
+    poll_seconds. On a change the new index is built on that thread, off the
+    request path, and swapped in with a single reference assignment: readers
+    never take a lock and in-flight scoring keeps the index it already holds.
+    A file that fails to parse (e.g. caught mid-write) leaves the current index
+    in place and is retried on the next poll.
+    """
+
+    def __init__(self, data_dir: str = DATA_DIR, poll_seconds: float = VERIFIED_DOMAINS_POLL_SECONDS):
+        self.data_dir = data_dir
+        self.poll_seconds = poll_seconds
+        self._signature = self._file_signature()
+        self._check_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.loaded_at = time.time()
+        self.reloads = 0
+        self.reload_errors = 0
+
+    def _file_signature(self) -> Tuple:
+        signature = []
+        for name in (VERIFIED_DOMAINS_FILE, AUTHORITY_RULES_FILE):
+            try:
+                st = os.stat(os.path.join(self.data_dir, name))
+                signature.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def check(self, force: bool = False) -> bool:
+        """Reloads when the data files changed (or when forced). Returns True if a new index went live."""
+        with self._check_lock:
+            signature = self._file_signature()
+            if signature == self._signature and not force:
+                return False
+            try:
+                index = build_authority_index(self.data_dir, strict=True)
+            except Exception as e:
+                self.reload_errors += 1
+                logger.warning(f"Verified domain reload failed, keeping version {get_authority_index().version}: {e}")
+                return False
+            swap_authority_index(index)
+            self._signature = signature
+            self.loaded_at = time.time()
+            self.reloads += 1
+            logger.info(f"Verified domain registry now at version {index.version} ({len(index.verified_domains)} domains)")
+            return True
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Verified domain registry poll failed: {e}")
+
+    def start(self) -> None:
+        if self.poll_seconds <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll, name="domain-registry", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        index = get_authority_index()
+        return {
+            "version": index.version,
+            "verified_domains": len(index.verified_domains),
+            "rules": index.rule_count,
+            "loaded_at": self.loaded_at,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors,
+            "polling": bool(self._thread and self._thread.is_alive()),
+        }
@@ -0,0 +1,169 @@
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Same /tmp rule as the community database: Cloud Run only allows writes there
+_IS_CLOUD_RUN = os.environ.get('K_SERVICE') is not None
+_DEFAULT_DUMP_DIR = '/tmp/forensics' if _IS_CLOUD_RUN else os.path.join(os.path.dirname(os.path.abspath(__file__)), 'forensics')
+
+FORENSIC_DUMP_DIR = os.getenv("FORENSIC_DUMP_DIR", _DEFAULT_DUMP_DIR)
+FORENSIC_SAMPLE_RATE = float(os.getenv("FORENSIC_SAMPLE_RATE", "1.0"))
+FORENSIC_RING_SIZE = int(os.getenv("FORENSIC_RING_SIZE", "50"))
+FORENSIC_MAX_DIR_BYTES = int(os.getenv("FORENSIC_MAX_DIR_BYTES", str(50 * 1024 * 1024)))
+FORENSIC_DEBUG_ENABLED = os.getenv("FORENSIC_DEBUG_ENABLED", "false").lower() == "true"
+
+# Ring buffer entries keep a bounded preview; the full text goes to disk
+_RING_PREVIEW_CHARS = 64 * 1024
+_QUEUE_MAX_ITEMS = 1000
+# Request ids come from the client; only these characters reach a file name
+_UNSAFE_ID_CHARS = re.compile(r'[^A-Za-z0-9_-]')
+_MAX_ID_CHARS = 64
+
+
+class ForensicSession:
+    """Per-analysis capture handle; the sampling decision is made once per request."""
+
+    def __init__(self, recorder: "ForensicRecorder", request_id: str, sampled: bool):
+        self.recorder = recorder
+        self.request_id = request_id
+        safe_id = _UNSAFE_ID_CHARS.sub('_', request_id)[:_MAX_ID_CHARS]
+        self.capture_id = f"{safe_id}_{uuid.uuid4().hex[:8]}"
+        self.sampled = sampled
+
+    def capture(self, kind: str, content: str, always: bool = False, extension: str = "json") -> None:
+        """
+        Queues a capture for the background writer.
+
+        Args:
+            kind: Short label used in the file name (e.g. "grounding_metadata").
+            content: Already-serialized text.
+            always: Capture even if this request was sampled out (parse failures).
+        """
+        if self.sampled or always:
+            self.recorder._enqueue(self, kind, content, extension)
+
+
+class ForensicRecorder:
+    """
+    Background forensic dump writer.
+
+    Captures are pushed onto a queue and written by a daemon thread, so the
+    analysis path never blocks on disk I/O. Every capture gets a unique,
+    timestamp-prefixed file name; the oldest files are deleted once the dump
+    directory exceeds its byte budget. The last few captures are also kept in
+    memory for the /debug/forensics endpoint.
+    """
+
+    def __init__(self, dump_dir: str = FORENSIC_DUMP_DIR, sample_rate: float = FORENSIC_SAMPLE_RATE, ring_size: int = FORENSIC_RING_SIZE, max_dir_bytes: int = FORENSIC_MAX_DIR_BYTES):
+        self.dump_dir = dump_dir
+        self.sample_rate = sample_rate
+        self.max_dir_bytes = max_dir_bytes
+        self._ring: deque = deque(maxlen=ring_size)
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=_QUEUE_MAX_ITEMS)
+        self._lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._dir_bytes: Optional[int] = None
+        self._stats = {"captures": 0, "sampled_out": 0, "dropped": 0, "written": 0, "bytes_written": 0, "rotated": 0, "write_errors": 0}
+
+    def start(self, request_id: str) -> ForensicSession:
+        sampled = self.sample_rate >= 1.0 or random.random() < self.sample_rate
+        if not sampled:
+            with self._lock:
+                self._stats["sampled_out"] += 1
+        return ForensicSession(self, request_id, sampled)
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent captures first."""
+        with self._lock:
+            return list(reversed(self._ring))[:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["sample_rate"] = self.sample_rate
+        return stats
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Waits for queued captures to reach disk (tests and shutdown)."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self._queue.unfinished_tasks
+
+    def _enqueue(self, session: ForensicSession, kind: str, content: str, extension: str) -> None:
+        timestamp = time.time()
+        file_name = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime(timestamp))}_{session.capture_id}_{kind}.{extension}"
+        with self._lock:
+            self._stats["captures"] += 1
+            self._ring.append({
+                "capture_id": session.capture_id,
+                "request_id": session.request_id,
+                "kind": kind,
+                "timestamp": timestamp,
+                "file": file_name,
+                "size": len(content),
+                "content": content[:_RING_PREVIEW_CHARS],
+            })
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait((file_name, content))
+        except queue.Full:
+            with self._lock:
+                self._stats["dropped"] += 1
+
+    def _ensure_writer(self) -> None:
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._run_writer, name="forensic-writer", daemon=True)
+                self._writer.start()
+
+    def _run_writer(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                file_name, content = item
+                self._write(file_name, content)
+            except Exception as e:
+                with self._lock:
+                    self._stats["write_errors"] += 1
+                logger.error(f"Forensic dump write failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, file_name: str, content: str) -> None:
+        os.makedirs(self.dump_dir, exist_ok=True)
+        if self._dir_bytes is None:
+            self._dir_bytes = sum(entry.stat().st_size for entry in os.scandir(self.dump_dir) if entry.is_file())
+        data = content.encode("utf-8")
+        with open(os.path.join(self.dump_dir, file_name), "wb") as f:
+            f.write(data)
+        self._dir_bytes += len(data)
+        with self._lock:
+            self._stats["written"] += 1
+            self._stats["bytes_written"] += len(data)
+        if self._dir_bytes > self.max_dir_bytes:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        # Names are timestamp-prefixed, so lexical order is oldest first
+        entries = sorted((e for e in os.scandir(self.dump_dir) if e.is_file()), key=lambda e: e.name)
+        for entry in entries:
+            if self._dir_bytes <= self.max_dir_bytes:
+                break
+            size = entry.stat().st_size
+            os.remove(entry.path)
+            self._dir_bytes -= size
+            with self._lock:
+                self._stats["rotated"] += 1
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "16"))
+
+
+class GeminiGate:
+    """
+    Bounded, event-loop-friendly gate for the blocking google-genai client.
+
+    Calls run on a dedicated thread pool so a slow Vertex round trip never blocks
+    the uvicorn loop. A process-wide counting semaphore caps in-flight calls; it is
+    built on threading primitives rather than asyncio.Semaphore because the Cloud
+    Function entry point spins up a fresh event loop per request.
+    """
+
+    def __init__(self, max_concurrency: int = GEMINI_MAX_CONCURRENCY):
+        self.max_concurrency = max(1, max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="gemini")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiters: deque = deque()  # (loop, future) pairs in FIFO order
+        self._stats = {"calls": 0, "queued_calls": 0, "peak_queue_depth": 0, "total_wait_seconds": 0.0, "max_wait_seconds": 0.0}
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Runs fn(*args, **kwargs) on the Gemini pool once a slot is free."""
+        await self._acquire()
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._release()
+            raise
+        # Release on completion, not on await: a cancelled caller must not free
+        # the slot while its call is still running in the pool.
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    async def stream(self, fn: Callable[..., Any], on_chunk: Callable[[Any], None], *args, **kwargs) -> List[Any]:
+        """
+        Runs a streaming SDK call (fn returns an iterator) on the Gemini pool under one slot.
+        on_chunk is invoked on the caller's event loop as each chunk arrives; all chunks are returned.
+        """
+        loop = asyncio.get_running_loop()
+
+        def _consume():
+            chunks = []
+            for chunk in fn(*args, **kwargs):
+                chunks.append(chunk)
+                try:
+                    loop.call_soon_threadsafe(on_chunk, chunk)
+                except RuntimeError:
+                    # Caller's loop is gone; keep draining so the slot is held for the real duration
+                    pass
+            return chunks
+
+        return await self.run(_consume)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = self._in_flight
+            stats["queue_depth"] = len(self._waiters)
+        stats["max_concurrency"] = self.max_concurrency
+        stats["avg_wait_ms"] = round(stats["total_wait_seconds"] * 1000 / stats["calls"], 2) if stats["calls"] else 0.0
+        stats["max_wait_ms"] = round(stats.pop("max_wait_seconds") * 1000, 2)
+        stats["total_wait_seconds"] = round(stats["total_wait_seconds"], 3)
+        return stats
+
+    async def _acquire(self) -> None:
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._in_flight < self.max_concurrency and not self._waiters:
+                self._in_flight += 1
+                self._record_wait(0.0, queued=False)
+                return
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+            self._stats["peak_queue_depth"] = max(self._stats["peak_queue_depth"], len(self._waiters))
+            logger.info(f"Gemini gate saturated ({self._in_flight} in flight), queue depth {len(self._waiters)}")
+
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            # The slot was handed over; give it back unless _grant will do so
+            if waiter[1].done() and not waiter[1].cancelled():
+                self._release()
+            raise
+
+        with self._lock:
+            self._record_wait(time.monotonic() - started, queued=True)
+
+    def _release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                try:
+                    # The slot transfers directly to the next waiter
+                    loop.call_soon_threadsafe(self._grant, future)
+                    return
+                except RuntimeError:
+                    # Waiter's event loop has already been closed
+                    continue
+            self._in_flight -= 1
+
+    def _grant(self, future: asyncio.Future) -> None:
+        if future.done():
+            # Waiter was cancelled after being dequeued: pass the slot on
+            self._release()
+        else:
+            future.set_result(None)
+
+    def _record_wait(self, waited: float, queued: bool) -> None:
+        self._stats["calls"] += 1
+        if queued:
+            self._stats["queued_calls"] += 1
+        self._stats["total_wait_seconds"] += waited
+        self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], waited)
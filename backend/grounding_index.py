@@ -0,0 +1,146 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from domain_authority import get_authority_index, normalize_domain_name
+from logic import extract_domain
+from url_fetcher import normalize_url
+
+# Chunk kinds
+WEB = "web"     # search result (or a local dict carrying a uri)
+FILE = "file"   # uploaded file / retrieved context, resolved through its citation
+
+
+class ChunkRecord(NamedTuple):
+    index: int            # position in grounding_chunks
+    citation_id: int      # index + 1, the ID shown next to [x] tags in the UI
+    kind: str
+    uri: str
+    normalized_uri: str
+    domain: str
+    title: str
+    authority: float
+    is_verified: bool
+
+
+def _field(obj: Any, name: str, default: Any = None) -> Any:
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+def _chunk_source(chunk: Any) -> Tuple[str, Optional[Any]]:
+    """(kind, node holding uri/title/domain) for a Vertex AI chunk object or a local dict."""
+    if isinstance(chunk, dict):
+        return WEB, chunk
+    web = getattr(chunk, 'web', None)
+    if web:
+        return WEB, web
+    return FILE, None
+
+
+class GroundingIndex:
+    """
+    Grounding chunks of one response, walked once.
+
+    Every post-processing stage (fallback citations, citation IDs, scanned
+    sources, reliability scoring) reads the same compact records, so domains,
+    titles and IDs agree across stages. A normalized URI that appears in several
+    chunks resolves to its first chunk everywhere.
+    """
+
+    def __init__(self, grounding_chunks: Optional[List[Any]] = None, resolved_uris: Optional[Dict[str, str]] = None):
+        self.records: List[ChunkRecord] = []
+        self._by_uri: Dict[str, ChunkRecord] = {}
+        authority_memo: Dict[str, Tuple[float, bool]] = {}
+        # One authority snapshot per response, even if the registry swaps in a new list meanwhile
+        authority_index = get_authority_index()
+
+        for i, chunk in enumerate(grounding_chunks or []):
+            kind, node = _chunk_source(chunk)
+            uri = (_field(node, 'uri') or "") if node is not None else ""
+            title = (_field(node, 'title') or "") if node is not None else ""
+            # A redirect URI resolved to its publisher names the domain better than the title does
+            resolved = resolved_uris.get(uri) if resolved_uris and uri else None
+            if node is None:
+                domain = ""
+            else:
+                domain = _field(node, 'domain') or (normalize_domain_name(extract_domain(resolved)) if resolved else "") or title or extract_domain(uri)
+            domain = domain or "unknown"
+
+            if domain not in authority_memo:
+                authority_memo[domain] = (authority_index.authority(domain), authority_index.is_verified(domain))
+            authority, verified = authority_memo[domain]
+
+            record = ChunkRecord(i, i + 1, kind, uri, normalize_url(uri), domain, title, authority, verified)
+            self.records.append(record)
+            if record.normalized_uri:
+                self._by_uri.setdefault(record.normalized_uri, record)
+
+        self.citations: Optional[List[Any]] = None
+        self._citation_by_id: Dict[int, Any] = {}
+        self._citation_by_uri: Dict[str, Tuple[int, Any]] = {}
+
+    @staticmethod
+    def chunks_of(response: Any) -> List[Any]:
+        metadata = response.candidates[0].grounding_metadata if response and response.candidates else None
+        return getattr(metadata, 'grounding_chunks', None) or []
+
+    @staticmethod
+    def web_uris(grounding_chunks: List[Any]) -> List[str]:
+        """URIs of the web chunks, e.g. to resolve redirects before indexing."""
+        uris = []
+        for chunk in grounding_chunks:
+            kind, node = _chunk_source(chunk)
+            uri = _field(node, 'uri') if kind == WEB and node is not None else None
+            if uri:
+                uris.append(uri)
+        return uris
+
+    @classmethod
+    def from_response(cls, response: Any, resolved_uris: Optional[Dict[str, str]] = None) -> "GroundingIndex":
+        return cls(cls.chunks_of(response), resolved_uris)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def chunk(self, index: int) -> Optional[ChunkRecord]:
+        if 0 <= index < len(self.records):
+            return self.records[index]
+        return None
+
+    def by_uri(self, uri: str) -> Optional[ChunkRecord]:
+        return self._by_uri.get(normalize_url(uri or ""))
+
+    def by_citation_id(self, citation_id: int) -> Optional[ChunkRecord]:
+        return self.chunk(citation_id - 1)
+
+    def citation_id_for(self, uri: str) -> int:
+        """Chunk-derived citation ID for a URL, 0 if no chunk carries it."""
+        record = self.by_uri(uri)
+        return record.citation_id if record else 0
+
+    def web_records(self) -> List[ChunkRecord]:
+        """Web chunks with a URI, first occurrence of each normalized URI only."""
+        return [r for r in self.records if r.kind == WEB and r.normalized_uri and self._by_uri[r.normalized_uri] is r]
+
+    def file_records(self) -> List[ChunkRecord]:
+        return [r for r in self.records if r.kind == FILE]
+
+    def attach_citations(self, citations: List[Any]) -> None:
+        """Indexes the sanitized citation list by ID and by normalized URL (first wins)."""
+        self.citations = citations
+        self._citation_by_id = {}
+        self._citation_by_uri = {}
+        for position, citation in enumerate(citations):
+            citation_id = _field(citation, 'id')
+            if citation_id is not None:
+                self._citation_by_id.setdefault(citation_id, citation)
+            norm = normalize_url(_field(citation, 'url') or "")
+            if norm:
+                self._citation_by_uri.setdefault(norm, (position, citation))
+
+    def citation(self, citation_id: int) -> Optional[Any]:
+        return self._citation_by_id.get(citation_id)
+
+    def citation_for(self, record: ChunkRecord) -> Tuple[int, Optional[Any]]:
+        """(position in the citation list, citation) whose URL matches the chunk, or (-1, None)."""
+        return self._citation_by_uri.get(record.normalized_uri, (-1, None)) if record.normalized_uri else (-1, None)
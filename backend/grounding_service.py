@@ -1,27 +1,92 @@
+import os
 import re
+import math
+import heapq
 import logging
-from typing import List, Dict, Any, Tuple
+from collections import Counter, defaultdict
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+from utf16_offsets import Utf16Offsets
 
 # Configure logging to go to console as requested
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("GroundingService")
 
-class GroundingService:
+GROUNDING_TOP_K = int(os.getenv("GROUNDING_TOP_K", "3"))
+GROUNDING_MIN_RELEVANCE = float(os.getenv("GROUNDING_MIN_RELEVANCE", "0.1"))
+
+# Okapi BM25 parameters (standard defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Upper bound of a support's confidence by source status; scaled by relevance
+STATUS_CONFIDENCE = {"live": 0.9, "restricted": 0.6, "dead": 0.4}
+
+_TOKEN_SPLIT = re.compile(r'\W+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens, dropping words of two characters or fewer."""
+    return [w for w in _TOKEN_SPLIT.split(text.lower()) if len(w) > 2]
+
+
+class SourceIndex:
     """
-    A service to generate Vertex AI-style GroundingMetadata from raw text and sources.
+    Inverted index (term -> postings of (source_id, term frequency)) over source texts.
+
+    A query only visits the postings of its own terms, so the cost of matching a
+    segment scales with the sources it shares words with rather than with the
+    number of sources. Hits are ranked with Okapi BM25.
     """
 
-    def _get_utf16_length(self, s: str) -> int:
+    def __init__(self, source_texts: List[str]):
+        self.size = len(source_texts)
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        lengths = []
+        for source_id, text in enumerate(source_texts):
+            counts = Counter(tokenize(text))
+            lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self._postings.setdefault(term, []).append((source_id, tf))
+        avg_length = (sum(lengths) / len(lengths)) if lengths and sum(lengths) else 1.0
+        # Length normalisation term of BM25, fixed per source
+        self._norm = [BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length) for length in lengths]
+
+    def idf(self, term: str) -> float:
+        df = len(self._postings.get(term, ()))
+        return math.log(1 + (self.size - df + 0.5) / (df + 0.5))
+
+    def search(self, query_terms: Iterable[str], top_k: int = GROUNDING_TOP_K) -> List[Tuple[int, float]]:
         """
-        Calculates the length of the string in UTF-16 code units.
-        This is crucial for compatibility with Flutter/Dart indexing.
+        Top-k (source_id, relevance) pairs, best first.
+
+        Relevance is the BM25 score divided by the score of an average-length
+        source containing every query term once, capped at 1.0: roughly the
+        IDF-weighted share of the segment the source covers.
         """
-        return len(s.encode('utf-16-le')) // 2
+        scores: Dict[int, float] = defaultdict(float)
+        ideal = 0.0
+        for term in set(query_terms):
+            idf = self.idf(term)
+            ideal += idf
+            for source_id, tf in self._postings.get(term, ()):
+                scores[source_id] += idf * tf * (BM25_K1 + 1) / (tf + self._norm[source_id])
+        if not scores or ideal <= 0:
+            return []
+        best = heapq.nlargest(top_k, scores.items(), key=lambda hit: (hit[1], -hit[0]))
+        return [(source_id, min(1.0, score / ideal)) for source_id, score in best]
 
-    def _segment_text(self, text: str) -> List[Dict[str, Any]]:
+class GroundingService:
+    """
+    A service to generate Vertex AI-style GroundingMetadata from raw text and sources.
+    """
+
+    def _segment_text(self, text: str, offsets: Optional[Utf16Offsets] = None) -> List[Dict[str, Any]]:
         """
         Splits text into segments (sentences/claims).
         Returns a list of dicts with 'text', 'start', 'end' (UTF-16 offsets).
+        Offsets come from a prefix-sum table built once for the text, so
+        segmentation stays linear in the text length.
         """
         segments = []
         # Simple regex for sentence splitting. 
@@ -29,8 +94,7 @@ class GroundingService:
         # This splits by standard sentence terminators.
         # We assume the analysis text is relatively clean.
         
-        # Determine offsets iteratively
-        current_utf16_idx = 0
+        offsets = Utf16Offsets.for_text(text, offsets)
         
         # Split by sentence endings (. ! ?) follow by space or end of string
         # We stick to a simple split to avoid complex NLP dependency for now
@@ -47,7 +111,7 @@ class GroundingService:
              segments.append({
                 "text": text,
                 "startIndex": 0,
-                "endIndex": self._get_utf16_length(text)
+                "endIndex": offsets.length
             })
              # Log raw length here for the first segment logic? No, do it globally.
              return segments
@@ -59,11 +123,7 @@ class GroundingService:
                 
             # Calculate UTF-16 offsets relative to the start of the string
             # We can't just use match.start() because preceeding chars might be multi-byte.
-            preceding_text = text[:match.start()]
-            start_idx = self._get_utf16_length(preceding_text)
-            
-            segment_len = self._get_utf16_length(span_text)
-            end_idx = start_idx + segment_len
+            start_idx, end_idx = offsets.span(match.start(), match.end())
             
             segments.append({
                 "text": span_text,
@@ -77,74 +137,40 @@ class GroundingService:
 
     def _map_segments_to_sources(self, segments: List[Dict[str, Any]], sources: List[Dict[str, str]]) -> Tuple[List[Dict[str, Any]], List[int]]:
         """
-        Maps each segment to one or more source candidates based on keyword overlap.
+        Maps each segment to its top-k sources by BM25 relevance.
+        Confidence is the source's status ceiling scaled by that relevance.
         """
         supports = []
         all_referenced_indices = []
 
-        # Pre-process sources into sets of keywords for faster checking
-        source_keywords = []
-        for idx, src in enumerate(sources):
-            # simple tokenization: lowercase, split by space, remove short words
-            text = (src.get('text') or src.get('title') or "").lower()
-            tokens = set(w for w in re.split(r'\W+', text) if len(w) > 2)
-            source_keywords.append(tokens)
-            logger.info(f"[DEBUG] Source {idx} Tokens: {tokens}")
+        # Index the sources once; each segment then only touches sources sharing a term
+        index = SourceIndex([(src.get('text') or src.get('title') or "") for src in sources])
 
         for segment in segments:
-            seg_text = segment['text']
-            seg_tokens = set(w for w in re.split(r'\W+', seg_text.lower()) if len(w) > 2)
+            seg_tokens = tokenize(segment['text'])
             
             if not seg_tokens:
                 continue
-            
-            logger.info(f"[DEBUG] Segment Tokens: {seg_tokens}")
 
-            mapped_indices = []
-            
-            # Check against each source
-            for idx, src_tokens in enumerate(source_keywords):
-                if not src_tokens:
-                    continue
-                
-                # Jaccard/Overlap similarity
-                intersection = seg_tokens.intersection(src_tokens)
-                
-                # Dynamic Threshold:
-                # If source is just a title (short), require less overlap (e.g. 1 keyword like "Mars")
-                is_short_source = len(src_tokens) < 5
-                
-                # If short source, 1 strong keyword is enough.
-                # If long source, want at least 2 or significant ratio.
-                if is_short_source:
-                    match = len(intersection) >= 1
-                else:
-                    match = len(intersection) >= 2 or (len(intersection) / len(seg_tokens) > 0.3)
-
-                if match:
-                    mapped_indices.append(idx)
+            ranked = [(idx, relevance) for idx, relevance in index.search(seg_tokens) if relevance >= GROUNDING_MIN_RELEVANCE]
             
-            if mapped_indices:
-                logger.info(f"[DEBUG] Mapping Segment to Chunk Indices: {mapped_indices}")
+            if ranked:
+                logger.info(f"[DEBUG] Mapping Segment to Chunk Indices: {[idx for idx, _ in ranked]}")
                 
                 # Check for out of bounds (Integrity Check)
-                valid_indices = []
-                for idx in mapped_indices:
+                valid = []
+                for idx, relevance in ranked:
                     if 0 <= idx < len(sources):
-                        valid_indices.append(idx)
+                        valid.append((idx, relevance))
                     else:
                         logger.error(f"[CRITICAL] Index {idx} out of bounds! Excluding.")
                 
-                if valid_indices:
-                    confidence_scores = []
-                    for idx in valid_indices:
-                        src_status = sources[idx].get('status', 'live')
-                        if src_status == 'live':
-                            confidence_scores.append(0.9)
-                        elif src_status == 'restricted':
-                            confidence_scores.append(0.6)
-                        else: # dead
-                            confidence_scores.append(0.4)
+                if valid:
+                    valid_indices = [idx for idx, _ in valid]
+                    confidence_scores = [
+                        round(STATUS_CONFIDENCE.get(sources[idx].get('status', 'live'), STATUS_CONFIDENCE["dead"]) * relevance, 4)
+                        for idx, relevance in valid
+                    ]
 
                     supports.append({
                         "segment": {
@@ -159,14 +185,14 @@ class GroundingService:
 
         return supports, all_referenced_indices
 
-    def process(self, analysis_text: str, sources: List[Dict[str, str]]) -> Dict[str, Any]:
+    def process(self, analysis_text: str, sources: List[Dict[str, str]], offsets: Optional[Utf16Offsets] = None) -> Dict[str, Any]:
         """
-        Main entry point.
+        Main entry point. `offsets` may be a table the caller already built for analysis_text.
         """
         
         # 1. Log Raw Analysis Length
-        utf16_len = self._get_utf16_length(analysis_text)
-        logger.info(f"[DEBUG] Raw Analysis Length: {utf16_len}")
+        offsets = Utf16Offsets.for_text(analysis_text, offsets)
+        logger.info(f"[DEBUG] Raw Analysis Length: {offsets.length}")
         logger.info(f"[DEBUG] Processing with {len(sources)} sources.")
         if sources:
              logger.info(f"[DEBUG] First Source Text: {sources[0].get('text', '')[:50]}...")
@@ -174,7 +200,7 @@ class GroundingService:
              logger.info(f"[DEBUG] Sources list is empty!")
 
         # 2. Segment
-        segments = self._segment_text(analysis_text)
+        segments = self._segment_text(analysis_text, offsets)
         
         # 3. Map
         supports, all_indices = self._map_segments_to_sources(segments, sources)
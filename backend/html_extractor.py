@@ -0,0 +1,100 @@
+import re
+from html.parser import HTMLParser
+from typing import List
+
+# Subtrees that never contain article text
+_SKIP_TAGS = {
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe",
+    "nav", "header", "footer", "aside", "form", "button", "select", "figure",
+}
+# Tags that close the current text block
+_BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "li", "ul", "ol", "blockquote",
+    "h1", "h2", "h3", "h4", "h5", "h6", "br", "tr", "td", "pre", "dd", "dt",
+}
+_HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+_WHITESPACE = re.compile(r"\s+")
+
+
+class ArticleExtractor(HTMLParser):
+    """
+    Incremental HTML-to-text extractor for fetched news pages.
+
+    Feed decoded chunks as they arrive; markup, scripts and navigation chrome
+    are dropped, short link-list blocks are treated as boilerplate, and `done`
+    flips to True once max_chars of article text have been collected so the
+    caller can stop downloading.
+    """
+
+    def __init__(self, max_chars: int = 5000, min_block_chars: int = 40):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.min_block_chars = min_block_chars
+        self.title = ""
+        self._blocks: List[str] = []
+        self._length = 0
+        self._buffer: List[str] = []
+        self._buffer_length = 0
+        self._skip_depth = 0
+        self._in_title = False
+        self._in_heading = False
+
+    @property
+    def done(self) -> bool:
+        return self._length >= self.max_chars
+
+    def feed(self, data: str) -> None:
+        if not self.done:
+            super().feed(data)
+
+    def close(self) -> None:
+        super().close()
+        self._flush()
+
+    def text(self) -> str:
+        """Returns the extracted article text (title first), capped at max_chars."""
+        parts = ([self.title] if self.title else []) + self._blocks
+        return "\n".join(parts)[:self.max_chars]
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+            self._in_heading = tag in _HEADING_TAGS
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "title":
+            self._in_title = False
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+            self._in_heading = False
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self._in_title:
+            self.title = _WHITESPACE.sub(" ", self.title + data).strip()
+            return
+        self._buffer.append(data)
+        self._buffer_length += len(data)
+        # A single huge block must not defer `done` until its closing tag
+        if self._length + self._buffer_length >= self.max_chars:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        block = _WHITESPACE.sub(" ", "".join(self._buffer)).strip()
+        self._buffer = []
+        self._buffer_length = 0
+        if not block or self.done:
+            return
+        if len(block) < self.min_block_chars and not self._in_heading:
+            return
+        self._blocks.append(block)
+        self._length += len(block) + 1
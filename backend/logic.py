@@ -1,58 +1,27 @@
-import json
 import os
 import urllib.parse
+from typing import Optional
 
-# Load verified signatories at module level
-VERIFIED_DOMAINS = set()
+# Domain authority lives in a compiled, hot-swappable index (see domain_authority.py)
+from domain_authority import get_authority_index, normalize_domain_name  # noqa: F401 (re-exported)
+
+# NumPy is optional: it only powers the vectorized reliability mode
 try:
-    data_dir = os.path.join(os.path.dirname(__file__), 'data')
-    verified_path = os.path.join(data_dir, 'verified_domains.json')
-    if os.path.exists(verified_path):
-        with open(verified_path, 'r', encoding='utf-8') as f:
-            VERIFIED_DOMAINS = set(json.load(f))
-except Exception as e:
-    print(f"Warning: Could not load verified domains: {e}")
-
-# Helper for enforcing strict domain checks
-def normalize_domain_name(domain: str) -> str:
-    if not domain:
-        return ""
-    domain = urllib.parse.unquote(domain).strip().lower()
-    if domain.startswith("http://") or domain.startswith("https://"):
-        try:
-            domain = urllib.parse.urlparse(domain).netloc
-        except Exception:
-            pass
-    if domain.startswith("www."):
-        domain = domain[4:]
-    return domain
-
-# Domain Authority Multipliers (from V2 logic or similar heuristics)
+    import numpy as np
+    _NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    _NUMPY_AVAILABLE = False
+
+# Above this many supports, calculate_reliability switches to the vectorized engine (when NumPy is installed)
+RELIABILITY_VECTORIZE_MIN_SUPPORTS = int(os.getenv("RELIABILITY_VECTORIZE_MIN_SUPPORTS", "64"))
+
+def is_verified_domain(domain: str) -> bool:
+    return get_authority_index().is_verified(domain)
+
+# Domain Authority Multipliers: verified fact-checkers, gov/edu/int suffixes, news outlets, social platforms
 def get_authority_multiplier(domain: str) -> float:
-    domain = normalize_domain_name(domain)
-    
-    # NEW: Tier 1 override for Verified Fact-Checkers
-    is_verified_signatory = domain in VERIFIED_DOMAINS
-    print(f"DEBUG: Domain {domain} verified status: {is_verified_signatory}")
-    if is_verified_signatory:
-        return 1.0
-        
-    if domain.endswith('.gov') or domain.endswith('.edu') or domain.endswith('.int'):
-        return 1.0  # Highest authority
-    if domain.endswith('.org') or domain in ['bbc.com', 'bbc.co.uk', 'reuters.com', 'apnews.com', 'npr.org']:
-        return 0.9  # High authority orgs/news
-    if domain in ['wikipedia.org', 'en.wikipedia.org']:
-        return 0.8  # Commendable but crowd-sourced
-    
-    social_domains = ['twitter.com', 'x.com', 'facebook.com', 'instagram.com', 'tiktok.com', 'reddit.com', 'youtube.com']
-    if any(sd in domain for sd in social_domains):
-        return 0.4  # Social media / UGC
-    
-    # Check for file extensions (indicates an uploaded file used as ground truth)
-    if any(domain.lower().endswith(ext) for ext in ['.pdf', '.jpg', '.jpeg', '.png', '.txt', '.docx']):
-        return 1.0 # Direct user-provided evidence
-        
-    return 0.7  # Default for unknown .com/.net/...
+    return get_authority_index().authority(domain)
 
 def extract_domain(url: str) -> str:
     if not url:
@@ -73,108 +42,96 @@ def extract_domain(url: str) -> str:
     except Exception:
         return "unknown"
 
-def calculate_reliability(grounding_supports: list, grounding_chunks: list, grounding_citations: list, is_multimodal_verified: bool, ai_confidence: float = 0.0) -> dict:
-    """
-    Implements the V3 Strongest Link Math Engine.
-    """
-    # EARLY EXIT: If there are no sources used, return a safe zeroed payload
-    if not grounding_supports:
-        return {
-            "reliability_score": 0.0,
-            "ai_confidence": ai_confidence,
-            "base_grounding": 0.0,
-            "consistency_bonus": 0.0,
-            "multimodal_bonus": 0.0,
-            "verdict_label": "Unverified / No Data",
-            "explanation": "No reliable search results were found to verify this claim.",
-            "segments": [],
-            "unused_sources": [] # Ensure frontend doesn't crash trying to map this
-        }
+# Define a helper for robust field extraction (snake_case vs camelCase)
+def github_get(obj, *fields):
+    if isinstance(obj, dict):
+        for f in fields:
+            if f in obj:
+                return obj[f]
+        return None
+    for f in fields:
+        if hasattr(obj, f):
+            return getattr(obj, f)
+        if isinstance(obj, dict) and f in obj:
+            return obj[f]
+    return None
 
+def _support_rows(grounding_supports: list) -> list:
+    """(segment_text, chunk_indices, confidence_scores) per support, read once."""
+    rows = []
+    for support in grounding_supports:
+        segment = github_get(support, 'segment') or {}
+        rows.append((
+            github_get(segment, 'text') or 'Unknown segment text',
+            github_get(support, 'grounding_chunk_indices', 'groundingChunkIndices') or [],
+            github_get(support, 'confidence_scores', 'confidenceScores') or [],
+        ))
+    return rows
+
+def _quote_for(index, record):
+    """(source_index, quote_text) for a chunk, from its matching citation when there is one."""
+    source_index, citation = index.citation_for(record)
+    if citation is None:
+        return source_index, record.title or 'No snippet available.'
+    # Handle dict or Pydantic object
+    snippet = citation.get('snippet', 'Content unavailable.') if isinstance(citation, dict) else getattr(citation, 'snippet', 'Content unavailable.')
+    return source_index, snippet
+
+def _collect_unused_sources(index, used_chunk_indices: set, used_domains: set) -> list:
+    unused_sources = []
+    seen_unused_domains = set()
+    for record in index.records:
+        if record.index not in used_chunk_indices:
+            domain = record.domain
+            if domain and domain != "unknown" and domain not in used_domains and domain not in seen_unused_domains:
+                unused_sources.append({
+                    "domain": domain,
+                    "title": record.title or 'unknown'
+                })
+                seen_unused_domains.add(domain)
+    return unused_sources
+
+def _score_supports_loop(rows: list, index) -> tuple:
+    """Reference engine: one Python iteration per (support, chunk) pair, with full audit logging."""
     segment_audits = []
     used_domains = set()
     used_chunk_indices = set()
 
-    # Pre-compute URI to Source Index mapping from Citations
-    uri_to_source_index = {}
-    snippet_map = {}
-    for idx, citation in enumerate(grounding_citations):
-        # Handle dict or Pydantic object
-        uri = citation.get('url', '') if isinstance(citation, dict) else getattr(citation, 'url', '')
-        snippet = citation.get('snippet', 'Content unavailable.') if isinstance(citation, dict) else getattr(citation, 'snippet', 'Content unavailable.')
-        if uri:
-            uri_to_source_index[uri] = idx
-            snippet_map[uri] = snippet
-
-    # Define a helper for robust field extraction (snake_case vs camelCase)
-    def github_get(obj, *fields):
-        for f in fields:
-            if hasattr(obj, f):
-                return getattr(obj, f)
-            if isinstance(obj, dict) and f in obj:
-                return obj[f]
-        return None
-
     print("\n" + "="*50)
     print("[RAW_METADATA_AUDIT] Grounding Supports Structure")
-    for i, support in enumerate(grounding_supports): # Audit all segments
-        segment = github_get(support, 'segment') or {}
-        segment_text = github_get(segment, 'text') or 'Unknown segment text'
-        indices = github_get(support, 'grounding_chunk_indices', 'groundingChunkIndices') or []
-        conf_scores = github_get(support, 'confidence_scores', 'confidenceScores') or 'NOT FOUND'
+    for i, (segment_text, indices, conf_scores) in enumerate(rows): # Audit all segments
         print(f"--- Segment {i} ---")
         print(f"  Text: '{segment_text[:50]}...'")
         print(f"  Chunk Indices: {indices}")
-        print(f"  Raw Confidence Scores: {conf_scores}")
+        print(f"  Raw Confidence Scores: {conf_scores or 'NOT FOUND'}")
     print("="*50 + "\n")
 
-    for seg_idx, support in enumerate(grounding_supports):
-        # Determine attributes robustly
-        segment = github_get(support, 'segment') or {}
-        segment_text = github_get(segment, 'text') or 'Unknown segment text'
-        
-        indices = github_get(support, 'grounding_chunk_indices', 'groundingChunkIndices') or []
-        conf_scores = github_get(support, 'confidence_scores', 'confidenceScores') or []
-        
+    for seg_idx, (segment_text, indices, conf_scores) in enumerate(rows):
         evaluated_sources = []
         best_score = 0.0
         best_domain = "unknown"
 
         for i, chunk_idx in enumerate(indices):
-            if chunk_idx < 0 or chunk_idx >= len(grounding_chunks):
+            record = index.chunk(chunk_idx)
+            if record is None:
                 continue
-                
-            chunk = grounding_chunks[chunk_idx]
-            
-            # Handle Vertex AI chunk object vs local dict representation
-            if hasattr(chunk, 'web') and chunk.web:
-                raw_domain = getattr(chunk.web, 'domain', '') or getattr(chunk.web, 'title', 'unknown')
-                raw_uri = getattr(chunk.web, 'uri', '')
-                raw_title = getattr(chunk.web, 'title', 'No snippet available.')
-            else:
-                 raw_domain = chunk.get('domain', '') or chunk.get('title', 'unknown') if isinstance(chunk, dict) else 'unknown'
-                 raw_uri = chunk.get('uri', '') if isinstance(chunk, dict) else ''
-                 raw_title = chunk.get('title', 'No snippet available.') if isinstance(chunk, dict) else 'No snippet available.'
-            
-            source_index = uri_to_source_index.get(raw_uri, -1)
-            quote_text = snippet_map.get(raw_uri, raw_title)
+
+            raw_domain = record.domain
+            source_index, quote_text = _quote_for(index, record)
             
             used_chunk_indices.add(chunk_idx)
             
             if raw_domain and raw_domain != "unknown":
                 used_domains.add(raw_domain)
 
-            auth = get_authority_multiplier(raw_domain)
+            auth = record.authority
             
             # Default to 1.0 for files if API confidence is missing (it's user context)
-            conf = conf_scores[i] if i < len(conf_scores) else (1.0 if raw_uri.startswith("file://") else 0.0)
+            conf = conf_scores[i] if i < len(conf_scores) else (1.0 if record.uri.startswith("file://") else 0.0)
             chunk_score = conf * auth
             
-            clean_domain_for_check = normalize_domain_name(raw_domain)
-            is_verified = clean_domain_for_check in VERIFIED_DOMAINS
-            
             evaluated_sources.append({
-                "id": chunk_idx + 1, # 1-indexed source ID
+                "id": record.citation_id, # 1-indexed source ID
                 "chunk_index": chunk_idx,
                 "source_index": source_index,
                 "domain": raw_domain,
@@ -182,7 +139,7 @@ def calculate_reliability(grounding_supports: list, grounding_chunks: list, grou
                 "quote_text": quote_text,
                 "confidence": conf,
                 "authority": auth,
-                "is_verified": is_verified
+                "is_verified": record.is_verified
             })
             
             print(f"[DEBUG_EVAL] Seg {seg_idx} | Chunk {chunk_idx} | DocIdx {source_index} | Domain: {raw_domain} | Conf: {conf:.2f} | Auth: {auth:.2f} | Score: {chunk_score:.2f}")
@@ -201,32 +158,157 @@ def calculate_reliability(grounding_supports: list, grounding_chunks: list, grou
             "sources": evaluated_sources
         })
 
+    return segment_audits, used_domains, _collect_unused_sources(index, used_chunk_indices, used_domains)
+
+def _score_supports_vectorized(rows: list, index) -> tuple:
+    """
+    Same results as _score_supports_loop, computed with NumPy arrays.
+
+    Chunk attributes become per-chunk arrays, the (support, position) pairs a
+    padded confidence matrix plus validity masks; best sources, used chunks,
+    unique domains and unused sources are then array reductions. Python is
+    only used to build the per-source dicts of the response.
+    """
+    n_supports = len(rows)
+    records = index.records
+    n_chunks = len(records)
+    counts = np.fromiter((len(indices) for _, indices, _ in rows), dtype=np.int64, count=n_supports)
+    width = max(int(counts.max(initial=0)), 1)
+
+    # Per-chunk arrays, with one trailing sentinel slot that invalid positions point at
+    authority = np.zeros(n_chunks + 1, dtype=np.float64)
+    authority[:n_chunks] = [r.authority for r in records]
+    is_file = np.zeros(n_chunks + 1, dtype=bool)
+    is_file[:n_chunks] = [r.uri.startswith("file://") for r in records]
+    domain_codes = {}
+    chunk_domain = np.fromiter((domain_codes.setdefault(r.domain, len(domain_codes)) for r in records), dtype=np.int64, count=n_chunks)
+    known_domain = np.zeros(len(domain_codes) + 1, dtype=bool)
+    for domain, code in domain_codes.items():
+        known_domain[code] = bool(domain) and domain != "unknown"
+
+    # Per-support matrices: chunk index and API confidence at each position (padded)
+    chunk_matrix = np.full((n_supports, width), -1, dtype=np.int64)
+    conf_matrix = np.zeros((n_supports, width), dtype=np.float64)
+    has_conf = np.zeros((n_supports, width), dtype=bool)
+    for row, (_, indices, conf_scores) in enumerate(rows):
+        if indices:
+            chunk_matrix[row, :len(indices)] = indices
+        n_conf = min(len(conf_scores), width)
+        if n_conf:
+            conf_matrix[row, :n_conf] = conf_scores[:n_conf]
+            has_conf[row, :n_conf] = True
+
+    present = np.arange(width)[None, :] < counts[:, None]
+    valid = present & (chunk_matrix >= 0) & (chunk_matrix < n_chunks)
+    safe_chunks = np.where(valid, chunk_matrix, n_chunks)
+
+    # Default to 1.0 for files if API confidence is missing (it's user context)
+    confidence = np.where(has_conf, conf_matrix, np.where(is_file[safe_chunks], 1.0, 0.0))
+    scores = confidence * authority[safe_chunks]
+
+    # Strongest link per support: first strictly positive maximum, like the loop
+    ranked = np.where(valid, scores, -np.inf)
+    best_pos = ranked.argmax(axis=1)
+    best_scores = ranked[np.arange(n_supports), best_pos]
+    has_best = best_scores > 0.0
+    top_scores = np.where(has_best, best_scores, 0.0)
+
+    used = np.zeros(n_chunks, dtype=bool)
+    used[chunk_matrix[valid]] = True
+    used_domain_codes = np.unique(chunk_domain[used])
+    used_domain_codes = used_domain_codes[known_domain[used_domain_codes]]
+    domain_names = list(domain_codes)
+    used_domains = {domain_names[code] for code in used_domain_codes.tolist()}
+
+    # Unused sources: first unused chunk of every domain not used anywhere, in chunk order
+    unused_sources = []
+    candidates = np.flatnonzero(~used & known_domain[chunk_domain] & ~np.isin(chunk_domain, used_domain_codes))
+    if candidates.size:
+        _, first = np.unique(chunk_domain[candidates], return_index=True)
+        for chunk_idx in np.sort(candidates[first]).tolist():
+            record = records[chunk_idx]
+            unused_sources.append({"domain": record.domain, "title": record.title or 'unknown'})
+
+    # Response dicts (citation lookups once per chunk, not per pair)
+    quotes = [_quote_for(index, record) for record in records]
+    score_rows = scores.tolist()
+    conf_rows = confidence.tolist()
+    valid_rows = valid.tolist()
+    segment_audits = []
+    for row, (segment_text, indices, _) in enumerate(rows):
+        evaluated_sources = []
+        for pos, chunk_idx in enumerate(indices):
+            if not valid_rows[row][pos]:
+                continue
+            record = records[chunk_idx]
+            source_index, quote_text = quotes[chunk_idx]
+            evaluated_sources.append({
+                "id": record.citation_id,
+                "chunk_index": chunk_idx,
+                "source_index": source_index,
+                "domain": record.domain,
+                "score": score_rows[row][pos],
+                "quote_text": quote_text,
+                "confidence": conf_rows[row][pos],
+                "authority": record.authority,
+                "is_verified": record.is_verified
+            })
+        evaluated_sources.sort(key=lambda x: x['score'], reverse=True)
+        segment_audits.append({
+            "text": segment_text,
+            "top_source_domain": records[indices[best_pos[row]]].domain if has_best[row] else "unknown",
+            "top_source_score": float(top_scores[row]),
+            "sources": evaluated_sources
+        })
+
+    return segment_audits, used_domains, unused_sources
+
+def calculate_reliability(grounding_supports: list, grounding_chunks, grounding_citations: list, is_multimodal_verified: bool, ai_confidence: float = 0.0, vectorized: Optional[bool] = None) -> dict:
+    """
+    Implements the V3 Strongest Link Math Engine.
+
+    grounding_chunks may be the raw chunk list or a GroundingIndex already built
+    for the response, in which case chunk domains and authorities are reused.
+    vectorized selects the NumPy engine (same output); by default it is used
+    from RELIABILITY_VECTORIZE_MIN_SUPPORTS supports up, when NumPy is installed.
+    """
+    # EARLY EXIT: If there are no sources used, return a safe zeroed payload
+    if not grounding_supports:
+        return {
+            "reliability_score": 0.0,
+            "ai_confidence": ai_confidence,
+            "base_grounding": 0.0,
+            "consistency_bonus": 0.0,
+            "multimodal_bonus": 0.0,
+            "verdict_label": "Unverified / No Data",
+            "explanation": "No reliable search results were found to verify this claim.",
+            "segments": [],
+            "unused_sources": [] # Ensure frontend doesn't crash trying to map this
+        }
+
+    from grounding_index import GroundingIndex
+    index = grounding_chunks if isinstance(grounding_chunks, GroundingIndex) else GroundingIndex(grounding_chunks)
+
+    # URI to Source Index mapping from Citations
+    if index.citations is not grounding_citations:
+        index.attach_citations(grounding_citations)
+
+    rows = _support_rows(grounding_supports)
+    if vectorized is None:
+        vectorized = len(rows) >= RELIABILITY_VECTORIZE_MIN_SUPPORTS
+    vectorized = vectorized and _NUMPY_AVAILABLE
+
+    if vectorized:
+        segment_audits, used_domains, unused_sources = _score_supports_vectorized(rows, index)
+    else:
+        segment_audits, used_domains, unused_sources = _score_supports_loop(rows, index)
+
     # Global Average Segment Score
     if segment_audits:
         base_grounding = sum(audit["top_source_score"] for audit in segment_audits) / len(segment_audits)
     else:
         base_grounding = 0.0
 
-    # Collect unused sources
-    unused_sources = []
-    seen_unused_domains = set()
-    
-    for chunk_idx, chunk in enumerate(grounding_chunks):
-        if chunk_idx not in used_chunk_indices:
-            if hasattr(chunk, 'web') and chunk.web:
-                domain = getattr(chunk.web, 'domain', None) or extract_domain(getattr(chunk.web, 'uri', '')) or getattr(chunk.web, 'title', 'unknown')
-                title = getattr(chunk.web, 'title', 'unknown')
-            else:
-                domain = chunk.get('domain', None) or extract_domain(chunk.get('uri', '')) or chunk.get('title', 'unknown') if isinstance(chunk, dict) else 'unknown'
-                title = chunk.get('title', 'unknown') if isinstance(chunk, dict) else 'unknown'
-                
-            if domain and domain != "unknown" and domain not in used_domains and domain not in seen_unused_domains:
-                unused_sources.append({
-                    "domain": domain,
-                    "title": title
-                })
-                seen_unused_domains.add(domain)
-
     # Additive Bonuses
     consistency_bonus = 0.05 if len(used_domains) > 1 else 0.0
     multimodal_bonus = 0.05 if is_multimodal_verified else 0.0
@@ -249,9 +331,10 @@ def calculate_reliability(grounding_supports: list, grounding_chunks: list, grou
     if multimodal_bonus > 0:
          explanation += "Multimodal cross-check bonus (+0.05) applied."
 
-    print("\n[FORENSIC_AUDIT] Segment Breakdown:")
-    for idx, audit in enumerate(segment_audits):
-         print(f"[FORENSIC_AUDIT] Segment {idx} | Best Source: {audit['top_source_domain']} | Score: {audit['top_source_score']:.2f}")
+    if not vectorized:
+        print("\n[FORENSIC_AUDIT] Segment Breakdown:")
+        for idx, audit in enumerate(segment_audits):
+             print(f"[FORENSIC_AUDIT] Segment {idx} | Best Source: {audit['top_source_domain']} | Score: {audit['top_source_score']:.2f}")
     
     print(f"[FORENSIC_AUDIT] Final Base: {base_grounding:.2f} | Consistency: {consistency_bonus:.2f} | Multimodal: {multimodal_bonus:.2f}")
     print(f"[FORENSIC_AUDIT] Final Reliability Score: {final_score:.2f} ({verdict_label})\n")
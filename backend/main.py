@@ -1,12 +1,13 @@
 import os
 import re
 import json
+import asyncio
 import logging
 import base64
 import httpx
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form, responses
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 from google import genai
@@ -15,13 +16,30 @@ from google.oauth2 import service_account
 from firebase_functions import https_fn
 from firebase_admin import initialize_app
 import firebase_admin
+from werkzeug.exceptions import RequestEntityTooLarge
 
 # Import models
-from models import AnalysisRequest, AnalysisResponse, GroundingCitation, GroundingSupport
+from models import AnalysisRequest, AnalysisResponse, BatchAnalysisRequest, GroundingCitation, GroundingSupport
 
 # Import community routes
 from community_routes import router as community_router
 
+from verdict_cache import VerdictCache, build_cache_key, is_cacheable
+from gemini_gate import GeminiGate
+from single_flight import SingleFlight
+from tolerant_json import ContinuationStitcher, TolerantJsonParser
+from anchor_index import AnchorIndex
+from domain_authority import DomainRegistry
+from grounding_index import WEB, GroundingIndex
+from utf16_offsets import Utf16Offsets
+from batch_runner import run_batch, BATCH_MAX_CLAIMS, BATCH_MAX_PARALLELISM, BATCH_QUEUE_DEADLINE_SECONDS
+from rate_limiter import QuotaLimiter, RateLimitExhausted, estimate_request_tokens
+from url_fetcher import UrlFetcher, normalize_url
+from url_cache import UrlCache
+from redirect_resolver import RedirectResolver, ResolutionCache
+from forensics import ForensicRecorder, FORENSIC_DEBUG_ENABLED
+from upload_spool import RequestSizeLimitMiddleware, UploadBudget, UploadTooLarge, MAX_REQUEST_BYTES, spool_upload, spool_file_storage
+
 # --- Initialization ---
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
@@ -33,6 +51,14 @@ if not firebase_admin._apps:
 app = FastAPI(title="VeriScan Core Engine")
 genai_client = None
 _grounding_service = None
+_verdict_cache = None
+_gemini_gate = None
+_quota_limiter = None
+_analysis_flights = None
+_url_fetcher = None
+_forensic_recorder = None
+_domain_registry = None
+_redirect_resolver = None
 
 # Register community routes
 app.include_router(community_router)
@@ -44,6 +70,55 @@ def get_grounding_service():
         _grounding_service = GroundingService()
     return _grounding_service
 
+def get_verdict_cache():
+    global _verdict_cache
+    if _verdict_cache is None:
+        _verdict_cache = VerdictCache()
+    return _verdict_cache
+
+def get_gemini_gate():
+    global _gemini_gate
+    if _gemini_gate is None:
+        _gemini_gate = GeminiGate()
+    return _gemini_gate
+
+def get_quota_limiter():
+    global _quota_limiter
+    if _quota_limiter is None:
+        _quota_limiter = QuotaLimiter()
+    return _quota_limiter
+
+def get_analysis_flights():
+    global _analysis_flights
+    if _analysis_flights is None:
+        _analysis_flights = SingleFlight()
+    return _analysis_flights
+
+def get_url_fetcher():
+    global _url_fetcher
+    if _url_fetcher is None:
+        _url_fetcher = UrlFetcher(cache=UrlCache())
+    return _url_fetcher
+
+def get_forensic_recorder():
+    global _forensic_recorder
+    if _forensic_recorder is None:
+        _forensic_recorder = ForensicRecorder()
+    return _forensic_recorder
+
+def get_domain_registry():
+    global _domain_registry
+    if _domain_registry is None:
+        _domain_registry = DomainRegistry()
+        _domain_registry.start()
+    return _domain_registry
+
+def get_redirect_resolver():
+    global _redirect_resolver
+    if _redirect_resolver is None:
+        _redirect_resolver = RedirectResolver(get_url_fetcher(), cache=ResolutionCache())
+    return _redirect_resolver
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -63,6 +138,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Reject oversized /analyze bodies before multipart parsing, or mid-stream when chunked
+app.add_middleware(RequestSizeLimitMiddleware)
+
+@app.on_event("shutdown")
+async def close_url_fetcher():
+    await get_url_fetcher().aclose()
+
+@app.on_event("startup")
+async def start_domain_registry():
+    get_domain_registry()
+
+@app.on_event("shutdown")
+async def stop_domain_registry():
+    get_domain_registry().stop()
+
 @app.exception_handler(413)
 async def request_too_large_handler(request, exc):
     return JSONResponse(
@@ -112,38 +202,17 @@ def normalize_for_search(text: str) -> str:
     normalized = text.replace('\\u00b0', '°').replace('â°', '°').strip()
     return normalized
 
-def repair_and_parse_json(raw_text: str) -> dict:
-    """Aggressively cleans and parses LLM-generated JSON."""
-    if not raw_text:
-        raise ValueError("Empty response text")
-
-    # 4. Hardened Cleaning (The "Strip" Method): 
-    # Use a Regex to find the first { and the last } and ignore everything else.
-    json_match = re.search(r'\{.*\}', raw_text, re.DOTALL)
-    if not json_match:
+def parse_model_json(parser: TolerantJsonParser) -> tuple:
+    """
+    Finalizes a TolerantJsonParser fed with the model output and returns (data, repairs).
+    Raises ValueError when the output holds no usable analysis object.
+    """
+    data = parser.close()
+    if not isinstance(data, dict):
         raise ValueError("No JSON object found in text")
-
-    cleaned = json_match.group(0)
-
-    # Attempt to fix trailing commas before closing braces/brackets
-    cleaned = re.sub(r',\s*([\]}])', r'\1', cleaned)
-
-    # Fallback to targeted regex for escaping double quotes inside the "analysis" text specifically.
-    # LLMs frequently hallucinate unescaped double quotes when writing long analysis paragraphs.
-    try:
-        return json.loads(cleaned, strict=False)
-    except json.JSONDecodeError:
-        # If the first standard parse fails, let's aggressively escape just the analysis block
-        # Match "analysis": " (everything here) " , "multimodal_cross_check"
-        match = re.search(r'("analysis"\s*:\s*")(.*?)("\s*,\s*"multimodal_cross_check")', cleaned, re.DOTALL)
-        if match:
-            analysis_text = match.group(2)
-            # Escape inner quotes
-            escaped_text = analysis_text.replace('"', '\\"')
-            # Reconstruct string
-            cleaned = cleaned[:match.start(2)] + escaped_text + cleaned[match.end(2):]
-            
-        return json.loads(cleaned, strict=False)
+    if "verdict" not in data and "analysis" not in data:
+        raise ValueError("JSON object has neither verdict nor analysis")
+    return data, parser.repairs
 
 def sanitize_grounding_text(text: str) -> str:
     """Strips JSON structural fragments from cited segments using aggressive multiline logic."""
@@ -204,31 +273,64 @@ def sanitize_grounding_text(text: str) -> str:
 
 async def fetch_url_content(url: str) -> str:
     """Fetches text content from a URL."""
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            return response.text[:5000]
-    except Exception as e:
-        logger.error(f"Error fetching URL {url}: {e}")
-        return f"[Error fetching content from {url}]"
+    return await get_url_fetcher().fetch(url)
+
+GEMINI_MAX_CONTINUATIONS = int(os.getenv("GEMINI_MAX_CONTINUATIONS", "2"))
+CONTINUATION_PROMPT = (
+    "Your previous response was cut off. Continue it exactly from the last character you wrote. "
+    "Output only the remaining text of the JSON object: no preamble, no code fences, and do not repeat anything already written."
+)
 
-def normalize_url(url: str) -> str:
-    """Normalizes a URL for comparison by removing protocol, www, and trailing slashes."""
-    if not url:
+def needs_continuation(parser: TolerantJsonParser, finish_reason: Any) -> bool:
+    """
+    True when the model output stopped before its JSON object was closed and finishing
+    it is worth a round trip: the token limit was hit, or the fields the UI needs are missing.
+    Cut-off tails that already hold both are cheaper to repair in place.
+    """
+    value = parser.value
+    if parser.complete or value is None:
+        return False
+    if finish_reason == types.FinishReason.MAX_TOKENS:
+        return True
+    if finish_reason != types.FinishReason.STOP:
+        # Safety / recitation stops will not be lifted by asking again
+        return False
+    return not (isinstance(value, dict) and "verdict" in value and "analysis" in value)
+
+def chunk_text(chunk: Any) -> str:
+    """Text delta carried by one streamed response chunk (empty for metadata-only chunks)."""
+    try:
+        return chunk.text or ""
+    except Exception:
         return ""
-    # Strip protocol
-    url = re.sub(r'^https?://', '', url.lower())
-    # Strip www.
-    url = re.sub(r'^www\.', '', url)
-    # Strip trailing slash
-    url = url.rstrip('/')
-    # Strip query params/fragments for aggressive matching if needed, 
-    # but for now let's keep it simple
-    return url
-
-async def process_multimodal_gemini(gemini_parts: List[Any], request_id: str, file_names: List[str] = None) -> AnalysisResponse:
-    """Core logic to execute Gemini analysis."""
+
+def merge_stream_chunks(chunks: List[Any]) -> Any:
+    """
+    Folds generate_content_stream chunks into one response shaped like generate_content's:
+    the concatenated text, the last grounding metadata seen, and the final finish reason and usage.
+    """
+    if not chunks:
+        return types.GenerateContentResponse(candidates=[])
+    merged = chunks[-1].model_copy(deep=True)
+    if not merged.candidates:
+        return merged
+    candidate = merged.candidates[0]
+    candidate.content = types.Content(role="model", parts=[types.Part(text="".join(chunk_text(c) for c in chunks))])
+    for chunk in reversed(chunks):
+        if chunk.candidates and chunk.candidates[0].grounding_metadata:
+            candidate.grounding_metadata = chunk.candidates[0].grounding_metadata
+            break
+    return merged
+
+async def process_multimodal_gemini(gemini_parts: List[Any], request_id: str, file_names: List[str] = None, queue_deadline: Optional[float] = None, on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> AnalysisResponse:
+    """
+    Core logic to execute Gemini analysis.
+
+    queue_deadline overrides how long the call may wait for Vertex quota
+    (batch jobs wait longer than interactive requests). When on_event is given,
+    the model is called through the streaming API and staged progress events
+    (token, retry, verdict, citations, reliability) are reported as they happen.
+    """
     if not VERTEX_AI_READY:
         init_vertex()
         if not VERTEX_AI_READY:
@@ -320,59 +422,122 @@ The "analysis" string MUST be formatted in Markdown and strictly use these four
         
         import asyncio
         max_attempts = 3
+        forensic = get_forensic_recorder().start(request_id)
+        estimated_tokens = estimate_request_tokens(gemini_parts, system_instruction, config.max_output_tokens)
         
+        def _emit(event, payload):
+            if on_event:
+                on_event(event, payload)
+
+        # Streamed attempts parse chunks as they arrive; the parser is per call
+        stream_state = {}
+
+        async def _call_model(contents, call_config, call_tokens, make_sink=None):
+            """
+            One Gemini call admitted under the shared quota. With make_sink, the call is
+            streamed and every text delta goes to the sink it returns (one sink per invocation,
+            since the limiter may re-invoke after a 429).
+            """
+            async def _invoke():
+                if make_sink is None:
+                    return await get_gemini_gate().run(
+                        genai_client.models.generate_content,
+                        model="gemini-2.0-flash",
+                        contents=contents,
+                        config=call_config
+                    )
+                sink = make_sink()
+                chunks = await get_gemini_gate().stream(
+                    genai_client.models.generate_content_stream,
+                    lambda chunk: sink(chunk_text(chunk)),
+                    model="gemini-2.0-flash",
+                    contents=contents,
+                    config=call_config
+                )
+                return merge_stream_chunks(chunks)
+
+            # 429s are retried with jittered backoff inside the limiter and never consume a parse attempt
+            return await get_quota_limiter().run(_invoke, estimated_tokens=call_tokens, timeout=queue_deadline)
+
+        def _attempt_sink():
+            parser = stream_state["parser"] = TolerantJsonParser()
+
+            def _sink(text):
+                if text:
+                    parser.feed(text)
+                    _emit("token", {"text": text})
+            return _sink
+
+        # Continuations resend only the text prompt: the files were already read in the
+        # first turn, and the partial answer carries everything the model derived from them.
+        # No search tool either, so the first response's grounding metadata stays authoritative.
+        continuation_config = types.GenerateContentConfig(
+            system_instruction=system_instruction,
+            temperature=0.0,
+            max_output_tokens=config.max_output_tokens
+        )
+        prompt_text = [p for p in gemini_parts if isinstance(p, str)]
+        if len(prompt_text) < len(gemini_parts):
+            prompt_text.append("(The attached files were analyzed in your previous turn.)")
+
+        async def _continue(previous_text, parser):
+            """Asks the model to resume a cut-off answer and feeds the stitched text into parser."""
+            stitched = []
+
+            def _make_sink():
+                stitcher = ContinuationStitcher(previous_text)
+
+                def _sink(text):
+                    text = stitcher.feed(text) if text is not None else stitcher.flush()
+                    if text:
+                        stitched.append(text)
+                        parser.feed(text)
+                        _emit("token", {"text": text})
+                stream_state["continuation_sink"] = _sink
+                return _sink
+
+            contents = [
+                types.Content(role="user", parts=[types.Part(text=t) for t in prompt_text]),
+                types.Content(role="model", parts=[types.Part(text=previous_text)]),
+                types.Content(role="user", parts=[types.Part(text=CONTINUATION_PROMPT)]),
+            ]
+            call_tokens = estimate_request_tokens(prompt_text + [previous_text], system_instruction, config.max_output_tokens)
+            if on_event:
+                continued = await _call_model(contents, continuation_config, call_tokens, make_sink=_make_sink)
+            else:
+                continued = await _call_model(contents, continuation_config, call_tokens)
+                _make_sink()(chunk_text(continued))
+            stream_state.pop("continuation_sink")(None)
+            continued_reason = continued.candidates[0].finish_reason if continued.candidates else "UNKNOWN"
+            return "".join(stitched), continued_reason
+
         # We wrap both the API call AND the JSON parsing in a retry loop
         for attempt in range(1, max_attempts + 1):
             response = None
+            stream_state.pop("parser", None)
+            if attempt > 1:
+                # Streamed tokens from the failed attempt should be discarded by the client
+                _emit("retry", {"attempt": attempt})
             try:
-                # Execute the call using genai_client
-                response = genai_client.models.generate_content(
-                    model="gemini-2.0-flash",
-                    contents=gemini_parts,
-                    config=config
+                response = await _call_model(gemini_parts, config, estimated_tokens, make_sink=_attempt_sink if on_event else None)
+            except RateLimitExhausted as e:
+                logger.error(f"Rate limit exhausted: {e}")
+                return AnalysisResponse(
+                    verdict="RATE_LIMIT_ERROR",
+                    confidence_score=0.0,
+                    analysis="**1. System Status:**\nThe fact-checking system is currently experiencing high load. Please wait a moment before submitting another claim.",
+                    grounding_citations=[]
                 )
-            except Exception as e:
-                error_str = str(e)
-                if "429" in error_str or "ResourceExhausted" in error_str or "Quota" in error_str:
-                    logger.warning(f"Rate limit hit (429). Retrying... (Attempt {attempt}/{max_attempts})")
-                    if attempt == 1:
-                        await asyncio.sleep(2)
-                        continue
-                    elif attempt == 2:
-                        await asyncio.sleep(4)
-                        continue
-                    else:
-                        logger.error("Rate limit exhausted after 3 attempts.")
-                        return AnalysisResponse(
-                            verdict="RATE_LIMIT_ERROR",
-                            confidence_score=0.0,
-                            analysis="**1. System Status:**\nThe fact-checking system is currently experiencing high load. Please wait a moment before submitting another claim.",
-                            grounding_citations=[]
-                        )
-                else:
-                    raise e
                     
-            # DEBUG: Print raw response to console for deep inspection
-            print("\n[DEBUG] RAW RESPONSE METADATA:")
-            if response.candidates:
-                if response.candidates[0].grounding_metadata:
-                    print(f"Grounding Metadata Attributes: {dir(response.candidates[0].grounding_metadata)}")
-                    print(f"Grounding Metadata Dump: {response.candidates[0].grounding_metadata.model_dump_json(indent=2)}")
-            
-            # Forensic Audit: Write the entire grounding metadata object to a file for review
-            import os
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-            dump_path = os.path.join(base_dir, "grounding_metadata_dump.json")
-            if response.candidates and response.candidates[0].grounding_metadata:
-                # Convert the Pydantic model to a dict, then to a pretty string
-                metadata_json = response.candidates[0].grounding_metadata.model_dump_json(indent=2)
-                with open(dump_path, "w") as f:
-                    f.write(metadata_json)
-                print(f"\n[FORENSIC] Grounding metadata dumped to {dump_path}\n")
-            else:
-                with open(dump_path, "w") as f:
-                    f.write('{"error": "NO GROUNDING METADATA FOUND"}')
-                print("NO GROUNDING METADATA FOUND IN RESPONSE")
+            # Forensic Audit: capture the entire grounding metadata object for review (written off-thread)
+            grounding_metadata = response.candidates[0].grounding_metadata if response.candidates else None
+            if forensic.sampled:
+                if grounding_metadata:
+                    forensic.capture("grounding_metadata", grounding_metadata.model_dump_json(indent=2))
+                else:
+                    forensic.capture("grounding_metadata", '{"error": "NO GROUNDING METADATA FOUND"}')
+            if not grounding_metadata:
+                logger.warning("NO GROUNDING METADATA FOUND IN RESPONSE")
 
             try:
                 response_text = response.text or ""
@@ -380,34 +545,51 @@ The "analysis" string MUST be formatted in Markdown and strictly use these four
                 response_text = ""
                 
             finish_reason = response.candidates[0].finish_reason if response.candidates else "UNKNOWN"
-            print(f"[DEBUG] Finish Reason: {finish_reason}")
-            print("\n" + "="*50)
-            print(f"[DEBUG] Raw Model Text:\n{response_text}")
-            print("="*50 + "\n")
+            logger.debug(f"Finish Reason: {finish_reason}\nRaw Model Text:\n{response_text}")
             
             try:
-                # Use our aggressive cleaner
-                data = repair_and_parse_json(response_text)
+                # Single tolerant pass: quotes, commas and cut-off tails are repaired in place
+                parser = stream_state.get("parser")
+                if parser is None:
+                    parser = TolerantJsonParser()
+                    parser.feed(response_text)
+
+                # Truncation recovery: resume from where the output stopped instead of regenerating
+                continuations = 0
+                while continuations < GEMINI_MAX_CONTINUATIONS and needs_continuation(parser, finish_reason):
+                    continuations += 1
+                    logger.warning(f"Model output truncated ({finish_reason}, parser in {parser.state}). Requesting continuation {continuations}.")
+                    try:
+                        continued_text, finish_reason = await _continue(response_text, parser)
+                    except RateLimitExhausted:
+                        logger.warning("No quota left for a continuation; repairing the partial output instead.")
+                        break
+                    response_text += continued_text
+
+                data, repairs = parse_model_json(parser)
+                if continuations:
+                    repairs["continuations"] = continuations
+                if repairs:
+                    logger.info(f"Model JSON repaired on attempt {attempt}: {repairs}")
                 
                 # Debug Dump: Model Output JSON
-                output_dump_path = os.path.join(base_dir, "model_output_dump.json")
-                with open(output_dump_path, "w") as f:
-                    json.dump(data, f, indent=2)
-                print(f"[FORENSIC] Model output dumped to {output_dump_path}")
+                if forensic.sampled:
+                    forensic.capture("model_output", json.dumps({"repairs": repairs, "data": data}, indent=2))
 
                 is_multimodal_verified = data.get("multimodal_cross_check", False)
+                _emit("verdict", {"verdict": data.get("verdict"), "confidence_score": data.get("confidence_score", 0.0)})
                 break # Success! Exit the loop
                 
             except Exception as e:
                 logger.error(f"[JSON PARSE ERROR on Attempt {attempt}] {e}")
                 
-                # FORENSIC DUMP: Save the exact string that broke the parser
-                dump_path = os.path.join(base_dir, f"failed_json_dump_attempt_{attempt}.txt")
-                with open(dump_path, "w", encoding="utf-8") as f:
-                    f.write(f"ERROR: {str(e)}\n")
-                    f.write("="*50 + "\n")
-                    f.write(response_text or "NONE")
-                print(f"[FORENSIC] Broken JSON dumped to {dump_path}")
+                # FORENSIC DUMP: Save the exact string that broke the parser (never sampled out)
+                forensic.capture(
+                    f"failed_json_attempt_{attempt}",
+                    f"ERROR: {str(e)}\n" + "="*50 + "\n" + (response_text or "NONE"),
+                    always=True,
+                    extension="txt",
+                )
                 
                 if attempt < max_attempts:
                     logger.warning("JSON severed or hallucinated. Retrying prompt.")
@@ -424,35 +606,29 @@ The "analysis" string MUST be formatted in Markdown and strictly use these four
                         grounding_citations=[]
                     )
         
-        grounding_citations_fallback = []
-        if response and response.candidates and response.candidates[0].grounding_metadata:
-            chunks = getattr(response.candidates[0].grounding_metadata, 'grounding_chunks', []) or []
-            if chunks:
-                for i, chunk_obj in enumerate(chunks):
-                    web_node = getattr(chunk_obj, 'web', None)
-                    if web_node:
-                        title = getattr(web_node, 'title', getattr(web_node, 'domain', "Unknown Source"))
-                        uri = getattr(web_node, 'uri', "No source link available")
-                        grounding_citations_fallback.append(GroundingCitation(
-                            id=i + 1,
-                            title=title,
-                            url=uri,
-                            snippet=title # Fallback snippet if LLM fails
-                        ))
+        # Grounding URIs are opaque redirects; resolve them (bounded by a time budget) so domains are real
+        grounding_chunks = GroundingIndex.chunks_of(response)
+        try:
+            resolved_uris = await get_redirect_resolver().resolve_many(GroundingIndex.web_uris(grounding_chunks))
+        except Exception as e:
+            logger.warning(f"Redirect resolution skipped: {e}")
+            resolved_uris = {}
+
+        # One walk over the grounding chunks; every stage below reads these records
+        grounding_index = GroundingIndex(grounding_chunks, resolved_uris)
+
+        grounding_citations_fallback = [
+            GroundingCitation(
+                id=record.citation_id,
+                title=record.title or record.domain or "Unknown Source",
+                url=record.uri or "No source link available",
+                snippet=record.title or record.domain or "Unknown Source" # Fallback snippet if LLM fails
+            )
+            for record in grounding_index.records if record.kind == WEB
+        ]
 
         if not data.get("grounding_citations") and grounding_citations_fallback:
              data["grounding_citations"] = [g.model_dump() for g in grounding_citations_fallback]
-        
-        # Prepare a URI to ID map from grounding chips
-        uri_to_id = {}
-        if response and response.candidates and response.candidates[0].grounding_metadata:
-            chunks = getattr(response.candidates[0].grounding_metadata, 'grounding_chunks', []) or []
-            for i, chunk_obj in enumerate(chunks):
-                web_node = getattr(chunk_obj, 'web', None)
-                if web_node:
-                    uri = getattr(web_node, 'uri', "")
-                    if uri:
-                        uri_to_id[normalize_url(uri)] = i + 1
 
         # Final Sanitization: Attach correct IDs to citations
         sanitized_citations = []
@@ -475,8 +651,7 @@ The "analysis" string MUST be formatted in Markdown and strictly use these four
                     gc["title"] = matched_file or "Untitled Source"
                 
                 # Assign ID based on URL match with master chunks
-                norm_url = normalize_url(gc.get("url", ""))
-                gc["id"] = uri_to_id.get(norm_url, 0) # 0 if not found in master chunks
+                gc["id"] = grounding_index.citation_id_for(gc.get("url", "")) # 0 if not found in master chunks
                 
                 if gc.get("snippet"):
                     gc["snippet"] = sanitize_grounding_text(gc["snippet"])
@@ -497,49 +672,39 @@ The "analysis" string MUST be formatted in Markdown and strictly use these four
         data["grounding_citations"] = sanitized_citations
 
         # --- Populate Scanned Sources ---
-        scanned_sources = []
-        if response and response.candidates and response.candidates[0].grounding_metadata:
-            chunks = getattr(response.candidates[0].grounding_metadata, 'grounding_chunks', []) or []
-            cited_urls = {normalize_url(gc.get("url")) for gc in sanitized_citations if gc.get("url")}
-            
-            seen_urls = set()
-            for i, chunk_obj in enumerate(chunks):
-                web_node = getattr(chunk_obj, 'web', None)
-                if web_node:
-                    title = getattr(web_node, 'title', "Untitled Source")
-                    uri = getattr(web_node, 'uri', "")
-                    norm_uri = normalize_url(uri)
-                    if not uri or norm_uri in seen_urls:
-                        continue
-                    
+        grounding_index.attach_citations(sanitized_citations)
+        cited_urls = {normalize_url(gc.get("url")) for gc in sanitized_citations if gc.get("url")}
+        web_records = grounding_index.web_records()
+        scanned_sources = [
+            ScannedSource(
+                id=record.citation_id, # Unified Rule: ID = chunk_index + 1
+                title=record.title or "Untitled Source",
+                url=record.uri,
+                is_cited=record.normalized_uri in cited_urls
+            ).model_dump()
+            for record in web_records
+        ]
+        seen_urls = {record.normalized_uri for record in web_records}
+
+        # Add fallback scanned sources for referenced but non-web chunks (files)
+        for record in grounding_index.file_records():
+            # This might be a file grounding. Match its citation by ID.
+            citation = grounding_index.citation(record.citation_id)
+            if citation and citation.get("source_file"):
+                filename = citation["source_file"]
+                uri = f"file://{filename}"
+                norm_uri = normalize_url(uri)
+                if norm_uri not in seen_urls:
                     seen_urls.add(norm_uri)
                     scanned_sources.append(ScannedSource(
-                        id=i + 1, # Unified Rule: ID = chunk_index + 1
-                        title=title,
+                        id=record.citation_id,
+                        title=filename,
                         url=uri,
-                        is_cited=norm_uri in cited_urls
+                        is_cited=True
                     ).model_dump())
-            
-            # Add fallback scanned sources for referenced but non-web chunks (files)
-            for i, chunk_obj in enumerate(chunks):
-                if not hasattr(chunk_obj, 'web') or not chunk_obj.web:
-                    # This might be a file grounding. Try to find a matching citation by ID.
-                    chunk_id = i + 1
-                    citation = next((c for c in sanitized_citations if c.get("id") == chunk_id), None)
-                    if citation and citation.get("source_file"):
-                        filename = citation["source_file"]
-                        uri = f"file://{filename}"
-                        norm_uri = normalize_url(uri)
-                        if norm_uri not in seen_urls:
-                            seen_urls.add(norm_uri)
-                            scanned_sources.append(ScannedSource(
-                                id=chunk_id,
-                                title=filename,
-                                url=uri,
-                                is_cited=True
-                            ).model_dump())
         
         data["scanned_sources"] = scanned_sources
+        _emit("citations", {"grounding_citations": sanitized_citations, "scanned_sources": scanned_sources})
 
         service_sources = []
         final_citations = data.get("grounding_citations", [])
@@ -558,8 +723,11 @@ The "analysis" string MUST be formatted in Markdown and strictly use these four
             })
         
         
+        # UTF-16 offsets of the analysis, shared by segmentation and anchor re-indexing
+        analysis_offsets = Utf16Offsets(data.get("analysis", ""))
+
         grounding_service = get_grounding_service()
-        grounding_result = grounding_service.process(data.get("analysis", ""), service_sources)
+        grounding_result = grounding_service.process(analysis_offsets.text, service_sources, analysis_offsets)
         grounding_supports_heuristic = grounding_result.get("groundingSupports", [])
         
         # Phase 2: Math Engine Integration
@@ -611,22 +779,18 @@ The "analysis" string MUST be formatted in Markdown and strictly use these four
             final_supports = api_supports if api_supports else grounding_supports_heuristic
             data["grounding_supports"] = final_supports
             
-            # Grounding chunks (Sources)
-            grounding_chunks = []
-            if response and response.candidates and response.candidates[0].grounding_metadata.grounding_chunks:
-                grounding_chunks = response.candidates[0].grounding_metadata.grounding_chunks
-            
             import sys
             sys.stdout.flush()
             
             reliability_metrics = calculate_reliability(
                 final_supports, 
-                grounding_chunks, 
+                grounding_index, 
                 data.get("grounding_citations", []),
                 is_multimodal_verified,
                 ai_confidence=float(data.get("confidence_score", 0.0))
             )
             data["reliability_metrics"] = reliability_metrics
+            _emit("reliability", {"reliability_metrics": reliability_metrics})
             
             # Map VERDICT label back explicitly if not present or for engine-driven overrides if specifically requested
             # However, per user request, we now let the model provide the top-level verdict/score
@@ -663,28 +827,20 @@ The "analysis" string MUST be formatted in Markdown and strictly use these four
         # Phase 3: Fuzzy Anchor Re-indexing
         # After citation brackets are injected (in standardize_analysis or similar),
         # we must find the strings again to ensure UI highlights are accurate.
+        # Every anchor (exact, then fingerprint, then keyword fallback) is resolved in one scan,
+        # and offsets are reported in UTF-16 units for the Flutter client.
         clean_analysis = normalize_for_search(sanitized_analysis)
-        for support in data.get("grounding_supports", []):
-            segment = support.get("segment", {})
-            anchor_text = segment.get("text", "")
-            if not anchor_text:
-                continue
-            
-            clean_anchor = normalize_for_search(anchor_text)
-            
-            # 1. Try Exact Match in normalized text
-            new_start = clean_analysis.find(clean_anchor)
-            
-            # 2. Try Partial Match (Fingerprint) if exact fails
-            if new_start == -1:
-                # Use first 20 chars as unique fingerprint to avoid bracket collisions
-                fingerprint = clean_anchor[:min(len(clean_anchor), 20)]
-                if len(fingerprint) >= 5: # Ensure fingerprint is meaningful
-                    new_start = clean_analysis.find(fingerprint)
-            
-            if new_start != -1:
-                segment["startIndex"] = new_start
-                segment["endIndex"] = new_start + len(anchor_text) # Use original length for indexing
+        anchored_segments = [
+            support.get("segment", {}) for support in data.get("grounding_supports", [])
+            if support.get("segment", {}).get("text")
+        ]
+        anchor_matches = AnchorIndex(clean_analysis, analysis_offsets).locate_all(
+            [normalize_for_search(segment["text"]) for segment in anchored_segments]
+        )
+        for segment, match in zip(anchored_segments, anchor_matches):
+            if match is not None:
+                segment["startIndex"] = match.utf16_start
+                segment["endIndex"] = match.utf16_end
 
         final_response = AnalysisResponse(
             verdict=data.get("verdict", "UNVERIFIABLE"),
@@ -734,75 +890,216 @@ async def root():
 async def health_check():
     return {"status": "healthy", "vertex_ai_configured": VERTEX_AI_READY}
 
-@app.post("/analyze", response_model=AnalysisResponse)
-async def analyze_endpoint(
-    files: Optional[List[UploadFile]] = File(None),
-    metadata: str = Form(...)
-):
-    try:
-        try:
-            meta_data = json.loads(metadata)
-        except json.JSONDecodeError:
-            # Fallback for simple form data (legacy support for Android)
-            meta_data = {"text_claim": metadata}
-        
-        request_id = meta_data.get("request_id", "unknown")
-        text_claim = meta_data.get("text_claim")
-        provided_url = meta_data.get("url")
-        provided_urls = meta_data.get("urls", [])
-        
-        gemini_parts = []
+@app.get("/metrics")
+async def metrics():
+    """Process-local performance counters."""
+    return {
+        "verdict_cache": get_verdict_cache().stats(),
+        "gemini_gate": get_gemini_gate().stats(),
+        "rate_limiter": get_quota_limiter().stats(),
+        "single_flight": get_analysis_flights().stats(),
+        "url_cache": get_url_fetcher().cache.stats(),
+        "forensics": get_forensic_recorder().stats(),
+        "verified_domains": get_domain_registry().stats(),
+        "redirect_resolver": get_redirect_resolver().stats(),
+    }
+
+@app.get("/debug/forensics")
+async def debug_forensics(limit: int = 20):
+    """Most recent forensic captures (disabled unless FORENSIC_DEBUG_ENABLED=true)."""
+    if not FORENSIC_DEBUG_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return {"captures": get_forensic_recorder().recent(limit)}
+
+async def analyze_content(request_id: str, text_claim: Optional[str], urls: List[str], spooled_files: List[Any] = None, file_notes: str = "", file_names: List[str] = None, file_digests: List[Any] = None, queue_deadline: Optional[float] = None, on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> AnalysisResponse:
+    """
+    Shared analysis pipeline behind /analyze, /analyze/batch, /analyze/stream and the
+    Cloud Function: verdict cache lookup, in-flight coalescing, URL fetching, then the Gemini call.
+    """
+    spooled_files = spooled_files or []
+    file_digests = file_digests or []
+    # Keeps the verified signatory list polled on the Cloud Function path too (no startup events there)
+    get_domain_registry()
+
+    # Verdict cache: identical claim + URLs + file bytes skip the LLM round trip entirely
+    cache_key = build_cache_key(text_claim, [normalize_url(u) for u in urls], file_digests)
+    # The disk tier is SQLite: lookups and stores run off the event loop
+    cached = await asyncio.to_thread(get_verdict_cache().get, cache_key)
+    if cached is not None:
+        logger.info(f"Verdict cache hit for {request_id} ({cache_key[:12]})")
+        return cached
+
+    async def _analyze():
         prompt_content = "Analyze the following parts (Text, Images, Documents, URLs):\n\n"
         
         if text_claim:
             prompt_content += f"TEXT CLAIM: {text_claim}\n"
         
-        # Process URLs (using helper from Main)
-        if provided_url:
-            content = await fetch_url_content(provided_url)
-            prompt_content += f"URL CONTENT (from {provided_url}):\n{content}\n"
+        # Process URLs concurrently over the shared client pool (duplicates fetched once)
+        fetched = await get_url_fetcher().fetch_many(urls)
+        for item in fetched:
+            prompt_content += f"URL CONTENT (from {item.url}):\n{item.content}\n"
+        if on_event and fetched:
+            on_event("urls_fetched", {"urls": [item.url for item in fetched]})
         
-        for url in provided_urls:
-            content = await fetch_url_content(url)
-            prompt_content += f"URL CONTENT (from {url}):\n{content}\n"
+        prompt_content += file_notes
+        # Payloads are only materialized from the spool on a cache miss
+        file_parts = [types.Part.from_bytes(data=u.read_payload(), mime_type=u.mime_type) for u in spooled_files]
+        gemini_parts = [prompt_content] + file_parts
         
-        total_size = len(metadata)
-        file_names = []
-        if files:
-            for file in files:
-                file_bytes = await file.read()
-                file_size = len(file_bytes)
-                
-                if file_size > 10 * 1024 * 1024:
-                    raise HTTPException(status_code=413, detail=f"File {file.filename} exceeds 10MB limit.")
-                
-                total_size += file_size
-                file_names.append(file.filename)
-                mime_type = file.content_type or "application/octet-stream"
-                part_args = {"data": file_bytes, "mime_type": mime_type}
-                
-                if "image" in mime_type:
-                    gemini_parts.append(types.Part.from_bytes(**part_args))
-                    prompt_content += f"[Image Attached: {file.filename} ({mime_type})]\n"
-                elif mime_type == "application/pdf":
-                    gemini_parts.append(types.Part.from_bytes(**part_args))
-                    prompt_content += f"[PDF Document Attached (Medium Resolution): {file.filename}]\n"
-                else:
-                    logger.warning(f"Unsupported file type: {mime_type}")
+        # Call the core logic function
+        result = await process_multimodal_gemini(gemini_parts, request_id, file_names, queue_deadline=queue_deadline, on_event=on_event)
+        # The key only covers the URLs, not their content: a verdict reached without a page must not be pinned
+        failed = [item.url for item in fetched if not item.ok]
+        if failed:
+            logger.info(f"Not caching verdict for {request_id}: could not fetch {failed}")
+        else:
+            await asyncio.to_thread(get_verdict_cache().put, cache_key, result)
+        return result
 
-        if total_size > 20 * 1024 * 1024:
-             raise HTTPException(status_code=413, detail="Total payload size exceeds 20MB limit.")
+    # Identical submissions arriving while this one is in flight share its result
+    return await get_analysis_flights().run(cache_key, _analyze)
 
-        gemini_parts.insert(0, prompt_content)
+def parse_analyze_metadata(metadata: str):
+    """Returns (request_id, text_claim, urls) from the /analyze metadata form field."""
+    try:
+        meta_data = json.loads(metadata)
+    except json.JSONDecodeError:
+        # Fallback for simple form data (legacy support for Android)
+        meta_data = {"text_claim": metadata}
+    
+    request_id = meta_data.get("request_id", "unknown")
+    text_claim = meta_data.get("text_claim")
+    provided_url = meta_data.get("url")
+    provided_urls = meta_data.get("urls", [])
+    all_urls = ([provided_url] if provided_url else []) + list(provided_urls)
+    return request_id, text_claim, all_urls
+
+async def spool_form_files(files: Optional[List[UploadFile]], metadata_bytes: int):
+    """
+    Streams uploads in chunks against a running budget; they stay in their spool files.
+    Returns (spooled_files, file_notes, file_names, file_digests) for the supported types.
+    """
+    budget = UploadBudget(initial_bytes=metadata_bytes)
+    file_names = []
+    spooled_files = []
+    file_notes = ""
+    file_digests = []
+    for file in files or []:
+        upload = await spool_upload(file, budget)
+        file_names.append(upload.filename)
+        mime_type = upload.mime_type
         
-        # Call the core logic function
-        return await process_multimodal_gemini(gemini_parts, request_id, file_names)
+        if "image" in mime_type:
+            file_notes += f"[Image Attached: {upload.filename} ({mime_type})]\n"
+        elif mime_type == "application/pdf":
+            file_notes += f"[PDF Document Attached (Medium Resolution): {upload.filename}]\n"
+        else:
+            logger.warning(f"Unsupported file type: {mime_type}")
+            continue
+        spooled_files.append(upload)
+        file_digests.append((upload.sha256, mime_type))
+    return spooled_files, file_notes, file_names, file_digests
+
+@app.post("/analyze", response_model=AnalysisResponse)
+async def analyze_endpoint(
+    files: Optional[List[UploadFile]] = File(None),
+    metadata: str = Form(...)
+):
+    try:
+        request_id, text_claim, all_urls = parse_analyze_metadata(metadata)
+        
+        # Files are validated first: their digests are part of the verdict cache key.
+        spooled_files, file_notes, file_names, file_digests = await spool_form_files(files, len(metadata))
+        return await analyze_content(request_id, text_claim, all_urls, spooled_files, file_notes, file_names, file_digests)
         
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def format_sse(event: str, payload: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+@app.post("/analyze/stream")
+async def analyze_stream_endpoint(
+    files: Optional[List[UploadFile]] = File(None),
+    metadata: str = Form(...)
+):
+    """
+    Server-sent-events variant of /analyze. Emits staged events as the pipeline
+    progresses: accepted, urls_fetched, token (streamed model text), retry,
+    verdict, citations, reliability, and finally result, whose data is the same
+    AnalysisResponse /analyze returns (or error).
+    """
+    # Uploads are validated before the stream opens so size errors still map to 413
+    try:
+        request_id, text_claim, all_urls = parse_analyze_metadata(metadata)
+        spooled_files, file_notes, file_names, file_digests = await spool_form_files(files, len(metadata))
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    events: "asyncio.Queue[tuple]" = asyncio.Queue()
+
+    def _on_event(event, payload):
+        events.put_nowait((event, payload))
+
+    async def _run():
+        try:
+            result = await analyze_content(request_id, text_claim, all_urls, spooled_files, file_notes, file_names, file_digests, on_event=_on_event)
+            _on_event("result", result.model_dump())
+        except Exception as e:
+            logger.error(f"Streaming analysis failed for {request_id}: {e}")
+            _on_event("error", {"detail": str(e)})
+
+    async def _stream():
+        yield format_sse("accepted", {"request_id": request_id, "files": file_names, "urls": all_urls})
+        task = asyncio.ensure_future(_run())
+        try:
+            while True:
+                event, payload = await events.get()
+                yield format_sse(event, payload)
+                if event in ("result", "error"):
+                    break
+        finally:
+            # Client went away: stop the analysis rather than finishing it for nobody
+            task.cancel()
+
+    return StreamingResponse(_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/analyze/batch")
+async def analyze_batch_endpoint(batch: BatchAnalysisRequest):
+    """
+    Bulk re-check of text/URL claims, streamed back as NDJSON in completion order.
+    Every line carries the claim's index; a failed claim yields an error line
+    instead of aborting the batch, and a rate-limited or system-error result is
+    marked "retryable".
+    """
+    if not batch.claims:
+        raise HTTPException(status_code=400, detail="Batch contains no claims.")
+    if len(batch.claims) > BATCH_MAX_CLAIMS:
+        raise HTTPException(status_code=400, detail=f"Batch exceeds {BATCH_MAX_CLAIMS} claims.")
+    parallelism = min(batch.parallelism or BATCH_MAX_PARALLELISM, BATCH_MAX_PARALLELISM)
+
+    async def _analyze_claim(index, claim):
+        request_id = claim.request_id or f"batch_{index}"
+        if not claim.text_claim and not claim.urls:
+            raise ValueError("Claim has neither text_claim nor urls.")
+        result = await analyze_content(request_id, claim.text_claim, claim.urls, queue_deadline=BATCH_QUEUE_DEADLINE_SECONDS)
+        outcome = {"request_id": request_id, "result": result.model_dump()}
+        if not is_cacheable(result):
+            # Not a verdict (quota, system error): the job must resubmit this claim
+            outcome["status"] = "retryable"
+        return outcome
+
+    async def _stream():
+        async for outcome in run_batch(batch.claims, _analyze_claim, parallelism):
+            yield json.dumps(outcome) + "\n"
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
 # --- Firebase Cloud Function Wrapper (From Main Branch) ---
 # This allows deployment to Google Cloud Functions
 @https_fn.on_request(
@@ -897,6 +1194,8 @@ def analyze(req: https_fn.Request) -> https_fn.Response:
     import traceback
     
     try:
+        # Werkzeug enforces this on Content-Length and while streaming the multipart body
+        req.max_content_length = MAX_REQUEST_BYTES
         metadata_str = req.form.get("metadata")
         if not metadata_str:
              return https_fn.Response(json.dumps({"error": "Missing metadata field"}), status=400, mimetype='application/json')
@@ -907,35 +1206,31 @@ def analyze(req: https_fn.Request) -> https_fn.Response:
         text_claim = meta_data.get("text_claim", "")
         provided_urls = meta_data.get("urls", [])
         
-        gemini_parts = []
-        prompt_content = f"Analyze the following parts (Text, Images, Documents, URLs):\n\nTEXT CLAIM: {text_claim}\n"
-        
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         
         async def _run():
-            nonlocal prompt_content
-            for url in provided_urls:
-                content = await fetch_url_content(url)
-                prompt_content += f"URL CONTENT (from {url}):\n{content}\n"
-            
+            budget = UploadBudget(initial_bytes=len(metadata_str))
             file_names = []
+            spooled_files = []
+            file_notes = ""
+            file_digests = []
             for key in req.files:
                 for f in req.files.getlist(key):
-                    file_bytes = f.read()
-                    if not file_bytes: continue
-                    file_names.append(f.filename)
-                    mime_type = f.content_type or "application/octet-stream"
-                    part_args = {"data": file_bytes, "mime_type": mime_type}
+                    upload = spool_file_storage(f, budget)
+                    if not upload.size: continue
+                    file_names.append(upload.filename)
+                    mime_type = upload.mime_type
                     if "image" in mime_type:
-                        gemini_parts.append(types.Part.from_bytes(**part_args))
-                        prompt_content += f"[Image Attached: {f.filename}]\n"
+                        file_notes += f"[Image Attached: {upload.filename}]\n"
                     elif mime_type == "application/pdf":
-                        gemini_parts.append(types.Part.from_bytes(**part_args))
-                        prompt_content += f"[PDF Document Attached: {f.filename}]\n"
+                        file_notes += f"[PDF Document Attached: {upload.filename}]\n"
+                    else:
+                        continue
+                    spooled_files.append(upload)
+                    file_digests.append((upload.sha256, mime_type))
 
-            gemini_parts.insert(0, prompt_content)
-            return await process_multimodal_gemini(gemini_parts, request_id, file_names)
+            return await analyze_content(request_id, text_claim, provided_urls, spooled_files, file_notes, file_names, file_digests)
 
         try:
             result = loop.run_until_complete(_run())
@@ -946,8 +1241,13 @@ def analyze(req: https_fn.Request) -> https_fn.Response:
                 headers={'Access-Control-Allow-Origin': '*'}
             )
         finally:
+            # The pooled HTTP client is bound to this request's loop
+            loop.run_until_complete(get_url_fetcher().aclose())
             loop.close()
 
+    except (UploadTooLarge, RequestEntityTooLarge) as e:
+        detail = str(e) if isinstance(e, UploadTooLarge) else "Total payload size exceeds upload limit."
+        return https_fn.Response(json.dumps({"error": detail}), status=413, mimetype='application/json', headers={'Access-Control-Allow-Origin': '*'})
     except Exception as e:
         error_msg = f"ERROR: {str(e)}\n{traceback.format_exc()}"
         logger.error(f"Function Execution Error: {error_msg}")
@@ -1,4 +1,4 @@
-from typing import List, Optional, Literal
+from typing import Any, Dict, List, Optional, Literal
 from pydantic import BaseModel, Field
 
 class SourceMetadata(BaseModel):
@@ -7,6 +7,7 @@ class SourceMetadata(BaseModel):
     page_title: Optional[str] = None
 
 class GroundingCitation(BaseModel):
+    id: int = 0
     title: str = ""
     url: Optional[str] = ""
     snippet: str = ""
@@ -43,6 +44,15 @@ class AnalysisRequest(BaseModel):
     parts: List[InputPart]
     settings: Optional[AnalysisSettings] = Field(default_factory=AnalysisSettings)
 
+class BatchClaim(BaseModel):
+    request_id: Optional[str] = None
+    text_claim: Optional[str] = None
+    urls: List[str] = []
+
+class BatchAnalysisRequest(BaseModel):
+    claims: List[BatchClaim]
+    parallelism: Optional[int] = None
+
 class Source(BaseModel):
     id: str
     title: str
@@ -51,11 +61,21 @@ class Source(BaseModel):
     source_context: str
     favicon_url: Optional[str] = None
 
+class ScannedSource(BaseModel):
+    id: int
+    title: str
+    url: str
+    is_cited: bool = False
+
 class AnalysisResponse(BaseModel):
-    verdict: Literal["REAL", "FAKE", "MISLEADING", "UNVERIFIED"]
+    # TRUE ... NOT_A_CLAIM tiers, plus RATE_LIMIT_ERROR / RECOVERING_FROM_HALLUCINATION status codes
+    verdict: str
     confidence_score: float
     analysis: str = Field(..., description="2-3 sentences explaining the 'why'")
-    key_findings: List[str]
+    key_findings: List[str] = []
+    multimodal_cross_check: bool = False
+    reliability_metrics: Optional[Dict[str, Any]] = None
+    scanned_sources: List[ScannedSource] = []
     source_metadata: Optional[SourceMetadata] = None
     grounding_citations: List[GroundingCitation] = []
     grounding_supports: List[GroundingSupport] = []
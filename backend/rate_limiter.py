@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+VERTEX_QPM = float(os.getenv("VERTEX_QPM", "60"))  # 0 disables request-based limiting
+VERTEX_TPM = float(os.getenv("VERTEX_TPM", "0"))  # 0 disables token-based limiting
+VERTEX_BURST = int(os.getenv("VERTEX_BURST", "5"))
+GEMINI_QUEUE_DEADLINE_SECONDS = float(os.getenv("GEMINI_QUEUE_DEADLINE_SECONDS", "25"))
+
+_BACKOFF_BASE_SECONDS = 1.0
+_BACKOFF_CAP_SECONDS = 16.0
+# AIMD: halve on 429 (at most once per cooldown), creep back up on success
+_DECREASE_FACTOR = 0.5
+_INCREASE_STEP = 0.05
+_MIN_RATE_FRACTION = 0.1
+_DECREASE_COOLDOWN_SECONDS = 2.0
+
+
+# Vertex bills each image at a flat rate; PDFs vary per page, so use the same floor
+_TOKENS_PER_MEDIA_PART = 258
+_CHARS_PER_TOKEN = 4
+
+
+class RateLimitExhausted(Exception):
+    """The call could not be admitted (or retried) before its deadline."""
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """Recognizes Vertex quota errors by status code, falling back to message text."""
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    if code == 429:
+        return True
+    error_str = str(exc)
+    return "429" in error_str or "ResourceExhausted" in error_str or "RESOURCE_EXHAUSTED" in error_str or "Quota" in error_str
+
+
+def estimate_request_tokens(parts: List[Any], system_instruction: str = "", max_output_tokens: int = 0) -> int:
+    """Rough token cost of a generate_content call, used to reserve TPM before sending."""
+    chars = len(system_instruction)
+    media_parts = 0
+    for part in parts:
+        text = part if isinstance(part, str) else getattr(part, "text", None)
+        if text:
+            chars += len(text)
+        else:
+            media_parts += 1
+    return chars // _CHARS_PER_TOKEN + media_parts * _TOKENS_PER_MEDIA_PART + max_output_tokens
+
+
+class QuotaLimiter:
+    """
+    Client-side token bucket shared by every Gemini call in the process.
+
+    Admission uses virtual scheduling (GCRA): each caller reserves the next free
+    slot and sleeps until it, which gives FIFO queueing without a waiter list and
+    works across the per-request event loops of the Cloud Function path. A second
+    bucket meters estimated tokens when VERTEX_TPM is set; a rate of 0 turns the
+    corresponding bucket off. On 429 the effective
+    rate is halved (AIMD) and the call is retried with full-jitter exponential
+    backoff until its deadline.
+    """
+
+    def __init__(self, qpm: float = VERTEX_QPM, tpm: float = VERTEX_TPM, burst: int = VERTEX_BURST):
+        self.qpm = qpm
+        self.tpm = tpm
+        self.burst = max(1, burst)
+        self._lock = threading.Lock()
+        self._rate_fraction = 1.0
+        self._last_decrease = 0.0
+        self._next_request_at = 0.0
+        self._next_token_at = 0.0
+        self._stats = {"admitted": 0, "rejected": 0, "rate_limited": 0, "retries": 0, "total_wait_seconds": 0.0}
+
+    def _request_interval(self) -> float:
+        return 60.0 / (self.qpm * self._rate_fraction)
+
+    def _token_interval(self) -> float:
+        return 60.0 / (self.tpm * self._rate_fraction)
+
+    def reserve(self, estimated_tokens: int, deadline: float) -> float:
+        """
+        Reserves capacity and returns how long the caller must wait.
+        Raises RateLimitExhausted without reserving if the wait would pass the deadline.
+        """
+        now = time.monotonic()
+        with self._lock:
+            request_interval = self._request_interval() if self.qpm > 0 else 0.0
+            # Up to `burst` calls may start back to back after an idle period
+            request_at = max(now - (self.burst - 1) * request_interval, self._next_request_at)
+            start_at = request_at if self.qpm > 0 else now
+            token_at = None
+            if self.tpm > 0:
+                token_at = max(now - self.burst * request_interval, self._next_token_at)
+                start_at = max(start_at, token_at)
+            wait = max(0.0, start_at - now)
+            if now + wait > deadline:
+                self._stats["rejected"] += 1
+                raise RateLimitExhausted(f"Quota queue wait of {wait:.1f}s exceeds deadline")
+            self._next_request_at = request_at + request_interval
+            if token_at is not None:
+                self._next_token_at = token_at + estimated_tokens * self._token_interval()
+            self._stats["admitted"] += 1
+            self._stats["total_wait_seconds"] += wait
+            return wait
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """Corrects the token bucket once the real usage is known."""
+        if self.tpm <= 0 or not actual_tokens:
+            return
+        with self._lock:
+            self._next_token_at += (actual_tokens - estimated_tokens) * self._token_interval()
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._rate_fraction = min(1.0, self._rate_fraction + _INCREASE_STEP)
+
+    def on_rate_limited(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._stats["rate_limited"] += 1
+            # Concurrent 429s from the same quota dip count as one signal
+            if now - self._last_decrease >= _DECREASE_COOLDOWN_SECONDS:
+                self._rate_fraction = max(_MIN_RATE_FRACTION, self._rate_fraction * _DECREASE_FACTOR)
+                self._last_decrease = now
+                logger.warning(f"Vertex quota pressure: effective rate cut to {self.qpm * self._rate_fraction:.1f} QPM")
+
+    @staticmethod
+    def backoff_delay(retry: int) -> float:
+        """Full-jitter exponential backoff for the given retry number (1-based)."""
+        return random.uniform(0, min(_BACKOFF_CAP_SECONDS, _BACKOFF_BASE_SECONDS * (2 ** retry)))
+
+    async def run(self, call: Callable[[], Awaitable[Any]], estimated_tokens: int = 0, timeout: Optional[float] = None) -> Any:
+        """
+        Runs call() under the quota, retrying 429s until `timeout` seconds have passed
+        (GEMINI_QUEUE_DEADLINE_SECONDS by default).
+        Raises RateLimitExhausted when the deadline is reached.
+        """
+        deadline = time.monotonic() + (timeout if timeout is not None else GEMINI_QUEUE_DEADLINE_SECONDS)
+        retry = 0
+        while True:
+            wait = self.reserve(estimated_tokens, deadline)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                result = await call()
+            except Exception as e:
+                if not is_rate_limit_error(e):
+                    raise
+                self.on_rate_limited()
+                retry += 1
+                delay = self.backoff_delay(retry)
+                if time.monotonic() + delay >= deadline:
+                    raise RateLimitExhausted(f"Rate limited {retry} times before deadline") from e
+                logger.warning(f"Rate limit hit (429). Backing off {delay:.2f}s (retry {retry})")
+                with self._lock:
+                    self._stats["retries"] += 1
+                await asyncio.sleep(delay)
+                continue
+            self.on_success()
+            usage = getattr(result, "usage_metadata", None)
+            self.record_usage(estimated_tokens, getattr(usage, "total_token_count", None))
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["rate_fraction"] = round(self._rate_fraction, 3)
+            stats["effective_qpm"] = round(self.qpm * self._rate_fraction, 2) if self.qpm > 0 else None
+            stats["effective_tpm"] = round(self.tpm * self._rate_fraction, 2) if self.tpm > 0 else None
+        stats["total_wait_seconds"] = round(stats["total_wait_seconds"], 3)
+        return stats
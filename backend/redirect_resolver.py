@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+
+from url_fetcher import UrlFetcher
+
+logger = logging.getLogger(__name__)
+
+# Same /tmp rule as the other caches: Cloud Run only allows writes there
+_IS_CLOUD_RUN = os.environ.get('K_SERVICE') is not None
+_DEFAULT_CACHE_PATH = '/tmp/redirect_cache.db' if _IS_CLOUD_RUN else 'redirect_cache.db'
+
+REDIRECT_CACHE_PATH = os.getenv("REDIRECT_CACHE_PATH", _DEFAULT_CACHE_PATH)
+REDIRECT_CACHE_TTL_SECONDS = int(os.getenv("REDIRECT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+REDIRECT_CACHE_MEMORY_ENTRIES = int(os.getenv("REDIRECT_CACHE_MEMORY_ENTRIES", "4096"))
+# Wall-clock budget for resolving all chunk URIs of one response (0 disables resolution)
+REDIRECT_RESOLVE_BUDGET_SECONDS = float(os.getenv("REDIRECT_RESOLVE_BUDGET_SECONDS", "1.5"))
+REDIRECT_MAX_HOPS = int(os.getenv("REDIRECT_MAX_HOPS", "5"))
+# Hosts whose URLs are opaque redirects to the real publisher (comma separated)
+REDIRECT_HOSTS = frozenset(
+    h.strip().lower() for h in os.getenv("REDIRECT_HOSTS", "vertexaisearch.cloud.google.com").split(",") if h.strip()
+)
+
+
+class ResolutionCache:
+    """
+    Redirect URI -> publisher URL, in an in-memory LRU in front of a SQLite table.
+
+    Memory hits cost a dict lookup; the table makes resolutions survive restarts.
+    If the database cannot be opened the cache runs on the memory LRU alone.
+    """
+
+    def __init__(self, db_path: str = REDIRECT_CACHE_PATH, ttl_seconds: int = REDIRECT_CACHE_TTL_SECONDS, memory_entries: int = REDIRECT_CACHE_MEMORY_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+        try:
+            self._connection = sqlite3.connect(db_path, check_same_thread=False)
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS redirect_cache (
+                    uri TEXT PRIMARY KEY,
+                    final_url TEXT NOT NULL,
+                    resolved_at REAL NOT NULL
+                )
+            """)
+            self._connection.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Redirect cache disk tier disabled: {e}")
+            self._connection = None
+
+    def get(self, uri: str) -> Optional[str]:
+        return self.get_many([uri]).get(uri)
+
+    def get_many(self, uris: List[str]) -> Dict[str, str]:
+        """
+        Maps each URI with an unexpired entry to its publisher URL.
+        Memory misses are looked up in one SELECT; blocking, so async callers run it in a thread.
+        """
+        now = time.time()
+        found: Dict[str, str] = {}
+        with self._lock:
+            missing = []
+            for uri in uris:
+                entry = self._memory.get(uri)
+                if entry is None:
+                    missing.append(uri)
+                    continue
+                self._memory.move_to_end(uri)
+                if now - entry[1] >= self.ttl_seconds:
+                    self._memory.pop(uri, None)
+                else:
+                    found[uri] = entry[0]
+            if not missing or self._connection is None:
+                return found
+            try:
+                rows = self._connection.execute(
+                    f"SELECT uri, final_url, resolved_at FROM redirect_cache WHERE uri IN ({','.join('?' * len(missing))})",
+                    missing,
+                ).fetchall()
+            except sqlite3.Error as e:
+                logger.error(f"Redirect cache read failed: {e}")
+                return found
+            for uri, final_url, resolved_at in rows:
+                if now - resolved_at < self.ttl_seconds:
+                    self._remember(uri, (final_url, resolved_at))
+                    found[uri] = final_url
+        return found
+
+    def put(self, uri: str, final_url: str) -> None:
+        self.put_many({uri: final_url})
+
+    def put_many(self, resolutions: Dict[str, str]) -> None:
+        """Stores URI -> publisher URL pairs with a single commit; blocking like get_many."""
+        if not resolutions:
+            return
+        resolved_at = time.time()
+        with self._lock:
+            for uri, final_url in resolutions.items():
+                self._remember(uri, (final_url, resolved_at))
+            if self._connection is None:
+                return
+            try:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO redirect_cache (uri, final_url, resolved_at) VALUES (?, ?, ?)",
+                    [(uri, final_url, resolved_at) for uri, final_url in resolutions.items()],
+                )
+                self._connection.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Redirect cache write failed: {e}")
+
+    def _remember(self, uri: str, entry: tuple) -> None:
+        self._memory[uri] = entry
+        self._memory.move_to_end(uri)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+
+class RedirectResolver:
+    """
+    Resolves grounding redirect URIs (vertexaisearch.cloud.google.com/grounding-api-redirect/...)
+    to the publisher URL they point at.
+
+    All unresolved URIs of a response are followed concurrently with HEAD
+    requests on the shared UrlFetcher pool, one Location hop at a time, and
+    following stops as soon as the URL leaves the redirect hosts, so publishers
+    are never contacted. Whatever is still pending when the budget runs out is
+    cancelled and left unresolved; callers fall back to the chunk title.
+    """
+
+    def __init__(self, fetcher: UrlFetcher, cache: Optional[ResolutionCache] = None, redirect_hosts: Iterable[str] = REDIRECT_HOSTS, budget_seconds: float = REDIRECT_RESOLVE_BUDGET_SECONDS, max_hops: int = REDIRECT_MAX_HOPS):
+        self.fetcher = fetcher
+        self.cache = cache
+        self.redirect_hosts = frozenset(h.lower() for h in redirect_hosts)
+        self.budget_seconds = budget_seconds
+        self.max_hops = max_hops
+        self._lock = threading.Lock()
+        self._stats = {"cache_hits": 0, "resolved": 0, "unresolved": 0, "budget_exceeded": 0}
+
+    def is_redirect(self, uri: str) -> bool:
+        try:
+            parsed = urllib.parse.urlparse(uri)
+        except ValueError:
+            return False
+        host = (parsed.hostname or "").lower()
+        return parsed.scheme in ("http", "https") and any(
+            host == h or host.endswith("." + h) for h in self.redirect_hosts
+        )
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += amount
+
+    async def _location(self, client: httpx.AsyncClient, url: str) -> Optional[str]:
+        """Location header of url, or None when it is not a redirect."""
+        response = await client.head(url, follow_redirects=False)
+        if response.status_code in (405, 501):
+            # Redirector without HEAD support: read only the headers of a GET
+            async with client.stream("GET", url, follow_redirects=False) as response:
+                pass
+        if not response.is_redirect:
+            return None
+        return response.headers.get("location")
+
+    async def _resolve(self, uri: str) -> Optional[str]:
+        client = self.fetcher.client()
+        url = uri
+        for _ in range(self.max_hops):
+            try:
+                location = await self._location(client, url)
+            except Exception as e:
+                logger.debug(f"Redirect resolution stopped at {url}: {e}")
+                break
+            if not location:
+                break
+            url = urllib.parse.urljoin(url, location)
+            if not self.is_redirect(url):
+                break
+        return url if url != uri and not self.is_redirect(url) else None
+
+    async def resolve_many(self, uris: Iterable[str], budget_seconds: Optional[float] = None) -> Dict[str, str]:
+        """Maps each resolvable redirect URI to its publisher URL; others are omitted."""
+        budget = self.budget_seconds if budget_seconds is None else budget_seconds
+        candidates = [uri for uri in dict.fromkeys(u for u in uris if u) if self.is_redirect(uri)]
+        # The cache's disk tier is SQLite: one batched lookup (and one write below), both off the loop
+        resolved = await asyncio.to_thread(self.cache.get_many, candidates) if self.cache and candidates else {}
+        self._count("cache_hits", len(resolved))
+        pending = [uri for uri in candidates if uri not in resolved]
+        if not pending or budget <= 0:
+            return resolved
+
+        tasks = {asyncio.ensure_future(self._resolve(uri)): uri for uri in pending}
+        done, not_done = await asyncio.wait(tasks, timeout=budget)
+        for task in not_done:
+            task.cancel()
+        if not_done:
+            self._count("budget_exceeded", len(not_done))
+            logger.info(f"Redirect budget of {budget}s exhausted with {len(not_done)} URIs unresolved")
+            await asyncio.gather(*not_done, return_exceptions=True)
+
+        fresh: Dict[str, str] = {}
+        for task in done:
+            uri = tasks[task]
+            final_url = task.result()
+            if final_url:
+                fresh[uri] = final_url
+                self._count("resolved")
+            else:
+                self._count("unresolved")
+        if self.cache and fresh:
+            await asyncio.to_thread(self.cache.put_many, fresh)
+        resolved.update(fresh)
+        return resolved
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats)
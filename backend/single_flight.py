@@ -0,0 +1,71 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight analyses onto one upstream call.
+
+    The first caller for a key (the leader) runs the work; callers that arrive
+    while it is in flight await the leader's result instead of starting their
+    own. Results are published through a concurrent.futures.Future, so waiters
+    on other event loops (the Cloud Function path runs one loop per request)
+    are woken thread-safely. If the leader is cancelled, its waiters retry and
+    one of them takes over.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, concurrent.futures.Future] = {}
+        self._stats = {"leaders": 0, "coalesced": 0, "leader_errors": 0}
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = concurrent.futures.Future()
+                self._in_flight[key] = future
+                self._stats["leaders"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not is_leader:
+            logger.info(f"Coalesced onto in-flight analysis {key[:12]}")
+            try:
+                # shield(): a disconnecting waiter must not cancel the shared future
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                return await self.run(key, fn)
+
+        try:
+            result = await fn()
+        except BaseException as e:
+            self._release(key)
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                with self._lock:
+                    self._stats["leader_errors"] += 1
+                future.set_exception(e)
+            raise
+        self._release(key)
+        future.set_result(result)
+        return result
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._in_flight)
+        return stats
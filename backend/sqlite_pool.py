@@ -0,0 +1,118 @@
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+SQLITE_POOL_READERS = int(os.getenv("SQLITE_POOL_READERS", "4"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_KIB = int(os.getenv("SQLITE_CACHE_KIB", "8192"))               # page cache per connection
+SQLITE_MMAP_BYTES = int(os.getenv("SQLITE_MMAP_BYTES", str(64 * 1024 * 1024)))
+
+
+class SQLitePool:
+    """
+    Long-lived SQLite connections for one database file.
+
+    File databases run in WAL mode with synchronous=NORMAL: one writer
+    connection (serialized by a lock, transactions opened with BEGIN IMMEDIATE)
+    and a bounded pool of reader connections that keep reading the last
+    committed snapshot while a write is in progress. Connections are opened on
+    first use and reused, so no request pays for connect + PRAGMA setup.
+
+    ':memory:' databases only exist per connection, so there reads and writes
+    share a single connection behind the same lock.
+    """
+
+    def __init__(self, db_path: str, readers: int = SQLITE_POOL_READERS, busy_timeout_ms: int = SQLITE_BUSY_TIMEOUT_MS, cache_kib: int = SQLITE_CACHE_KIB, mmap_bytes: int = SQLITE_MMAP_BYTES):
+        self.db_path = db_path
+        self.is_memory = db_path == ':memory:'
+        self.max_readers = max(1, readers)
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_kib = cache_kib
+        self.mmap_bytes = mmap_bytes
+        # Re-entrant so a write transaction may read through reader() on the shared in-memory connection
+        self._write_lock = threading.RLock()
+        self._writer = self._connect()
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._readers_lock = threading.Lock()
+        self._readers: List[sqlite3.Connection] = []
+        self._stats = {"reads": 0, "writes": 0, "reader_waits": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit at the driver level: transactions are explicit (see writer())
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute(f"PRAGMA cache_size = {-int(self.cache_kib)}")
+        if not self.is_memory:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute(f"PRAGMA mmap_size = {int(self.mmap_bytes)}")
+        return conn
+
+    def _checkout(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._readers_lock:
+            if len(self._readers) < self.max_readers:
+                conn = self._connect()
+                self._readers.append(conn)
+                return conn
+            self._stats["reader_waits"] += 1
+        return self._idle.get()
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """A connection for queries. Never blocks behind a writer on file databases."""
+        if self.is_memory:
+            with self._write_lock:
+                self._stats["reads"] += 1
+                yield self._writer
+            return
+        conn = self._checkout()
+        try:
+            with self._readers_lock:
+                self._stats["reads"] += 1
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """The writer connection inside one transaction: committed on exit, rolled back on error."""
+        with self._write_lock:
+            conn = self._writer
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                # Also covers a failed COMMIT (SQLITE_BUSY, disk full): never leave the shared writer mid-transaction
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            self._stats["writes"] += 1
+
+    def close(self) -> None:
+        with self._write_lock:
+            with self._readers_lock:
+                for conn in self._readers:
+                    conn.close()
+                self._readers = []
+                self._idle = queue.LifoQueue()
+            self._writer.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "readers_open": len(self._readers),
+            "max_readers": self.max_readers,
+            "journal_mode": "memory" if self.is_memory else "wal",
+        }
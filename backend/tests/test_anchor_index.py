@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+import random
+from types import SimpleNamespace
+
+# Add parent directory to path so we can import backend modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from anchor_index import AnchorIndex, EXACT, FINGERPRINT, KEYWORDS, _AhoCorasick
+from citation_manager import CitationManager
+
+ANALYSIS = "**2. Evidence Breakdown:**\n* 🚀 NASA reports that Mars has no liquid surface water today.\n* Older rovers found ancient lakebeds."
+
+class TestAnchorIndex(unittest.TestCase):
+    def test_automaton_matches_str_find(self):
+        rng = random.Random(3)
+        for _ in range(200):
+            text = "".join(rng.choice("ab c") for _ in range(120))
+            patterns = list({"".join(rng.choice("ab c") for _ in range(rng.randint(1, 5))) for _ in range(15)})
+            found = _AhoCorasick(patterns).first_occurrences(text)
+            for pattern_id, pattern in enumerate(patterns):
+                self.assertEqual(found.get(pattern_id, -1), text.find(pattern))
+
+    def test_fallback_tiers(self):
+        matches = AnchorIndex(ANALYSIS).locate_all([
+            "NASA reports that Mars has no liquid surface water today.",
+            "NASA reports that Mars lacks any oceans whatsoever.",
+            "Earlier, Older rovers found evidence of ancient lakebeds.",
+            "Jupiter has a storm larger than Earth.",
+            "",
+        ])
+        self.assertEqual([m.method if m else None for m in matches], [EXACT, FINGERPRINT, None, None, None])
+
+        keyword_match = AnchorIndex("Scientists say older rovers found ancient lakebeds.").locate_all(
+            ["The rovers found ancient lakebeds in Gale crater"]
+        )[0]
+        self.assertEqual(keyword_match.method, KEYWORDS)
+
+    def test_utf16_offsets(self):
+        anchor = "NASA reports that Mars has no liquid surface water today."
+        match = AnchorIndex(ANALYSIS).locate_all([anchor])[0]
+        self.assertEqual(ANALYSIS[match.start:match.end], anchor)
+        # The rocket emoji before the anchor is two UTF-16 units
+        prefix = ANALYSIS[:match.start]
+        self.assertEqual(match.utf16_start, len(prefix.encode("utf-16-le")) // 2)
+        self.assertEqual(match.utf16_start, match.start + 1)
+        self.assertEqual(match.utf16_end - match.utf16_start, len(anchor))
+
+class TestCitationManagerAnchors(unittest.TestCase):
+    def test_injects_tags_after_located_segments(self):
+        support = SimpleNamespace(
+            segment=SimpleNamespace(text="Older rovers found ancient lakebeds.", start_index=0, end_index=0),
+            grounding_chunk_indices=[0],
+        )
+        chunk = SimpleNamespace(web=SimpleNamespace(uri="https://nasa.gov/mars", title="NASA"), retrieved_context=None)
+        metadata = SimpleNamespace(grounding_supports=[support], grounding_chunks=[chunk], web_search_queries=[])
+
+        text, sources = CitationManager().process_grounding(ANALYSIS, metadata)
+        self.assertTrue(text.endswith("ancient lakebeds. [1]"))
+        self.assertEqual(sources[0].url, "https://nasa.gov/mars")
+        self.assertEqual(sources[0].cited_segment, "Older rovers found ancient lakebeds.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import sys
+import os
+import asyncio
+import json
+from unittest import mock
+
+# Add parent directory to path so we can import backend modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from batch_runner import run_batch
+from models import AnalysisResponse
+
+async def _collect(items, worker, parallelism):
+    return [outcome async for outcome in run_batch(items, worker, parallelism)]
+
+class TestBatchRunner(unittest.TestCase):
+    def test_bounded_parallelism(self):
+        active = 0
+        peak = 0
+
+        async def worker(index, item):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return {"value": item * 2}
+
+        outcomes = asyncio.run(_collect(list(range(20)), worker, 4))
+        self.assertEqual(peak, 4)
+        self.assertEqual(sorted(o["value"] for o in outcomes), [i * 2 for i in range(20)])
+        self.assertTrue(all(o["status"] == "ok" for o in outcomes))
+
+    def test_results_stream_in_completion_order(self):
+        async def worker(index, delay):
+            await asyncio.sleep(delay)
+            return {}
+
+        outcomes = asyncio.run(_collect([0.2, 0.01], worker, 2))
+        self.assertEqual([o["index"] for o in outcomes], [1, 0])
+
+    def test_partial_failure_does_not_abort(self):
+        async def worker(index, item):
+            if item == "bad":
+                raise ValueError("Claim has neither text_claim nor urls.")
+            return {"item": item}
+
+        outcomes = asyncio.run(_collect(["a", "bad", "c"], worker, 2))
+        by_index = {o["index"]: o for o in outcomes}
+        self.assertEqual(by_index[1]["status"], "error")
+        self.assertIn("neither", by_index[1]["error"])
+        self.assertEqual(by_index[2], {"index": 2, "status": "ok", "item": "c"})
+
+    def test_consumer_stop_cancels_workers(self):
+        finished = []
+
+        async def worker(index, item):
+            await asyncio.sleep(0.01 if index == 0 else 1)
+            finished.append(index)
+            return {}
+
+        async def main():
+            stream = run_batch(list(range(5)), worker, 5)
+            first = await stream.__anext__()
+            await stream.aclose()
+            await asyncio.sleep(0.05)
+            return first
+
+        self.assertEqual(asyncio.run(main())["index"], 0)
+        self.assertEqual(finished, [0])
+
+class TestBatchEndpoint(unittest.TestCase):
+    def test_rate_limited_claim_is_retryable(self):
+        import main
+        from fastapi.testclient import TestClient
+
+        async def analyze(request_id, text_claim, urls, queue_deadline=None):
+            if text_claim == "busy":
+                return AnalysisResponse(verdict="RATE_LIMIT_ERROR", confidence_score=0.0, analysis="Quota exhausted.")
+            return AnalysisResponse(verdict="TRUE", confidence_score=0.9, analysis="Confirmed.")
+
+        with mock.patch.object(main, "analyze_content", analyze):
+            response = TestClient(main.app).post("/analyze/batch", json={"claims": [{"text_claim": "fine"}, {"text_claim": "busy"}]})
+        outcomes = {o["index"]: o for o in map(json.loads, response.text.splitlines())}
+        self.assertEqual(outcomes[0]["status"], "ok")
+        self.assertEqual(outcomes[1]["status"], "retryable")
+        self.assertEqual(outcomes[1]["result"]["verdict"], "RATE_LIMIT_ERROR")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import sys
+import os
+import asyncio
+import threading
+import time
+
+# Add parent directory to path so we can import backend modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import community_routes
+from community_database import AsyncCommunityDatabase, CommunityDatabase
+
+class TestAsyncCommunityDatabase(unittest.TestCase):
+    def setUp(self):
+        self.db = AsyncCommunityDatabase(CommunityDatabase(':memory:'))
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_awaitable_round_trip(self):
+        async def main():
+            claim_id = await self.db.post_claim("The Earth is round", "REAL")
+            self.assertTrue(await self.db.submit_vote(claim_id, "user1", True))
+            self.assertFalse(await self.db.submit_vote(claim_id, "user1", True))
+            top = await self.db.get_top_claims(5)
+            found = await self.db.search_claims("Earth")
+            discussion = await self.db.get_claim_discussion(claim_id)
+            return claim_id, top, found, discussion
+
+        claim_id, top, found, discussion = asyncio.run(main())
+        self.assertEqual(top[0]["claim_id"], claim_id)
+        self.assertEqual(top[0]["vote_count"], 1)
+        self.assertEqual([c["claim_id"] for c in found], [claim_id])
+        self.assertEqual(len(discussion["votes"]), 1)
+
+    def test_blocked_database_does_not_block_loop(self):
+        async def main():
+            claim_id = await self.db.post_claim("Slow claim", "FAKE")
+            release = threading.Event()
+
+            def hold_writer():
+                # Another writer holding the transaction, e.g. a long vote burst
+                with self.db.db.pool.writer():
+                    release.wait(5)
+
+            holder = threading.Thread(target=hold_writer)
+            holder.start()
+            vote = asyncio.ensure_future(self.db.submit_vote(claim_id, "user1", False))
+
+            ticks = 0
+            started = time.monotonic()
+            while time.monotonic() - started < 0.3:
+                await asyncio.sleep(0.01)
+                ticks += 1
+            self.assertFalse(vote.done())
+            release.set()
+            self.assertTrue(await vote)
+            holder.join()
+            return ticks
+
+        self.assertGreater(asyncio.run(main()), 10)
+
+class TestCommunityRoutes(unittest.TestCase):
+    def setUp(self):
+        self.original = community_routes.community_db
+        community_routes.community_db = AsyncCommunityDatabase(CommunityDatabase(':memory:'))
+        app = FastAPI()
+        app.include_router(community_routes.router)
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        community_routes.community_db.close()
+        community_routes.community_db = self.original
+
+    def test_post_vote_and_read_back(self):
+        claim_id = self.client.post("/community/post", json={"claim_text": "Water boils at 100C", "ai_verdict": "REAL"}).json()["claim_id"]
+        vote = self.client.post("/community/vote", json={"claim_id": claim_id, "user_id": "u1", "user_verdict": "Legit"}).json()
+        self.assertTrue(vote["success"])
+        self.assertEqual(vote["vote_count"], 1)
+        self.assertEqual(self.client.get("/community/top").json()["claims"][0]["claim_id"], claim_id)
+        self.assertTrue(self.client.post("/community/search", json={"query": "boils"}).json()["found"])
+        self.assertEqual(self.client.get(f"/community/reputation/u1").json()["total_votes"], 1)
+        self.assertEqual(len(self.client.get(f"/community/discussion/{claim_id}").json()["votes"]), 1)
+
+if __name__ == '__main__':
+    unittest.main()
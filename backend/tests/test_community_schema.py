@@ -0,0 +1,85 @@
+import unittest
+import sys
+import os
+import sqlite3
+import tempfile
+from unittest import mock
+
+# Add parent directory to path so we can import backend modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import community_database
+from community_database import CommunityDatabase, SCHEMA_MIGRATIONS, SCHEMA_VERSION
+from benchmarks.community_query_benchmark import HOT_QUERIES, populate
+
+class TestCommunitySchema(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "community.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _user_version(self, db):
+        with db.pool.reader() as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def test_fresh_database_is_at_latest_version(self):
+        db = CommunityDatabase(self.db_path)
+        self.assertEqual(self._user_version(db), SCHEMA_VERSION)
+        with db.pool.reader() as conn:
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertTrue({"idx_verdicts_user", "idx_verdicts_claim_vote", "idx_verdicts_claim_time", "idx_claims_top"} <= indexes)
+        db.close()
+
+        # Reopening applies nothing
+        db = CommunityDatabase(self.db_path)
+        with db.pool.writer() as conn:
+            self.assertEqual(community_database.migrate_schema(conn), [])
+        db.close()
+
+    def test_unversioned_database_is_upgraded_in_place(self):
+        # A database created before migrations existed: tables, data, user_version 0
+        conn = sqlite3.connect(self.db_path)
+        for statement in SCHEMA_MIGRATIONS[0][1]:
+            conn.execute(statement)
+        conn.execute("INSERT INTO claims (claim_id, claim_text, ai_verdict, total_votes) VALUES ('c1', 'Old claim', 'REAL', 0)")
+        conn.commit()
+        conn.close()
+
+        db = CommunityDatabase(self.db_path)
+        self.assertEqual(self._user_version(db), SCHEMA_VERSION)
+        self.assertEqual(db.get_claim("c1")["claim_text"], "Old claim")
+        self.assertTrue(db.submit_vote("c1", "user1", True))
+        db.close()
+
+    def test_failed_migration_rolls_back(self):
+        CommunityDatabase(self.db_path).close()
+        broken = SCHEMA_MIGRATIONS + [(SCHEMA_VERSION + 1, [
+            "CREATE INDEX idx_broken_ok ON claims(ai_verdict)",
+            "CREATE INDEX idx_broken ON no_such_table(x)",
+        ])]
+        with mock.patch.object(community_database, "SCHEMA_MIGRATIONS", broken):
+            with self.assertRaises(sqlite3.OperationalError):
+                CommunityDatabase(self.db_path)
+        db = CommunityDatabase(self.db_path)
+        self.assertEqual(self._user_version(db), SCHEMA_VERSION)
+        with db.pool.reader() as conn:
+            self.assertIsNone(conn.execute("SELECT name FROM sqlite_master WHERE name = 'idx_broken_ok'").fetchone())
+        db.close()
+
+    def test_hot_queries_use_indexes(self):
+        db = CommunityDatabase(self.db_path)
+        populate(db, n_votes=2000, n_claims=100, n_users=200)
+        with db.pool.reader() as conn:
+            for name, sql, params in HOT_QUERIES:
+                plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+                for step in plan:
+                    # Table access steps (not subquery headers) must go through an index
+                    if step.startswith(("SCAN", "SEARCH")):
+                        self.assertIn("INDEX", step, f"{name}: {plan}")
+                    self.assertNotIn("TEMP B-TREE", step, f"{name}: {plan}")
+        db.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+import threading
+import time
+
+# Add parent directory to path so we can import backend modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import domain_authority
+from domain_authority import AuthorityIndex, DomainRegistry, build_authority_index, get_authority_index, swap_authority_index
+from logic import get_authority_multiplier, is_verified_domain
+
+class TestAuthorityIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = AuthorityIndex(verified_domains=["snopes.com", "factcheck.afp.com"])
+
+    def test_tiers(self):
+        cases = {
+            "nasa.gov": 1.0, "www.cdc.gov": 1.0, "mit.edu": 1.0, "who.int": 1.0,
+            "https://www.reuters.com/world/": 0.9, "bbc.co.uk": 0.9, "redcross.org": 0.9,
+            "en.wikipedia.org": 0.8, "x.com": 0.4, "mobile.twitter.com": 0.4,
+            "report.pdf": 1.0, "example.com": 0.7, "unknown": 0.7, "": 0.7,
+            "snopes.com": 1.0, "factcheck.afp.com": 1.0, "afp.com": 0.7,
+        }
+        for domain, expected in cases.items():
+            self.assertEqual(self.index.authority(domain), expected, domain)
+
+    def test_social_match_respects_label_boundaries(self):
+        # Substring matching used to rate these as social media
+        self.assertEqual(self.index.authority("netflix.com"), 0.7)
+        self.assertEqual(self.index.authority("fox.com"), 0.7)
+        self.assertEqual(self.index.authority("notyoutube.com"), 0.7)
+
+    def test_public_suffixes(self):
+        self.assertEqual(self.index.authority("www.nhs.gov.uk"), 1.0)
+        self.assertEqual(self.index.authority("ox.ac.uk"), 1.0)
+        self.assertEqual(self.index.authority("moh.gov.my"), 1.0)
+        # A bare suffix is not an institution
+        self.assertEqual(self.index.authority("gov.uk"), 0.7)
+        self.assertEqual(self.index.authority("gov"), 0.7)
+
+    def test_verified_is_exact(self):
+        self.assertTrue(self.index.is_verified("https://www.snopes.com"))
+        self.assertFalse(self.index.is_verified("news.snopes.com"))
+
+    def test_build_from_data_files(self):
+        with tempfile.TemporaryDirectory() as data_dir:
+            with open(os.path.join(data_dir, "verified_domains.json"), "w") as f:
+                json.dump(["checkyourfact.com"], f)
+            with open(os.path.join(data_dir, "authority_rules.json"), "w") as f:
+                json.dump([{"suffix": "gov.ph", "scope": "subdomains", "authority": 1.0},
+                           {"suffix": "x.com", "authority": 0.2},
+                           {"suffix": "bad.example", "scope": "nowhere", "authority": 1.0}], f)
+            index = build_authority_index(data_dir)
+        self.assertEqual(index.authority("doh.gov.ph"), 1.0)
+        self.assertEqual(index.authority("x.com"), 0.2)
+        self.assertEqual(index.authority("bad.example"), 0.7)
+        self.assertTrue(index.is_verified("checkyourfact.com"))
+
+    def test_hot_swap(self):
+        replacement = AuthorityIndex(verified_domains=["example.com"])
+        previous = swap_authority_index(replacement)
+        try:
+            self.assertIs(get_authority_index(), replacement)
+            self.assertEqual(get_authority_multiplier("example.com"), 1.0)
+            self.assertTrue(is_verified_domain("example.com"))
+        finally:
+            swap_authority_index(previous)
+        self.assertEqual(get_authority_multiplier("example.com"), 0.7)
+
+    def test_memoized(self):
+        self.index.authority("www.nasa.gov")
+        self.assertIn("www.nasa.gov", self.index._memo)
+        domain_authority.AUTHORITY_CACHE_SIZE, size = 1, domain_authority.AUTHORITY_CACHE_SIZE
+        try:
+            self.index.authority("reuters.com")
+            self.assertEqual(list(self.index._memo), ["reuters.com"])
+        finally:
+            domain_authority.AUTHORITY_CACHE_SIZE = size
+
+class TestDomainRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_dir = self.tmp.name
+        self.original = get_authority_index()
+
+    def tearDown(self):
+        swap_authority_index(self.original)
+        self.tmp.cleanup()
+
+    def write_verified(self, payload):
+        path = os.path.join(self.data_dir, "verified_domains.json")
+        with open(path, "w") as f:
+            f.write(payload if isinstance(payload, str) else json.dumps(payload))
+
+    def test_versioned_snapshot(self):
+        self.write_verified({"version": "2026-10-01", "domains": ["snopes.com", "politifact.com"]})
+        index = build_authority_index(self.data_dir)
+        self.assertEqual(index.version, "2026-10-01")
+        self.assertEqual(len(index.verified_domains), 2)
+
+        self.write_verified(["snopes.com"])
+        self.assertEqual(len(build_authority_index(self.data_dir).version), 12)  # content hash
+
+    def test_reload_on_change(self):
+        self.write_verified({"version": "v1", "domains": ["snopes.com"]})
+        registry = DomainRegistry(self.data_dir, poll_seconds=0)
+        self.assertFalse(registry.check())
+        self.assertTrue(registry.check(force=True))
+        self.assertEqual(registry.stats()["version"], "v1")
+
+        self.write_verified({"version": "v2", "domains": ["snopes.com", "politifact.com", "fullfact.org"]})
+        self.assertTrue(registry.check())
+        stats = registry.stats()
+        self.assertEqual((stats["version"], stats["verified_domains"], stats["reloads"]), ("v2", 3, 2))
+        self.assertTrue(get_authority_index().is_verified("fullfact.org"))
+
+    def test_broken_file_keeps_current_index(self):
+        self.write_verified({"version": "v1", "domains": ["snopes.com"]})
+        registry = DomainRegistry(self.data_dir, poll_seconds=0)
+        registry.check(force=True)
+
+        self.write_verified('{"version": "v2", "domains": ["snop')  # caught mid-write
+        self.assertFalse(registry.check())
+        self.assertEqual(registry.stats()["version"], "v1")
+        self.assertEqual(registry.reload_errors, 1)
+
+        self.write_verified({"version": "v2", "domains": ["snopes.com", "politifact.com"]})
+        self.assertTrue(registry.check())
+        self.assertEqual(registry.stats()["version"], "v2")
+
+    def test_polling_swaps_while_readers_run(self):
+        self.write_verified({"version": "v1", "domains": ["snopes.com"]})
+        registry = DomainRegistry(self.data_dir, poll_seconds=0.02)
+        registry.check(force=True)
+        registry.start()
+        stop = threading.Event()
+        seen = set()
+
+        def reader():
+            while not stop.is_set():
+                seen.add(get_authority_index().authority("politifact.com"))
+
+        threads = [threading.Thread(target=reader) for _ in range(4)]
+        for t in threads:
+            t.start()
+        try:
+            self.write_verified({"version": "v2", "domains": ["snopes.com", "politifact.com"]})
+            deadline = time.time() + 5
+            while registry.stats()["version"] != "v2" and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(registry.stats()["version"], "v2")
+            self.assertTrue(registry.stats()["polling"])
+        finally:
+            stop.set()
+            for t in threads:
+                t.join()
+            registry.stop()
+        self.assertLessEqual(seen, {0.7, 1.0})
+        self.assertFalse(registry.stats()["polling"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add parent directory to path so we can import backend modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from forensics import ForensicRecorder
+
+class TestForensicRecorder(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_per_request_files_do_not_clobber(self):
+        recorder = ForensicRecorder(self.tmpdir.name, sample_rate=1.0)
+        first = recorder.start("req")
+        second = recorder.start("req")
+        first.capture("model_output", '{"a": 1}')
+        second.capture("model_output", '{"a": 2}')
+        self.assertTrue(recorder.flush())
+
+        files = sorted(os.listdir(self.tmpdir.name))
+        self.assertEqual(len(files), 2)
+        contents = set()
+        for name in files:
+            with open(os.path.join(self.tmpdir.name, name)) as f:
+                contents.add(f.read())
+        self.assertEqual(contents, {'{"a": 1}', '{"a": 2}'})
+
+    def test_sampling_keeps_forced_captures(self):
+        recorder = ForensicRecorder(self.tmpdir.name, sample_rate=0.0)
+        session = recorder.start("req")
+        self.assertFalse(session.sampled)
+        session.capture("model_output", "{}")
+        session.capture("failed_json_attempt_1", "broken", always=True, extension="txt")
+        recorder.flush()
+
+        self.assertEqual(len(os.listdir(self.tmpdir.name)), 1)
+        self.assertEqual(recorder.stats()["sampled_out"], 1)
+        self.assertEqual(recorder.recent()[0]["kind"], "failed_json_attempt_1")
+
+    def test_client_request_id_cannot_escape_dump_dir(self):
+        recorder = ForensicRecorder(self.tmpdir.name, sample_rate=0.0)
+        session = recorder.start("../../etc/passwd/" + "x" * 100)
+        session.capture("failed_json_attempt_1", "broken", always=True, extension="txt")
+        self.assertTrue(recorder.flush())
+
+        self.assertEqual(recorder.stats()["write_errors"], 0)
+        files = os.listdir(self.tmpdir.name)
+        self.assertEqual(len(files), 1)
+        self.assertNotIn("..", files[0])
+        self.assertLess(len(files[0]), 120)
+        # The raw id is only kept in the in-memory metadata
+        self.assertEqual(recorder.recent()[0]["request_id"], "../../etc/passwd/" + "x" * 100)
+
+    def test_ring_buffer_and_rotation(self):
+        recorder = ForensicRecorder(self.tmpdir.name, ring_size=3, max_dir_bytes=250)
+        session = recorder.start("req")
+        for i in range(5):
+            session.capture(f"kind{i}", "x" * 100)
+        recorder.flush()
+
+        recent = recorder.recent()
+        self.assertEqual([c["kind"] for c in recent], ["kind4", "kind3", "kind2"])
+        total = sum(os.path.getsize(os.path.join(self.tmpdir.name, n)) for n in os.listdir(self.tmpdir.name))
+        self.assertLessEqual(total, 250)
+        self.assertEqual(recorder.stats()["rotated"], 3)
+
+if __name__ == '__main__':
+    unittest.main()
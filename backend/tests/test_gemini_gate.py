@@ -0,0 +1,113 @@
+import unittest
+import sys
+import os
+import asyncio
+import threading
+import time
+
+# Add parent directory to path so we can import backend modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from gemini_gate import GeminiGate
+
+class TestGeminiGate(unittest.TestCase):
+    def test_caps_in_flight_calls(self):
+        gate = GeminiGate(max_concurrency=2)
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def blocking_call(i):
+            with lock:
+                active.append(i)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(i)
+            return i
+
+        async def main():
+            return await asyncio.gather(*(gate.run(blocking_call, i) for i in range(6)))
+
+        results = asyncio.run(main())
+        self.assertEqual(results, list(range(6)))
+        self.assertLessEqual(max(peak), 2)
+
+        stats = gate.stats()
+        self.assertEqual(stats["calls"], 6)
+        self.assertEqual(stats["queued_calls"], 4)
+        self.assertEqual(stats["in_flight"], 0)
+        self.assertEqual(stats["queue_depth"], 0)
+        self.assertGreater(stats["max_wait_ms"], 0)
+
+    def test_event_loop_stays_responsive(self):
+        """A slow blocking call must not stall other coroutines."""
+        gate = GeminiGate(max_concurrency=1)
+
+        async def main():
+            slow = asyncio.ensure_future(gate.run(time.sleep, 0.3))
+            started = time.monotonic()
+            await asyncio.sleep(0.01)
+            elapsed = time.monotonic() - started
+            await slow
+            return elapsed
+
+        self.assertLess(asyncio.run(main()), 0.2)
+
+    def test_cancelled_waiter_releases_slot(self):
+        gate = GeminiGate(max_concurrency=1)
+
+        async def main():
+            first = asyncio.ensure_future(gate.run(time.sleep, 0.1))
+            await asyncio.sleep(0.01)
+            waiting = asyncio.ensure_future(gate.run(time.sleep, 0))
+            await asyncio.sleep(0.01)
+            waiting.cancel()
+            await first
+            # The slot must be free again for a new caller
+            await asyncio.wait_for(gate.run(time.sleep, 0), timeout=1)
+
+        asyncio.run(main())
+        self.assertEqual(gate.stats()["in_flight"], 0)
+
+    def test_shared_across_event_loops(self):
+        """The Cloud Function path uses one event loop per request thread."""
+        gate = GeminiGate(max_concurrency=1)
+        results = []
+
+        def worker(i):
+            results.append(asyncio.run(gate.run(lambda: time.sleep(0.02) or i)))
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=5)
+        self.assertEqual(sorted(results), [0, 1, 2, 3])
+        self.assertEqual(gate.stats()["in_flight"], 0)
+
+    def test_stream_delivers_chunks_as_they_arrive(self):
+        gate = GeminiGate(max_concurrency=1)
+
+        def streaming_call(n):
+            for i in range(n):
+                time.sleep(0.05)
+                yield i
+
+        async def main():
+            received = []
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            on_chunk = lambda chunk: received.append((chunk, loop.time() - started))
+            chunks = await gate.stream(streaming_call, on_chunk, 3)
+            return chunks, received
+
+        chunks, received = asyncio.run(main())
+        self.assertEqual(chunks, [0, 1, 2])
+        self.assertEqual([c for c, _ in received], [0, 1, 2])
+        # The first chunk is seen long before the stream finishes
+        self.assertLess(received[0][1], 0.12)
+        self.assertEqual(gate.stats()["in_flight"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import sys
+import os
+from types import SimpleNamespace
+
+# Add parent directory to path so we can import backend modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from grounding_index import FILE, WEB, GroundingIndex
+from logic import calculate_reliability
+
+def web_chunk(uri, title, domain=None):
+    return SimpleNamespace(web=SimpleNamespace(uri=uri, title=title, domain=domain), retrieved_context=None)
+
+CHUNKS = [
+    web_chunk("https://www.nasa.gov/mars/", "nasa.gov"),
+    SimpleNamespace(web=None, retrieved_context=SimpleNamespace(uri="", title="report.pdf")),
+    web_chunk("https://reuters.com/science", "reuters.com"),
+    web_chunk("http://nasa.gov/mars", "nasa.gov"),
+]
+
+class TestGroundingIndex(unittest.TestCase):
+    def test_records_and_lookups(self):
+        index = GroundingIndex(CHUNKS)
+        self.assertEqual([r.kind for r in index.records], [WEB, FILE, WEB, WEB])
+        self.assertEqual(index.chunk(2).domain, "reuters.com")
+        self.assertIsNone(index.chunk(4))
+        self.assertIs(index.by_citation_id(3), index.chunk(2))
+        # A repeated URI resolves to its first chunk everywhere
+        self.assertEqual(index.citation_id_for("nasa.gov/mars"), 1)
+        self.assertEqual([r.citation_id for r in index.web_records()], [1, 3])
+        self.assertEqual([r.citation_id for r in index.file_records()], [2])
+        self.assertEqual(index.citation_id_for("https://example.com"), 0)
+
+    def test_citation_lookups(self):
+        index = GroundingIndex(CHUNKS)
+        citations = [
+            {"id": 3, "url": "https://reuters.com/science/", "snippet": "Reuters says"},
+            {"id": 2, "url": "file://report.pdf", "source_file": "report.pdf"},
+        ]
+        index.attach_citations(citations)
+        self.assertEqual(index.citation(2)["source_file"], "report.pdf")
+        self.assertEqual(index.citation_for(index.chunk(2)), (0, citations[0]))
+        self.assertEqual(index.citation_for(index.chunk(1)), (-1, None))
+
+    def test_reliability_accepts_prebuilt_index(self):
+        supports = [{"segment": {"text": "Mars is dry."}, "groundingChunkIndices": [0, 2], "confidenceScores": [0.9, 0.5]}]
+        citations = [{"url": "https://reuters.com/science", "snippet": "Reuters says"}]
+        from_list = calculate_reliability(supports, CHUNKS, citations, False)
+        from_index = calculate_reliability(supports, GroundingIndex(CHUNKS), citations, False)
+        self.assertEqual(from_list, from_index)
+
+        sources = from_index["segments"][0]["sources"]
+        self.assertEqual(sources[0]["domain"], "nasa.gov")
+        self.assertEqual(sources[0]["quote_text"], "nasa.gov")
+        self.assertEqual(sources[1]["source_index"], 0)
+        self.assertEqual(sources[1]["quote_text"], "Reuters says")
+        # The duplicate nasa.gov chunk is unused but its domain is already cited
+        self.assertEqual(from_index["unused_sources"], [])
+
+if __name__ == '__main__':
+    unittest.main()
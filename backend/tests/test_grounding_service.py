@@ -1,11 +1,13 @@
 import unittest
 import sys
 import os
+import random
+import time
 
 # Add parent directory to path so we can import backend modules
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from grounding_service import GroundingService
+from grounding_service import GroundingService, SourceIndex
 
 class TestGroundingService(unittest.TestCase):
     def setUp(self):
@@ -101,5 +103,49 @@ class TestGroundingService(unittest.TestCase):
         chunk = result['groundingChunks'][0]
         self.assertEqual(chunk['uri'], "http://example.com")
 
+class TestSourceIndex(unittest.TestCase):
+    def test_bm25_ranking_and_top_k(self):
+        index = SourceIndex([
+            "Mars rovers found ancient lakebeds on Mars.",
+            "The stock market closed higher today.",
+            "Rovers explore Mars.",
+            "Lakebeds and rivers once covered Mars according to rovers and orbiters.",
+        ])
+        hits = index.search(["mars", "rovers", "lakebeds"], top_k=2)
+        self.assertEqual([source_id for source_id, _ in hits], [0, 3])
+        self.assertTrue(all(0 < relevance <= 1.0 for _, relevance in hits))
+        self.assertEqual(index.search(["unrelated"]), [])
+
+    def test_confidence_scales_with_relevance_and_status(self):
+        service = GroundingService()
+        segments = [{"text": "NASA confirmed the Mars rover found ancient lakebeds.", "startIndex": 0, "endIndex": 53}]
+        sources = [
+            {"text": "NASA confirmed the Mars rover found ancient lakebeds.", "status": "live"},
+            {"text": "NASA confirmed the Mars rover found ancient lakebeds.", "status": "dead"},
+            {"text": "A rover blog post.", "status": "live"},
+        ]
+        supports, _ = service._map_segments_to_sources(segments, sources)
+        scores = dict(zip(supports[0]["groundingChunkIndices"], supports[0]["confidenceScores"]))
+        self.assertGreater(scores[0], scores[1])
+        self.assertLessEqual(scores[0], 0.9)
+        self.assertGreater(scores[0], scores.get(2, 0.0))
+
+    def test_weak_overlap_is_dropped(self):
+        service = GroundingService()
+        segments = [{"text": "The committee approved the new regional transit budget yesterday.", "startIndex": 0, "endIndex": 10}]
+        sources = [{"text": "The weather was pleasant for the parade."}]
+        supports, indices = service._map_segments_to_sources(segments, sources)
+        self.assertEqual((supports, indices), ([], []))
+
+    def test_many_segments_and_sources(self):
+        rng = random.Random(11)
+        vocabulary = [f"term{i}" for i in range(5000)]
+        sources = [{"text": " ".join(rng.choice(vocabulary) for _ in range(200))} for _ in range(500)]
+        segments = [{"text": " ".join(rng.choice(vocabulary) for _ in range(15)), "startIndex": 0, "endIndex": 0} for _ in range(500)]
+        start = time.perf_counter()
+        supports, _ = GroundingService()._map_segments_to_sources(segments, sources)
+        self.assertLess(time.perf_counter() - start, 10.0)
+        self.assertTrue(all(len(s["groundingChunkIndices"]) <= 3 for s in supports))
+
 if __name__ == '__main__':
     unittest.main()
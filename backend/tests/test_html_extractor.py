@@ -0,0 +1,63 @@
+import unittest
+import sys
+import os
+
+# Add parent directory to path so we can import backend modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from html_extractor import ArticleExtractor
+
+PAGE = """
+<html><head><title>Mars Rover Finds Water</title>
+<script>var tracking = "Lorem ipsum dolor sit amet, this should never appear in output";</script>
+<style>body { color: red; }</style></head>
+<body>
+<nav><a href="/">Home</a> <a href="/world">World news and other sections of the site</a></nav>
+<article>
+<h1>Rover finds ice</h1>
+<p>NASA's rover detected subsurface ice near the equator of Mars on Tuesday, officials said.</p>
+<p>Share</p>
+<p>The finding was confirmed by two independent instruments aboard the orbiter &amp; rover.</p>
+</article>
+<footer>Copyright 2026 Example News. All rights reserved worldwide by the publisher.</footer>
+</body></html>
+"""
+
+class TestArticleExtractor(unittest.TestCase):
+    def test_strips_markup_and_boilerplate(self):
+        extractor = ArticleExtractor()
+        extractor.feed(PAGE)
+        extractor.close()
+        text = extractor.text()
+
+        self.assertTrue(text.startswith("Mars Rover Finds Water\nRover finds ice\n"))
+        self.assertIn("subsurface ice near the equator", text)
+        self.assertIn("orbiter & rover", text)
+        for junk in ("tracking", "color: red", "World news", "Copyright", "Share"):
+            self.assertNotIn(junk, text)
+
+    def test_chunked_feed_matches_single_feed(self):
+        whole = ArticleExtractor()
+        whole.feed(PAGE)
+        whole.close()
+
+        chunked = ArticleExtractor()
+        for i in range(0, len(PAGE), 7):
+            chunked.feed(PAGE[i:i + 7])
+        chunked.close()
+        self.assertEqual(whole.text(), chunked.text())
+
+    def test_stops_at_max_chars(self):
+        extractor = ArticleExtractor(max_chars=200)
+        paragraph = "<p>" + "Independent reporting confirmed the figures. " * 3 + "</p>"
+        fed = 0
+        while not extractor.done and fed < 100:
+            extractor.feed(paragraph)
+            fed += 1
+        extractor.close()
+        self.assertTrue(extractor.done)
+        self.assertLess(fed, 5)
+        self.assertLessEqual(len(extractor.text()), 200)
+
+if __name__ == '__main__':
+    unittest.main()
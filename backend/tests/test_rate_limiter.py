@@ -0,0 +1,120 @@
+import unittest
+import sys
+import os
+import asyncio
+import time
+from unittest import mock
+
+# Add parent directory to path so we can import backend modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rate_limiter import QuotaLimiter, RateLimitExhausted, estimate_request_tokens, is_rate_limit_error
+
+class _QuotaError(Exception):
+    code = 429
+
+class _Usage:
+    total_token_count = 500
+
+class _Response:
+    usage_metadata = _Usage()
+
+class TestQuotaLimiter(unittest.TestCase):
+    def test_burst_then_paced(self):
+        limiter = QuotaLimiter(qpm=600, burst=2)  # one slot per 100 ms
+        deadline = time.monotonic() + 10
+        waits = [limiter.reserve(0, deadline) for _ in range(4)]
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertAlmostEqual(waits[2], 0.1, delta=0.02)
+        self.assertAlmostEqual(waits[3], 0.2, delta=0.02)
+
+    def test_reserve_past_deadline_is_rejected(self):
+        limiter = QuotaLimiter(qpm=60, burst=1)
+        limiter.reserve(0, time.monotonic() + 10)
+        with self.assertRaises(RateLimitExhausted):
+            limiter.reserve(0, time.monotonic() + 0.5)
+        self.assertEqual(limiter.stats()["rejected"], 1)
+
+    def test_token_bucket_and_usage_correction(self):
+        limiter = QuotaLimiter(qpm=6000, tpm=60000, burst=1)  # 1000 tokens per second
+        deadline = time.monotonic() + 10
+        self.assertEqual(limiter.reserve(1000, deadline), 0.0)
+        # Actual usage was half the estimate, so the next caller waits ~0.5 s, not ~1 s
+        limiter.record_usage(1000, 500)
+        self.assertAlmostEqual(limiter.reserve(1000, deadline), 0.5, delta=0.05)
+
+    def test_zero_rates_disable_limiting(self):
+        limiter = QuotaLimiter(qpm=0, tpm=0, burst=1)
+        deadline = time.monotonic() + 1
+        self.assertEqual([limiter.reserve(1000, deadline) for _ in range(10)], [0.0] * 10)
+        limiter.record_usage(1000, 500)
+        self.assertIsNone(limiter.stats()["effective_qpm"])
+        self.assertEqual(asyncio.run(limiter.run(self._ok)), "ok")
+
+        # Only the token bucket paces when QPM is disabled
+        limiter = QuotaLimiter(qpm=0, tpm=60000, burst=1)  # 1000 tokens per second
+        deadline = time.monotonic() + 10
+        self.assertEqual(limiter.reserve(500, deadline), 0.0)
+        self.assertAlmostEqual(limiter.reserve(500, deadline), 0.5, delta=0.05)
+
+    @staticmethod
+    async def _ok():
+        return "ok"
+
+    def test_aimd_rate_adjustment(self):
+        limiter = QuotaLimiter(qpm=60)
+        limiter.on_rate_limited()
+        limiter.on_rate_limited()  # same dip, inside the cooldown
+        self.assertEqual(limiter.stats()["rate_fraction"], 0.5)
+        limiter.on_success()
+        self.assertEqual(limiter.stats()["rate_fraction"], 0.55)
+
+    def test_run_retries_429_with_backoff(self):
+        limiter = QuotaLimiter(qpm=6000)
+        calls = []
+
+        async def call():
+            calls.append(time.monotonic())
+            if len(calls) < 3:
+                raise _QuotaError("RESOURCE_EXHAUSTED")
+            return _Response()
+
+        with mock.patch.object(QuotaLimiter, "backoff_delay", return_value=0.01):
+            result = asyncio.run(limiter.run(call, estimated_tokens=100, timeout=5))
+        self.assertIsInstance(result, _Response)
+        self.assertEqual(len(calls), 3)
+        stats = limiter.stats()
+        self.assertEqual(stats["rate_limited"], 2)
+        self.assertEqual(stats["retries"], 2)
+
+    def test_run_gives_up_at_deadline(self):
+        limiter = QuotaLimiter(qpm=6000)
+
+        async def call():
+            raise _QuotaError("quota")
+
+        with mock.patch.object(QuotaLimiter, "backoff_delay", return_value=0.2):
+            with self.assertRaises(RateLimitExhausted):
+                asyncio.run(limiter.run(call, timeout=0.5))
+
+    def test_other_errors_propagate(self):
+        limiter = QuotaLimiter()
+
+        async def call():
+            raise ValueError("bad request")
+
+        with self.assertRaises(ValueError):
+            asyncio.run(limiter.run(call))
+
+    def test_backoff_is_jittered_and_capped(self):
+        delays = [QuotaLimiter.backoff_delay(10) for _ in range(50)]
+        self.assertTrue(all(0 <= d <= 16 for d in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+    def test_helpers(self):
+        self.assertTrue(is_rate_limit_error(_QuotaError("x")))
+        self.assertFalse(is_rate_limit_error(ValueError("x")))
+        self.assertEqual(estimate_request_tokens(["a" * 400, object()], "b" * 400, 1000), 100 + 258 + 100 + 1000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+import unittest
+import sys
+import os
+import asyncio
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path so we can import backend modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from redirect_resolver import RedirectResolver, ResolutionCache
+from url_fetcher import UrlFetcher
+from grounding_index import GroundingIndex
+
+class _RedirectHandler(BaseHTTPRequestHandler):
+    """Stand-in for the grounding redirect host."""
+    hits = []
+
+    def _redirect(self, location):
+        self.send_response(302)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_HEAD(self):
+        _RedirectHandler.hits.append(("HEAD", self.path))
+        if self.path.startswith("/no-head/"):
+            self.send_response(405)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif self.path.startswith("/slow/"):
+            time.sleep(1.0)
+            self._redirect("https://slow.example.com/story")
+        elif self.path.startswith("/hop/"):
+            # Relative hop within the redirect host, then out to the publisher
+            self._redirect("/final/" + self.path.split("/")[-1])
+        elif self.path.startswith("/final/"):
+            self._redirect("https://www.reuters.com/world/" + self.path.split("/")[-1])
+        else:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    def do_GET(self):
+        _RedirectHandler.hits.append(("GET", self.path))
+        self._redirect("https://apnews.com/article/" + self.path.split("/")[-1])
+
+    def log_message(self, *args):
+        pass
+
+class TestRedirectResolver(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _RedirectHandler)
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _RedirectHandler.hits = []
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "redirects.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _resolver(self, **kwargs):
+        kwargs.setdefault("cache", ResolutionCache(self.db_path))
+        return RedirectResolver(UrlFetcher(), redirect_hosts=["127.0.0.1"], **kwargs)
+
+    def _run(self, resolver, uris, **kwargs):
+        async def main():
+            try:
+                return await resolver.resolve_many(uris, **kwargs)
+            finally:
+                await resolver.fetcher.aclose()
+        return asyncio.run(main())
+
+    def test_follows_chain_without_contacting_publisher(self):
+        resolver = self._resolver()
+        uri = f"{self.base}/hop/abc"
+        resolved = self._run(resolver, [uri, "https://example.com/direct"])
+        self.assertEqual(resolved, {uri: "https://www.reuters.com/world/abc"})
+        self.assertEqual(_RedirectHandler.hits, [("HEAD", "/hop/abc"), ("HEAD", "/final/abc")])
+
+    def test_head_not_allowed_falls_back_to_get(self):
+        resolver = self._resolver()
+        uri = f"{self.base}/no-head/xyz"
+        self.assertEqual(self._run(resolver, [uri]), {uri: "https://apnews.com/article/xyz"})
+        self.assertEqual([method for method, _ in _RedirectHandler.hits], ["HEAD", "GET"])
+
+    def test_budget_exceeded_leaves_uri_unresolved(self):
+        resolver = self._resolver()
+        slow, fast = f"{self.base}/slow/1", f"{self.base}/final/2"
+        started = time.monotonic()
+        resolved = self._run(resolver, [slow, fast], budget_seconds=0.3)
+        self.assertLess(time.monotonic() - started, 0.9)
+        self.assertEqual(resolved, {fast: "https://www.reuters.com/world/2"})
+        self.assertEqual(resolver.stats()["budget_exceeded"], 1)
+
+    def test_unresolvable_uri_is_omitted(self):
+        resolver = self._resolver()
+        self.assertEqual(self._run(resolver, [f"{self.base}/missing"]), {})
+        self.assertEqual(resolver.stats()["unresolved"], 1)
+
+    def test_cache_persists_and_skips_network(self):
+        uri = f"{self.base}/final/cached"
+        self._run(self._resolver(), [uri])
+        _RedirectHandler.hits = []
+
+        resolver = self._resolver(cache=ResolutionCache(self.db_path))
+        self.assertEqual(self._run(resolver, [uri]), {uri: "https://www.reuters.com/world/cached"})
+        self.assertEqual(_RedirectHandler.hits, [])
+        self.assertEqual(resolver.stats()["cache_hits"], 1)
+
+    def test_cache_is_read_and_written_in_batches_off_the_loop(self):
+        calls = []
+
+        class _TracingCache(ResolutionCache):
+            def get_many(self, uris):
+                calls.append(("get_many", len(uris), threading.get_ident()))
+                return super().get_many(uris)
+
+            def put_many(self, resolutions):
+                calls.append(("put_many", len(resolutions), threading.get_ident()))
+                return super().put_many(resolutions)
+
+        uris = [f"{self.base}/final/{i}" for i in range(3)]
+        self._run(self._resolver(cache=_TracingCache(self.db_path)), uris)
+        self.assertEqual([(name, n) for name, n, _ in calls], [("get_many", 3), ("put_many", 3)])
+        self.assertNotIn(threading.get_ident(), [thread for _, _, thread in calls])
+
+        # A new process sees all three from the disk tier in one lookup
+        resolver = self._resolver(cache=ResolutionCache(self.db_path))
+        self.assertEqual(len(self._run(resolver, uris)), 3)
+        self.assertEqual(resolver.stats()["cache_hits"], 3)
+
+    def test_expired_cache_entry_is_ignored(self):
+        cache = ResolutionCache(self.db_path, ttl_seconds=0)
+        cache.put("http://127.0.0.1/x", "https://reuters.com/x")
+        self.assertIsNone(cache.get("http://127.0.0.1/x"))
+
+    def test_unopenable_database_falls_back_to_memory(self):
+        # The database path is a directory, so sqlite3.connect fails
+        cache = ResolutionCache(self.tmp.name)
+        resolver = self._resolver(cache=cache)
+        uri = f"{self.base}/final/mem"
+        self.assertEqual(self._run(resolver, [uri]), {uri: "https://www.reuters.com/world/mem"})
+        self.assertEqual(cache.get(uri), "https://www.reuters.com/world/mem")
+        self.assertEqual(resolver.stats()["resolved"], 1)
+
+    def test_grounding_index_uses_resolved_domain(self):
+        uri = "https://vertexaisearch.cloud.google.com/grounding-api-redirect/AbC"
+        chunks = [{"uri": uri, "title": "Reuters"}, {"uri": "https://x.com/post", "title": "x.com"}]
+        index = GroundingIndex(chunks, {uri: "https://www.reuters.com/world/abc"})
+        self.assertEqual(index.records[0].domain, "reuters.com")
+        self.assertEqual(index.records[0].uri, uri)
+        self.assertEqual(index.records[1].domain, "x.com")
+        self.assertEqual(GroundingIndex(chunks).records[0].domain, "Reuters")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+import io
+import random
+import contextlib
+from types import SimpleNamespace
+
+# Add parent directory to path so we can import backend modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import logic
+from grounding_index import GroundingIndex
+
+DOMAINS = ["nasa.gov", "reuters.com", "x.com", "example.com", "en.wikipedia.org", "", "report.pdf"]
+
+def random_case(rng, n_supports, n_chunks=12):
+    chunks = []
+    for i in range(n_chunks):
+        domain = rng.choice(DOMAINS)
+        if domain == "report.pdf":
+            chunks.append({"uri": "file://report.pdf", "title": "report.pdf"})
+        else:
+            chunks.append(SimpleNamespace(web=SimpleNamespace(uri=f"https://{domain or 'site'}/{i}", title=domain, domain=None)))
+    supports = []
+    for i in range(n_supports):
+        indices = [rng.randint(-1, n_chunks) for _ in range(rng.randint(0, 4))]
+        scores = [rng.choice([0.0, 0.5, 0.75, round(rng.random(), 3)]) for _ in range(rng.randint(0, len(indices)))]
+        supports.append({"segment": {"text": f"Segment {i}."}, "groundingChunkIndices": indices, "confidenceScores": scores})
+    citations = [{"url": f"https://{DOMAINS[0]}/{i}", "snippet": f"snippet {i}"} for i in range(0, n_chunks, 3)]
+    return supports, chunks, citations
+
+def quiet(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+class TestReliability(unittest.TestCase):
+    def test_strongest_link_scoring(self):
+        chunks = [
+            SimpleNamespace(web=SimpleNamespace(uri="https://nasa.gov/a", title="nasa.gov", domain=None)),
+            SimpleNamespace(web=SimpleNamespace(uri="https://blog.example.com/b", title="blog.example.com", domain=None)),
+            SimpleNamespace(web=SimpleNamespace(uri="https://reuters.com/c", title="reuters.com", domain=None)),
+        ]
+        supports = [{"segment": {"text": "Mars is dry."}, "groundingChunkIndices": [1, 0], "confidenceScores": [0.9, 0.8]}]
+        result = quiet(logic.calculate_reliability, supports, chunks, [], False, vectorized=False)
+        segment = result["segments"][0]
+        self.assertEqual(segment["top_source_domain"], "nasa.gov")
+        self.assertAlmostEqual(segment["top_source_score"], 0.8)
+        self.assertEqual([s["domain"] for s in segment["sources"]], ["nasa.gov", "blog.example.com"])
+        self.assertAlmostEqual(result["reliability_score"], 0.85)
+        self.assertEqual(result["unused_sources"], [{"domain": "reuters.com", "title": "reuters.com"}])
+
+@unittest.skipUnless(logic._NUMPY_AVAILABLE, "NumPy not installed")
+class TestVectorizedReliability(unittest.TestCase):
+    def test_matches_loop_engine(self):
+        rng = random.Random(13)
+        for n_supports in [1, 2, 5, 30, 200]:
+            for _ in range(20):
+                supports, chunks, citations = random_case(rng, n_supports)
+                index = GroundingIndex(chunks)
+                expected = quiet(logic.calculate_reliability, supports, index, citations, True, 0.4, vectorized=False)
+                actual = quiet(logic.calculate_reliability, supports, index, citations, True, 0.4, vectorized=True)
+                self.assertEqual(actual, expected)
+
+    def test_no_valid_chunks(self):
+        supports = [{"segment": {"text": "Orphan."}, "groundingChunkIndices": [5], "confidenceScores": [0.9]}]
+        result = quiet(logic.calculate_reliability, supports, [], [], False, vectorized=True)
+        self.assertEqual(result["segments"][0]["top_source_domain"], "unknown")
+        self.assertEqual(result["segments"][0]["sources"], [])
+        self.assertEqual(result["reliability_score"], 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import sys
+import os
+import asyncio
+import threading
+
+# Add parent directory to path so we can import backend modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from single_flight import SingleFlight
+
+class TestSingleFlight(unittest.TestCase):
+    def test_identical_callers_share_one_call(self):
+        flights = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return "verdict"
+
+        async def main():
+            return await asyncio.gather(*[flights.run("key", work) for _ in range(20)])
+
+        results = asyncio.run(main())
+        self.assertEqual(results, ["verdict"] * 20)
+        self.assertEqual(len(calls), 1)
+        stats = flights.stats()
+        self.assertEqual(stats["leaders"], 1)
+        self.assertEqual(stats["coalesced"], 19)
+        self.assertEqual(stats["in_flight"], 0)
+
+    def test_distinct_keys_run_separately(self):
+        flights = SingleFlight()
+
+        async def main():
+            async def work(value):
+                await asyncio.sleep(0.01)
+                return value
+            return await asyncio.gather(flights.run("a", lambda: work("a")), flights.run("b", lambda: work("b")))
+
+        self.assertEqual(asyncio.run(main()), ["a", "b"])
+        self.assertEqual(flights.stats()["coalesced"], 0)
+
+    def test_waiters_on_other_event_loops(self):
+        flights = SingleFlight()
+        started = threading.Event()
+        calls = []
+        results = []
+
+        async def work():
+            calls.append(1)
+            started.set()
+            await asyncio.sleep(0.2)
+            return "shared"
+
+        def follower():
+            started.wait(1)
+            results.append(asyncio.run(flights.run("key", work)))
+
+        thread = threading.Thread(target=follower)
+        thread.start()
+        results.append(asyncio.run(flights.run("key", work)))
+        thread.join(2)
+        self.assertEqual(results, ["shared", "shared"])
+        self.assertEqual(len(calls), 1)
+
+    def test_leader_error_reaches_waiters(self):
+        flights = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            raise RuntimeError("upstream failed")
+
+        async def main():
+            return await asyncio.gather(*[flights.run("key", work) for _ in range(3)], return_exceptions=True)
+
+        results = asyncio.run(main())
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual(flights.stats()["in_flight"], 0)
+
+    def test_cancelled_leader_hands_off(self):
+        flights = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return "done"
+
+        async def main():
+            leader = asyncio.ensure_future(flights.run("key", work))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flights.run("key", work))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await follower
+
+        self.assertEqual(asyncio.run(main()), "done")
+        self.assertEqual(len(calls), 2)
+
+if __name__ == '__main__':
+    unittest.main()
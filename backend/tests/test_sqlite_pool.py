@@ -0,0 +1,125 @@
+import unittest
+import sys
+import os
+import tempfile
+import sqlite3
+import threading
+import time
+
+# Add parent directory to path so we can import backend modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlite_pool import SQLitePool
+from community_database import CommunityDatabase
+
+class TestSQLitePool(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "pool.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_connections_are_tuned_and_reused(self):
+        pool = SQLitePool(self.db_path, readers=2, busy_timeout_ms=1234)
+        try:
+            with pool.reader() as conn:
+                first = conn
+                self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+                self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+                self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0], 1234)
+            with pool.reader() as conn:
+                self.assertIs(conn, first)
+            self.assertEqual(pool.stats()["readers_open"], 1)
+        finally:
+            pool.close()
+
+    def test_reads_do_not_wait_for_open_write(self):
+        pool = SQLitePool(self.db_path)
+        try:
+            with pool.writer() as conn:
+                conn.execute("CREATE TABLE t (v INTEGER)")
+                conn.execute("INSERT INTO t VALUES (1)")
+
+            in_write, release = threading.Event(), threading.Event()
+
+            def slow_write():
+                with pool.writer() as conn:
+                    conn.execute("INSERT INTO t VALUES (2)")
+                    in_write.set()
+                    release.wait(5)
+
+            writer = threading.Thread(target=slow_write)
+            writer.start()
+            in_write.wait(5)
+            started = time.monotonic()
+            with pool.reader() as conn:
+                count = conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+            self.assertLess(time.monotonic() - started, 0.5)
+            self.assertEqual(count, 1)  # last committed snapshot
+            release.set()
+            writer.join()
+            with pool.reader() as conn:
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 2)
+        finally:
+            pool.close()
+
+    def test_failed_write_rolls_back(self):
+        pool = SQLitePool(':memory:')
+        with pool.writer() as conn:
+            conn.execute("CREATE TABLE t (v INTEGER PRIMARY KEY)")
+        with self.assertRaises(RuntimeError):
+            with pool.writer() as conn:
+                conn.execute("INSERT INTO t VALUES (1)")
+                raise RuntimeError("boom")
+        with pool.reader() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 0)
+        pool.close()
+
+    def test_failed_commit_does_not_wedge_writer(self):
+        pool = SQLitePool(self.db_path)
+        try:
+            with pool.writer() as conn:
+                conn.execute("CREATE TABLE parent (id INTEGER PRIMARY KEY)")
+                conn.execute("CREATE TABLE child (parent_id INTEGER REFERENCES parent(id) DEFERRABLE INITIALLY DEFERRED)")
+            # A deferred foreign key violation makes COMMIT itself fail and leaves the transaction open
+            pool._writer.execute("PRAGMA foreign_keys = ON")
+            with self.assertRaises(sqlite3.IntegrityError):
+                with pool.writer() as conn:
+                    conn.execute("INSERT INTO child VALUES (42)")
+            self.assertFalse(pool._writer.in_transaction)
+            with pool.writer() as conn:
+                conn.execute("INSERT INTO parent VALUES (1)")
+            with pool.reader() as conn:
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM child").fetchone()[0], 0)
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM parent").fetchone()[0], 1)
+        finally:
+            pool.close()
+
+    def test_concurrent_votes_on_file_database(self):
+        db = CommunityDatabase(self.db_path)
+        try:
+            claim_id = db.post_claim("The Earth is round", "REAL")
+
+            def vote(i):
+                db.submit_vote(claim_id, f"user{i}", i % 2 == 0)
+                db.calculate_weighted_trust_score(claim_id)
+
+            threads = [threading.Thread(target=vote, args=(i,)) for i in range(20)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+            self.assertEqual(db.get_claim(claim_id)["total_votes"], 20)
+            self.assertEqual(db.calculate_weighted_trust_score(claim_id)[1], 20)
+            self.assertEqual(db.get_user_reputation("user0")["total_votes"], 1)
+            # Duplicate vote is rejected and leaves the counters untouched
+            self.assertFalse(db.submit_vote(claim_id, "user0", True))
+            self.assertEqual(db.get_claim(claim_id)["total_votes"], 20)
+            self.assertLessEqual(db.pool.stats()["readers_open"], db.pool.max_readers)
+        finally:
+            db.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+import sys
+import os
+import json
+import random
+
+# Add parent directory to path so we can import backend modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tolerant_json import ContinuationStitcher, TolerantJsonParser, parse_tolerant_json
+
+MODEL_OUTPUT = '''```json
+{
+  "verdict": "FALSE",
+  "confidence_score": 0.9,
+  "analysis": "**1. The Core Claim(s):**\\nThe post says "Mars has oceans", which NASA denies.",
+  "multimodal_cross_check": false,
+  "grounding_citations": [
+    {"title": "NASA", "url": "https://nasa.gov/mars", "snippet": "No liquid water",},
+  ],
+}
+```'''
+
+class TestTolerantJson(unittest.TestCase):
+    def test_valid_json_matches_json_loads(self):
+        doc = {"a": [1, {"b": "x\"y\\z ☃ \U0001F600"}], "c": None, "d": True, "e": -0.5, "f": []}
+        value, repairs = parse_tolerant_json(json.dumps(doc))
+        self.assertEqual(value, doc)
+        self.assertEqual(repairs, {})
+
+    def test_repairs_typical_model_output(self):
+        value, repairs = parse_tolerant_json(MODEL_OUTPUT)
+        self.assertEqual(value["verdict"], "FALSE")
+        self.assertIn('"Mars has oceans", which', value["analysis"])
+        self.assertFalse(value["multimodal_cross_check"])
+        self.assertEqual(value["grounding_citations"][0]["snippet"], "No liquid water")
+        self.assertEqual(repairs["unescaped_quote"], 2)
+        self.assertEqual(repairs["trailing_comma"], 3)
+        self.assertIn("stripped_prefix", repairs)
+        self.assertIn("stripped_suffix", repairs)
+
+    def test_inner_quote_followed_by_comma(self):
+        value, _ = parse_tolerant_json('{"text": "the "best", "worst" ones", "list": ["a "q", b", "c"]}')
+        self.assertEqual(value, {"text": 'the "best", "worst" ones', "list": ['a "q", b', "c"]})
+
+    def test_citation_markers_in_preamble_are_skipped(self):
+        text = 'Based on sources [1] and [2], here is my answer:\n{"verdict":"TRUE","analysis":"x"}'
+        value, repairs = parse_tolerant_json(text)
+        self.assertEqual(value, {"verdict": "TRUE", "analysis": "x"})
+        self.assertEqual(repairs, {"stripped_prefix": 1})
+        # Same when the preamble arrives in its own streamed chunk
+        parser = TolerantJsonParser()
+        parser.feed("Sources [1], [2]:")
+        parser.feed(' {"verdict": "FALSE"}')
+        self.assertEqual(parser.close(), {"verdict": "FALSE"})
+
+    def test_missing_comma_and_python_literals(self):
+        value, repairs = parse_tolerant_json('{"a": "x"\n "b": True "c": None}')
+        self.assertEqual(value, {"a": "x", "b": True, "c": None})
+        self.assertEqual(repairs["missing_comma"], 2)
+        self.assertEqual(repairs["python_literal"], 2)
+
+    def test_truncated_tails(self):
+        value, repairs = parse_tolerant_json('{"verdict": "TRUE", "analysis": "Evidence shows')
+        self.assertEqual(value, {"verdict": "TRUE", "analysis": "Evidence shows"})
+        self.assertEqual(repairs, {"truncated_string": 1, "closed_containers": 1})
+
+        value, repairs = parse_tolerant_json('{"verdict": "TRUE", "confidence_score": 0.')
+        self.assertEqual(value, {"verdict": "TRUE"})
+        self.assertIn("truncated_token", repairs)
+
+        value, repairs = parse_tolerant_json('{"verdict": "TRUE", "analy')
+        self.assertEqual(value, {"verdict": "TRUE"})
+        self.assertIn("dropped_incomplete_member", repairs)
+
+    def test_chunked_feed_matches_one_shot(self):
+        expected = parse_tolerant_json(MODEL_OUTPUT)
+        rng = random.Random(7)
+        for _ in range(50):
+            parser = TolerantJsonParser()
+            i = 0
+            while i < len(MODEL_OUTPUT):
+                step = rng.randint(1, 9)
+                parser.feed(MODEL_OUTPUT[i:i + step])
+                i += step
+            self.assertEqual((parser.close(), parser.repairs), expected)
+
+    def test_complete_flag_tracks_top_level_close(self):
+        parser = TolerantJsonParser()
+        parser.feed('{"a": {"b": 1}')
+        self.assertFalse(parser.complete)
+        parser.feed('}')
+        self.assertTrue(parser.complete)
+
+    def test_no_object(self):
+        with self.assertRaises(ValueError):
+            parse_tolerant_json("I cannot help with that.")
+
+    def test_linear_time_on_large_input(self):
+        body = "word " * 200000
+        value, _ = parse_tolerant_json('{"analysis": "' + body + '"}')
+        self.assertEqual(len(value["analysis"]), len(body))
+
+class TestContinuationStitcher(unittest.TestCase):
+    def test_drops_fence_and_repeated_overlap(self):
+        first = '{"verdict": "FALSE", "analysis": "NASA reports that Mars has no'
+        stitcher = ContinuationStitcher(first)
+        out = stitcher.feed('```json\nreports that Mars has no liquid water"}')
+        out += stitcher.flush()
+        self.assertEqual(out, ' liquid water"}')
+        self.assertEqual(parse_tolerant_json(first + out)[0]["analysis"], "NASA reports that Mars has no liquid water")
+
+    def test_clean_continuation_passes_through_in_chunks(self):
+        stitcher = ContinuationStitcher("abc", window=10)
+        pieces = [stitcher.feed(p) for p in ["def", "ghijklmn", "opq"]] + [stitcher.flush()]
+        self.assertEqual(pieces, ["", "defghijklmn", "opq", ""])
+
+    def test_continuation_completes_parser(self):
+        parser = TolerantJsonParser()
+        first = '{"verdict": "TRUE", "analysis": "Confirmed by two'
+        parser.feed(first)
+        self.assertFalse(parser.complete)
+        stitcher = ContinuationStitcher(first)
+        parser.feed(stitcher.feed(' independent sources.", "confidence_score": 0.8}') + stitcher.flush())
+        self.assertTrue(parser.complete)
+        self.assertEqual(parser.close()["analysis"], "Confirmed by two independent sources.")
+        self.assertEqual(parser.repairs, {})
+
+if __name__ == '__main__':
+    unittest.main()
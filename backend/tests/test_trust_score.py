@@ -0,0 +1,98 @@
+import unittest
+import sys
+import os
+import random
+import sqlite3
+import tempfile
+
+# Add parent directory to path so we can import backend modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from community_database import CommunityDatabase, SCHEMA_MIGRATIONS
+
+def reference_trust_score(db, claim_id):
+    """T_s computed from scratch, as calculate_weighted_trust_score did before materialization."""
+    with db.pool.reader() as conn:
+        votes = conn.execute("""
+            SELECT v.vote, COALESCE(ur.reputation_score, 0.1) as reputation
+            FROM community_verdicts v
+            LEFT JOIN user_reputation ur ON v.user_id = ur.user_id
+            WHERE v.claim_id = ?
+        """, (claim_id,)).fetchall()
+    if not votes:
+        return 0.0, 0
+    numerator = sum(max(v['reputation'], 0.1) for v in votes if v['vote'])
+    denominator = sum(max(v['reputation'], 0.1) for v in votes)
+    return numerator / denominator * 100, len(votes)
+
+class TestMaterializedTrustScore(unittest.TestCase):
+    def setUp(self):
+        self.db = CommunityDatabase(':memory:')
+
+    def tearDown(self):
+        self.db.close()
+
+    def _assert_matches_reference(self, claim_ids):
+        for claim_id in claim_ids:
+            score, count = self.db.calculate_weighted_trust_score(claim_id)
+            expected_score, expected_count = reference_trust_score(self.db, claim_id)
+            self.assertEqual(count, expected_count)
+            self.assertAlmostEqual(score, expected_score, places=9)
+
+    def test_maintained_on_every_vote(self):
+        rng = random.Random(5)
+        claim_ids = [self.db.post_claim(f"Claim {i}", rng.choice(["REAL", "FAKE"])) for i in range(15)]
+        for _ in range(300):
+            self.db.submit_vote(rng.choice(claim_ids), f"user{rng.randrange(25)}", rng.random() < 0.6)
+        # Reputation changes re-weigh every earlier verdict of the voter
+        self._assert_matches_reference(claim_ids)
+
+        listed = {c['claim_id']: c for c in self.db.get_top_claims(100)}
+        for claim_id in claim_ids:
+            self.assertEqual((listed[claim_id]['trust_score'], listed[claim_id]['vote_count']), self.db.calculate_weighted_trust_score(claim_id))
+        discussion = self.db.get_claim_discussion(claim_ids[0])
+        self.assertEqual((discussion['trust_score'], discussion['vote_count']), self.db.calculate_weighted_trust_score(claim_ids[0]))
+
+    def test_rejected_vote_leaves_score_untouched(self):
+        claim_id = self.db.post_claim("The Earth is round", "REAL")
+        self.db.submit_vote(claim_id, "user1", True)
+        before = self.db.calculate_weighted_trust_score(claim_id)
+        self.assertFalse(self.db.submit_vote(claim_id, "user1", False))
+        self.assertEqual(self.db.calculate_weighted_trust_score(claim_id), before)
+        self.assertEqual(self.db.calculate_weighted_trust_score("missing"), (0.0, 0))
+
+    def test_rebuild_repairs_drift(self):
+        claim_ids = [self.db.post_claim("Claim A", "REAL"), self.db.post_claim("Claim B", "FAKE")]
+        for i in range(6):
+            self.db.submit_vote(claim_ids[i % 2], f"user{i % 3}", i % 3 != 0)
+        with self.db.pool.writer() as conn:
+            conn.execute("UPDATE claims SET trust_numerator = 999, trust_vote_count = 0")
+        self.assertEqual(self.db.rebuild_trust_scores(), 2)
+        self._assert_matches_reference(claim_ids)
+
+    def test_migration_backfills_existing_votes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "community.db")
+            # A version 2 database with votes but no materialized columns
+            conn = sqlite3.connect(db_path)
+            for version, statements in SCHEMA_MIGRATIONS:
+                if version > 2:
+                    break
+                for statement in statements:
+                    conn.execute(statement)
+            conn.execute("PRAGMA user_version = 2")
+            conn.execute("INSERT INTO claims (claim_id, claim_text, ai_verdict, total_votes) VALUES ('c1', 'Old claim', 'REAL', 2)")
+            conn.execute("INSERT INTO community_verdicts (claim_id, user_id, user_verdict, vote) VALUES ('c1', 'u1', 'LEGIT', 1)")
+            conn.execute("INSERT INTO community_verdicts (claim_id, user_id, user_verdict, vote) VALUES ('c1', 'u2', 'FAKE', 0)")
+            conn.execute("INSERT INTO user_reputation (user_id, reputation_score) VALUES ('u1', 0.9)")
+            conn.commit()
+            conn.close()
+
+            db = CommunityDatabase(db_path)
+            score, count = db.calculate_weighted_trust_score("c1")
+            self.assertEqual(count, 2)
+            self.assertAlmostEqual(score, 0.9 / 1.0 * 100)
+            db.close()
+
+if __name__ == '__main__':
+    unittest.main()
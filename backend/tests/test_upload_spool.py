@@ -0,0 +1,118 @@
+import unittest
+import sys
+import os
+import asyncio
+import hashlib
+import io
+from typing import List
+
+# Add parent directory to path so we can import backend modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from starlette.datastructures import Headers, UploadFile as StarletteUploadFile
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+
+from upload_spool import RequestSizeLimitMiddleware, UploadBudget, UploadTooLarge, spool_upload
+
+class _CountingFile(io.BytesIO):
+    """BytesIO that records how many bytes callers actually pulled."""
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+def _upload(data, name="doc.pdf"):
+    return StarletteUploadFile(file=_CountingFile(data), filename=name, headers=Headers({"content-type": "application/pdf"}))
+
+class TestUploadSpool(unittest.TestCase):
+    def test_digest_and_payload(self):
+        data = os.urandom(600 * 1024)
+        upload = asyncio.run(spool_upload(_upload(data), UploadBudget()))
+        self.assertEqual(upload.size, len(data))
+        self.assertEqual(upload.sha256, hashlib.sha256(data).hexdigest())
+        self.assertEqual(upload.mime_type, "application/pdf")
+        self.assertEqual(upload.read_payload(), data)
+
+    def test_per_file_limit_aborts_mid_stream(self):
+        upload = _upload(b"x" * (4 * 1024 * 1024))
+        budget = UploadBudget(max_file_bytes=1024 * 1024)
+        with self.assertRaises(UploadTooLarge):
+            asyncio.run(spool_upload(upload, budget))
+        # Stopped shortly after the limit rather than reading the whole file
+        self.assertLess(upload.file.bytes_read, 2 * 1024 * 1024)
+
+    def test_total_limit_spans_files(self):
+        budget = UploadBudget(max_file_bytes=1024 * 1024, max_total_bytes=1536 * 1024)
+        asyncio.run(spool_upload(_upload(b"a" * (1024 * 1024)), budget))
+        with self.assertRaisesRegex(UploadTooLarge, "Total payload"):
+            asyncio.run(spool_upload(_upload(b"b" * (1024 * 1024)), budget))
+
+    def test_middleware_rejects_large_bodies(self):
+        app = FastAPI()
+        app.add_middleware(RequestSizeLimitMiddleware, max_request_bytes=64 * 1024)
+
+        @app.post("/analyze")
+        async def analyze(files: List[UploadFile] = File(...)):
+            return {"count": len(files)}
+
+        client = TestClient(app)
+        small = client.post("/analyze", files=[("files", ("a.png", b"x" * 1024, "image/png"))])
+        self.assertEqual(small.status_code, 200)
+
+        large = client.post("/analyze", files=[("files", ("a.png", b"x" * (128 * 1024), "image/png"))])
+        self.assertEqual(large.status_code, 413)
+
+        def chunked_body():
+            for _ in range(32):
+                yield b"y" * (8 * 1024)
+
+        streamed = client.post("/analyze", content=chunked_body(), headers={"content-type": "multipart/form-data; boundary=zz"})
+        self.assertEqual(streamed.status_code, 413)
+
+    def test_middleware_rejects_oversized_file_mid_stream(self):
+        app = FastAPI()
+        app.add_middleware(RequestSizeLimitMiddleware, max_request_bytes=8 * 1024 * 1024, max_file_bytes=64 * 1024)
+        handled = []
+
+        @app.post("/analyze")
+        async def analyze(files: List[UploadFile] = File(...)):
+            handled.append(len(files))
+            return {"count": len(files)}
+
+        client = TestClient(app)
+        # Several files under the per-file limit pass even though together they exceed it
+        ok = client.post("/analyze", files=[("files", (f"{i}.png", b"x" * (60 * 1024), "image/png")) for i in range(3)])
+        self.assertEqual(ok.status_code, 200)
+
+        chunks = [b"--zz\r\nContent-Disposition: form-data; name=\"files\"; filename=\"big.pdf\"\r\nContent-Type: application/pdf\r\n\r\n"]
+        chunks += [b"y" * (8 * 1024)] * 512 + [b"\r\n--zz--\r\n"]
+        received, sent = [], []
+
+        async def receive():
+            received.append(1)
+            return {"type": "http.request", "body": chunks[len(received) - 1], "more_body": len(received) < len(chunks)}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": "POST", "path": "/analyze", "query_string": b"", "headers": [(b"content-type", b"multipart/form-data; boundary=zz")]}
+        async def parse_form(scope, receive, send):
+            await Request(scope, receive).form()
+
+        with self.assertRaises(HTTPException) as raised:
+            asyncio.run(RequestSizeLimitMiddleware(parse_form, max_file_bytes=64 * 1024)(scope, receive, send))
+        self.assertEqual(raised.exception.status_code, 413)
+        self.assertIn("File exceeds", raised.exception.detail)
+        # Aborted shortly after the limit, not after the whole 4MB part
+        self.assertLess(len(received), 16)
+        self.assertEqual(handled, [3])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+import sys
+import os
+import asyncio
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path so we can import backend modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from url_cache import UrlCache
+from url_fetcher import UrlFetcher
+
+class _ETagHandler(BaseHTTPRequestHandler):
+    full_responses = 0
+    not_modified = 0
+
+    def do_GET(self):
+        if self.headers.get("If-None-Match") == '"v1"':
+            _ETagHandler.not_modified += 1
+            self.send_response(304)
+            self.end_headers()
+            return
+        _ETagHandler.full_responses += 1
+        body = b"article body " * 50
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestUrlCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _ETagHandler)
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/story"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "urls.db")
+        _ETagHandler.full_responses = 0
+        _ETagHandler.not_modified = 0
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _fetch_twice(self, cache):
+        fetcher = UrlFetcher(cache=cache)
+
+        async def main():
+            first = await fetcher.fetch(self.url)
+            second = await fetcher.fetch(self.url)
+            await fetcher.aclose()
+            return first, second
+
+        return asyncio.run(main())
+
+    def test_fresh_entry_served_without_request(self):
+        cache = UrlCache(self.db_path, max_age_seconds=60)
+        first, second = self._fetch_twice(cache)
+        self.assertEqual(first, second)
+        self.assertEqual(_ETagHandler.full_responses, 1)
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["bytes_saved"], len(b"article body " * 50))
+
+    def test_stale_entry_revalidated_with_etag(self):
+        cache = UrlCache(self.db_path, max_age_seconds=0)
+        first, second = self._fetch_twice(cache)
+        self.assertEqual(first, second)
+        self.assertEqual(_ETagHandler.full_responses, 1)
+        self.assertEqual(_ETagHandler.not_modified, 1)
+        self.assertEqual(cache.stats()["revalidated"], 1)
+
+    def test_byte_budget_evicts_least_recently_used(self):
+        cache = UrlCache(self.db_path, max_bytes=25)
+        cache.store("a.com", "x" * 10, body_bytes=100)
+        cache.store("b.com", "y" * 10, body_bytes=100)
+        cache.record_hit(cache.lookup("a.com"))
+        cache.store("c.com", "z" * 10, body_bytes=100)
+        self.assertIsNone(cache.lookup("b.com"))
+        self.assertIsNotNone(cache.lookup("a.com"))
+        self.assertEqual(cache.stats()["stored_bytes"], 20)
+
+    def test_survives_restart(self):
+        UrlCache(self.db_path).store("a.com", "cached", body_bytes=6)
+        self.assertEqual(UrlCache(self.db_path).lookup("a.com")["content"], "cached")
+
+    def test_disk_io_runs_off_the_event_loop(self):
+        threads = []
+
+        class _TracingCache(UrlCache):
+            def lookup(self, url_key):
+                threads.append(threading.get_ident())
+                return super().lookup(url_key)
+
+            def store(self, *args, **kwargs):
+                threads.append(threading.get_ident())
+                return super().store(*args, **kwargs)
+
+        self._fetch_twice(_TracingCache(self.db_path, max_age_seconds=60))
+        self.assertEqual(len(threads), 3)  # lookup, store, lookup
+        self.assertNotIn(threading.get_ident(), threads)
+
+    def test_unopenable_database_disables_cache(self):
+        # The database path is a directory, so sqlite3.connect fails
+        cache = UrlCache(self.tmpdir.name)
+        self.assertFalse(cache.enabled)
+        first, second = self._fetch_twice(cache)
+        self.assertEqual(first, second)
+        self.assertEqual(_ETagHandler.full_responses, 2)
+        stats = cache.stats()
+        self.assertEqual(stats["misses"], 2)
+        self.assertEqual(stats["stores"], 0)
+        self.assertFalse(stats["enabled"])
+
+if __name__ == '__main__':
+    unittest.main()
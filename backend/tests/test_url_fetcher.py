@@ -0,0 +1,127 @@
+import unittest
+import sys
+import os
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path so we can import backend modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from url_fetcher import UrlFetcher, normalize_url
+
+class _SlowHandler(BaseHTTPRequestHandler):
+    hits = []
+
+    def do_GET(self):
+        _SlowHandler.hits.append(self.path)
+        if self.path == "/article":
+            # ~4 MB page: only the first few KB should ever be read
+            body = b"<html><body><script>x=1</script>" + b"<p>" + b"Officials confirmed the report on Monday. " * 100000 + b"</p></body></html>"
+            content_type = "text/html; charset=utf-8"
+        else:
+            time.sleep(0.2)
+            body = f"page {self.path}".encode()
+            content_type = "text/plain"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestUrlFetcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _SlowHandler)
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _SlowHandler.hits = []
+
+    def test_normalize_url(self):
+        self.assertEqual(normalize_url("https://www.Example.com/a/"), "example.com/a")
+
+    def test_fan_out_and_dedup(self):
+        fetcher = UrlFetcher(per_host_limit=8)
+        urls = [f"{self.base}/{i}" for i in range(5)] + [f"{self.base}/0/"]
+
+        async def main():
+            started = time.monotonic()
+            results = await fetcher.fetch_many(urls)
+            elapsed = time.monotonic() - started
+            await fetcher.aclose()
+            return results, elapsed
+
+        results, elapsed = asyncio.run(main())
+        self.assertEqual([r.url for r in results], urls[:5])
+        self.assertEqual(results[2].content, "page /2")
+        self.assertTrue(all(r.ok for r in results))
+        self.assertEqual(len(_SlowHandler.hits), 5)
+        # Five 200 ms pages fetched concurrently, not back to back
+        self.assertLess(elapsed, 0.8)
+
+    def test_per_host_limit(self):
+        fetcher = UrlFetcher(per_host_limit=1)
+        urls = [f"{self.base}/{i}" for i in range(3)]
+
+        async def main():
+            started = time.monotonic()
+            await fetcher.fetch_many(urls)
+            await fetcher.aclose()
+            return time.monotonic() - started
+
+        self.assertGreaterEqual(asyncio.run(main()), 0.6)
+
+    def test_html_is_streamed_and_extracted(self):
+        fetcher = UrlFetcher()
+
+        async def main():
+            response_sizes = []
+            original = fetcher._read_content
+
+            async def spy(response):
+                content, bytes_read = await original(response)
+                response_sizes.append(bytes_read)
+                return content, bytes_read
+
+            fetcher._read_content = spy
+            content = await fetcher.fetch(f"{self.base}/article")
+            await fetcher.aclose()
+            return content, response_sizes[0]
+
+        content, bytes_read = asyncio.run(main())
+        self.assertLess(bytes_read, 1024 * 1024)
+        self.assertTrue(content.startswith("Officials confirmed the report"))
+        self.assertNotIn("<p>", content)
+        self.assertLessEqual(len(content), 5000)
+
+    def test_errors_become_placeholder_text(self):
+        fetcher = UrlFetcher(timeout=1)
+        content = asyncio.run(fetcher.fetch("http://127.0.0.1:1/unreachable"))
+        self.assertEqual(content, "[Error fetching content from http://127.0.0.1:1/unreachable]")
+
+    def test_fetch_many_reports_failures(self):
+        fetcher = UrlFetcher(timeout=1)
+
+        async def main():
+            results = await fetcher.fetch_many([f"{self.base}/0", "http://127.0.0.1:1/unreachable"])
+            await fetcher.aclose()
+            return results
+
+        ok, failed = asyncio.run(main())
+        self.assertTrue(ok.ok)
+        self.assertFalse(failed.ok)
+        self.assertEqual(failed.content, "[Error fetching content from http://127.0.0.1:1/unreachable]")
+
+if __name__ == '__main__':
+    unittest.main()
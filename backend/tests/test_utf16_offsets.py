@@ -0,0 +1,49 @@
+import unittest
+import sys
+import os
+import random
+import time
+
+# Add parent directory to path so we can import backend modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utf16_offsets import Utf16Offsets
+from grounding_service import GroundingService
+
+class TestUtf16Offsets(unittest.TestCase):
+    def test_matches_prefix_encoding(self):
+        rng = random.Random(5)
+        alphabet = "ab .é中👍🚀"
+        for _ in range(100):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+            offsets = Utf16Offsets(text)
+            self.assertEqual(offsets.length, len(text.encode("utf-16-le")) // 2)
+            for i in range(len(text) + 1):
+                self.assertEqual(offsets.offset(i), len(text[:i].encode("utf-16-le")) // 2)
+
+    def test_bmp_text_needs_no_table(self):
+        offsets = Utf16Offsets("Café 中文.")
+        self.assertIsNone(offsets._prefix)
+        self.assertEqual(offsets.span(2, 7), (2, 7))
+
+    def test_shared_table_reused_only_for_same_text(self):
+        offsets = Utf16Offsets("Hello 👍.")
+        self.assertIs(Utf16Offsets.for_text("Hello 👍.", offsets), offsets)
+        self.assertIsNot(Utf16Offsets.for_text("Hello.", offsets), offsets)
+
+    def test_segmentation_is_linear(self):
+        service = GroundingService()
+        sentence = "The rover 🚀 found ancient lakebeds. "
+        text = sentence * 20000
+        start = time.perf_counter()
+        segments = service._segment_text(text, Utf16Offsets(text))
+        elapsed = time.perf_counter() - start
+        self.assertEqual(len(segments), 20000)
+        # Trailing whitespace is not a segment
+        self.assertEqual(segments[-1]["endIndex"], Utf16Offsets(text).length - 1)
+        # The second sentence starts at the space after the first period, one emoji in
+        self.assertEqual(segments[1]["startIndex"], len(sentence))
+        self.assertLess(elapsed, 5.0)
+
+if __name__ == '__main__':
+    unittest.main()
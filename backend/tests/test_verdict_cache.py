@@ -0,0 +1,123 @@
+import unittest
+import sys
+import os
+import asyncio
+import tempfile
+import threading
+import time
+from unittest import mock
+
+# Add parent directory to path so we can import backend modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import AnalysisResponse
+from verdict_cache import VerdictCache, build_cache_key
+
+class TestVerdictCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "verdicts.db")
+        self.cache = VerdictCache(self.db_path, ttl_seconds=60, max_entries=2)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _response(self, verdict="TRUE"):
+        return AnalysisResponse(verdict=verdict, confidence_score=0.9, analysis="The sky is blue.")
+
+    def test_key_is_canonical(self):
+        """Whitespace, case and URL order must not change the key."""
+        a = build_cache_key("The  Earth is ROUND ", ["b.com/x", "a.com"], [("abc", "image/png")])
+        b = build_cache_key("the earth is round", ["a.com", "b.com/x"], [("abc", "image/png")])
+        c = build_cache_key("the earth is round", ["a.com"], [("abc", "image/png")])
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+
+    def test_memory_hit_and_stats(self):
+        self.assertIsNone(self.cache.get("k1"))
+        response = self._response()
+        self.cache.put("k1", response)
+        self.assertIs(self.cache.get("k1"), response)
+        stats = self.cache.stats()
+        self.assertEqual(stats["memory_hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hit_ratio"], 0.5)
+
+    def test_disk_tier_survives_restart(self):
+        self.cache.put("k1", self._response())
+        restarted = VerdictCache(self.db_path, ttl_seconds=60, max_entries=2)
+        cached = restarted.get("k1")
+        self.assertIsNotNone(cached)
+        self.assertEqual(cached.verdict, "TRUE")
+        self.assertEqual(restarted.stats()["disk_hits"], 1)
+
+    def test_lru_eviction_and_ttl(self):
+        for key in ("k1", "k2", "k3"):
+            self.cache.put(key, self._response())
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+        expiring = VerdictCache(self.db_path, ttl_seconds=1, max_entries=2)
+        expiring.put("k4", self._response())
+        time.sleep(1.1)
+        self.assertIsNone(expiring.get("k4"))
+
+    def test_transient_verdicts_not_cached(self):
+        self.cache.put("k1", self._response("RATE_LIMIT_ERROR"))
+        self.assertIsNone(self.cache.get("k1"))
+
+class TestAnalyzeContentCaching(unittest.TestCase):
+    """The cache key covers URLs, not page content, so failed fetches must not be cached."""
+
+    def setUp(self):
+        import main
+        from url_fetcher import UrlFetcher
+        self.main = main
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.saved = (main._verdict_cache, main._url_fetcher)
+        main._verdict_cache = VerdictCache(os.path.join(self.tmpdir.name, "verdicts.db"), ttl_seconds=60)
+        main._url_fetcher = UrlFetcher(timeout=1)
+        self.gemini = mock.AsyncMock(return_value=AnalysisResponse(verdict="UNVERIFIABLE", confidence_score=0.2, analysis="The page could not be read."))
+
+    def tearDown(self):
+        self.main._verdict_cache, self.main._url_fetcher = self.saved
+        self.tmpdir.cleanup()
+
+    def _analyze(self, urls):
+        async def run():
+            try:
+                return await self.main.analyze_content("req", "Claim", urls)
+            finally:
+                await self.main._url_fetcher.aclose()
+        with mock.patch.object(self.main, "process_multimodal_gemini", self.gemini):
+            return asyncio.run(run())
+
+    def test_failed_fetch_is_not_cached(self):
+        urls = ["http://127.0.0.1:1/unreachable"]
+        self._analyze(urls)
+        self._analyze(urls)
+        self.assertEqual(self.gemini.await_count, 2)
+        self.assertEqual(self.main._verdict_cache.stats()["stores"], 0)
+
+    def test_without_urls_verdict_is_cached(self):
+        self._analyze([])
+        self._analyze([])
+        self.assertEqual(self.gemini.await_count, 1)
+
+    def test_cache_io_runs_off_the_event_loop(self):
+        cache = self.main._verdict_cache
+        threads = []
+        get, put = cache.get, cache.put
+
+        def traced(fn):
+            def wrapper(*args):
+                threads.append(threading.get_ident())
+                return fn(*args)
+            return wrapper
+
+        with mock.patch.object(cache, "get", traced(get)), mock.patch.object(cache, "put", traced(put)):
+            self._analyze([])
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(threading.get_ident(), threads)
+
+if __name__ == '__main__':
+    unittest.main()
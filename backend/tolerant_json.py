@@ -0,0 +1,442 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Parser states
+_START = "start"      # skipping preamble (```json fences, chatter) until the first {
+_KEY = "key"          # inside an object, expecting a key or }
+_COLON = "colon"      # after a key, expecting :
+_VALUE = "value"      # expecting a value
+_AFTER = "after"      # after a value, expecting , or a closing bracket
+_STRING = "string"
+_TOKEN = "token"      # number or literal
+_DONE = "done"        # top-level container closed
+
+_WHITESPACE = re.compile(r"\s*")
+_STRING_RUN = re.compile(r'[^"\\]+')
+_TOKEN_RUN = re.compile(r"[A-Za-z0-9_.+\-]+")
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+_PYTHON_LITERALS = {"True": True, "False": False, "None": None}
+_VALUE_STARTS = set('"{[-0123456789tfnTFN')
+# How far past a quote we look to decide whether it closes the string
+_KEY_LOOKAHEAD = 64
+
+
+class TolerantJsonParser:
+    """
+    Single-pass, incremental, error-tolerant JSON parser for LLM output.
+
+    Feed text as it arrives; the parser consumes everything it can decide on
+    and only holds back the few characters of lookahead needed to tell a
+    closing quote from an unescaped inner one. Repairs are applied on the fly
+    and counted in `repairs`:
+
+        stripped_prefix / stripped_suffix  text around the JSON (fences, chatter)
+        unescaped_quote                    inner " that is not followed by , } ] or a key
+        trailing_comma                     , directly before } or ]
+        missing_comma                      two members with no , between them
+        invalid_escape                     \\x style escapes, kept literally
+        python_literal                     True / False / None
+        invalid_token                      unparseable bare word, replaced by null
+        truncated_string / truncated_token value cut off at the end of input
+        dropped_incomplete_member          key with no value at the end of input
+        closed_containers                  { or [ never closed
+
+    `value` is live while parsing (partially filled containers), `complete`
+    flips once the top-level container closes, and close() finalizes a
+    truncated tail and returns the value.
+    """
+
+    def __init__(self):
+        self.value: Any = None
+        self.complete = False
+        self.repairs: Dict[str, int] = {}
+        self._buf = ""
+        self._pos = 0
+        self._state = _START
+        self._stack: List[list] = []  # [container, pending_key] frames
+        self._after_comma = False
+        self._string_parts: List[str] = []
+        self._string_is_key = False
+        self._closed = False
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def feed(self, text: str) -> None:
+        if self._closed:
+            raise ValueError("Parser already closed")
+        # Only the undecided tail is carried over, so total work stays linear
+        self._buf = self._buf[self._pos:] + text
+        self._pos = 0
+        self._advance(final=False)
+
+    def close(self) -> Any:
+        """Consumes the remaining input, repairs a truncated tail and returns the parsed value."""
+        if not self._closed:
+            self._closed = True
+            self._advance(final=True)
+            self._finish_truncated()
+        if self.value is None:
+            raise ValueError("No JSON object found in text")
+        return self.value
+
+    # --- scanning ---
+
+    def _repair(self, name: str) -> None:
+        self.repairs[name] = self.repairs.get(name, 0) + 1
+
+    def _skip_ws(self, pos: int) -> int:
+        return _WHITESPACE.match(self._buf, pos).end()
+
+    def _advance(self, final: bool) -> None:
+        buf = self._buf
+        while True:
+            self._pos = self._skip_ws(self._pos) if self._state not in (_STRING, _TOKEN) else self._pos
+            if self._pos >= len(buf):
+                return
+            char = buf[self._pos]
+            state = self._state
+
+            if state == _STRING:
+                if not self._scan_string(final):
+                    return
+            elif state == _TOKEN:
+                if not self._scan_token(final):
+                    return
+            elif state == _START:
+                # The top-level value is always an object: a "[1]" citation marker in the preamble is not JSON
+                start = buf.find("{", self._pos)
+                if start == -1:
+                    if buf[self._pos:].strip():
+                        self.repairs["stripped_prefix"] = 1
+                    self._pos = len(buf)
+                    return
+                if buf[self._pos:start].strip():
+                    self.repairs["stripped_prefix"] = 1
+                self._pos = start
+                self._state = _VALUE
+            elif state == _DONE:
+                self.repairs["stripped_suffix"] = 1
+                self._pos = len(buf)
+                return
+            elif state == _KEY:
+                self._pos += 1
+                if char == '"':
+                    self._begin_string(is_key=True)
+                elif char == "}":
+                    if self._after_comma:
+                        self._repair("trailing_comma")
+                    self._close_container()
+                elif char == "]":
+                    self._close_container()
+                # anything else is stray text between members and is skipped
+            elif state == _COLON:
+                if char == ":":
+                    self._pos += 1
+                # a missing colon is tolerated: parse the value anyway
+                self._state = _VALUE
+            elif state == _VALUE:
+                self._scan_value_start(char)
+            elif state == _AFTER:
+                self._scan_after_value(char)
+
+    def _scan_value_start(self, char: str) -> None:
+        frame = self._stack[-1] if self._stack else None
+        if char == '"':
+            self._pos += 1
+            self._begin_string(is_key=False)
+        elif char == "{":
+            self._pos += 1
+            self._open_container({})
+        elif char == "[":
+            self._pos += 1
+            self._open_container([])
+        elif char in "]}":
+            if frame is not None and isinstance(frame[0], list) and self._after_comma:
+                self._repair("trailing_comma")
+            elif frame is not None and isinstance(frame[0], dict):
+                self._repair("dropped_incomplete_member")
+                frame[1] = None
+            self._pos += 1
+            self._close_container()
+        elif char in _VALUE_STARTS or char.isalnum():
+            self._state = _TOKEN
+        else:
+            # Stray punctuation where a value should be
+            self._pos += 1
+
+    def _scan_after_value(self, char: str) -> None:
+        frame = self._stack[-1]
+        is_object = isinstance(frame[0], dict)
+        if char == ",":
+            self._pos += 1
+            self._after_comma = True
+            self._state = _KEY if is_object else _VALUE
+        elif char in "]}":
+            self._pos += 1
+            self._close_container()
+        elif char in _VALUE_STARTS:
+            # Next member started without a separating comma
+            self._repair("missing_comma")
+            self._after_comma = False
+            self._state = _KEY if is_object else _VALUE
+        else:
+            self._pos += 1
+
+    def _begin_string(self, is_key: bool) -> None:
+        self._state = _STRING
+        self._string_is_key = is_key
+        self._string_parts = []
+
+    def _scan_string(self, final: bool) -> bool:
+        """Returns False when more input is needed to make progress."""
+        buf = self._buf
+        while self._pos < len(buf):
+            run = _STRING_RUN.match(buf, self._pos)
+            if run:
+                self._string_parts.append(run.group())
+                self._pos = run.end()
+                continue
+            char = buf[self._pos]
+            if char == "\\":
+                if not self._scan_escape(final):
+                    return False
+                continue
+            # char is a quote: closing, or an unescaped quote inside the text?
+            closes = self._quote_closes_string(self._pos, final)
+            if closes is None:
+                return False
+            self._pos += 1
+            if closes:
+                self._finish_string()
+                return True
+            self._repair("unescaped_quote")
+            self._string_parts.append('"')
+        return final
+
+    def _scan_escape(self, final: bool) -> bool:
+        buf = self._buf
+        if self._pos + 1 >= len(buf):
+            if final:
+                self._pos += 1
+            return final
+        code = buf[self._pos + 1]
+        if code == "u":
+            digits = buf[self._pos + 2:self._pos + 6]
+            if len(digits) < 4 and not final:
+                return False
+            if len(digits) == 4 and all(c in "0123456789abcdefABCDEF" for c in digits):
+                self._string_parts.append(chr(int(digits, 16)))
+                self._pos += 6
+            else:
+                self._repair("invalid_escape")
+                self._string_parts.append("u")
+                self._pos += 2
+            return True
+        if code in _ESCAPES:
+            self._string_parts.append(_ESCAPES[code])
+        else:
+            self._repair("invalid_escape")
+            self._string_parts.append(code)
+        self._pos += 2
+        return True
+
+    def _quote_closes_string(self, pos: int, final: bool) -> Optional[bool]:
+        """True/False once decidable, None if the lookahead is not buffered yet."""
+        if self._string_is_key:
+            return True
+        buf = self._buf
+        frame = self._stack[-1]
+        i = self._skip_ws(pos + 1)
+        if i >= len(buf):
+            return True if final else None
+        char = buf[i]
+        if char in "}]":
+            return True
+        if char == '"':
+            # A following "key": means a missing comma rather than an inner quote
+            return self._looks_like_key(i, final) if isinstance(frame[0], dict) else False
+        if char != ",":
+            return False
+        j = self._skip_ws(i + 1)
+        if j >= len(buf):
+            return True if final else None
+        following = buf[j]
+        if isinstance(frame[0], list):
+            return following in _VALUE_STARTS or following == "]"
+        if following == "}":
+            return True
+        if following != '"':
+            return False
+        return self._looks_like_key(j, final)
+
+    def _looks_like_key(self, quote_pos: int, final: bool) -> Optional[bool]:
+        buf = self._buf
+        end = buf.find('"', quote_pos + 1, quote_pos + 1 + _KEY_LOOKAHEAD)
+        if end == -1:
+            if len(buf) < quote_pos + 1 + _KEY_LOOKAHEAD:
+                # Input ends inside the candidate key: wait, or treat it as a truncated key
+                return True if final else None
+            return False
+        if "\n" in buf[quote_pos:end]:
+            return False
+        colon = self._skip_ws(end + 1)
+        if colon >= len(buf):
+            return True if final else None
+        return buf[colon] == ":"
+
+    def _finish_string(self) -> None:
+        text = "".join(self._string_parts)
+        self._string_parts = []
+        if any("\ud800" <= c <= "\udfff" for c in text):
+            text = text.encode("utf-16", "surrogatepass").decode("utf-16", "replace")
+        if self._string_is_key:
+            self._stack[-1][1] = text
+            self._state = _COLON
+        else:
+            self._emit(text)
+
+    def _scan_token(self, final: bool) -> bool:
+        run = _TOKEN_RUN.match(self._buf, self._pos)
+        if run is None:
+            # Not a token character after all; drop it
+            self._pos += 1
+            self._state = _VALUE
+            return True
+        if run.end() >= len(self._buf) and not final:
+            return False
+        at_end = run.end() >= len(self._buf)
+        self._pos = run.end()
+        self._emit_token(run.group(), truncated=at_end)
+        return True
+
+    def _emit_token(self, token: str, truncated: bool) -> None:
+        if token in _PYTHON_LITERALS:
+            self._repair("python_literal")
+            self._emit(_PYTHON_LITERALS[token])
+            return
+        try:
+            value = json.loads(token)
+        except ValueError:
+            if truncated:
+                self._repair("truncated_token")
+                self._state = _AFTER
+                if isinstance(self._stack[-1][0], dict):
+                    self._stack[-1][1] = None
+                return
+            self._repair("invalid_token")
+            value = None
+        self._emit(value)
+
+    # --- structure ---
+
+    def _open_container(self, container) -> None:
+        if self._stack:
+            self._attach(container)
+        else:
+            self.value = container
+        self._stack.append([container, None])
+        self._after_comma = False
+        self._state = _KEY if isinstance(container, dict) else _VALUE
+
+    def _attach(self, value: Any) -> None:
+        container, key = self._stack[-1]
+        if isinstance(container, dict):
+            if key is not None:
+                container[key] = value
+            self._stack[-1][1] = None
+        else:
+            container.append(value)
+
+    def _emit(self, value: Any) -> None:
+        if not self._stack:
+            self.value = value
+            self.complete = True
+            self._state = _DONE
+            return
+        self._attach(value)
+        self._after_comma = False
+        self._state = _AFTER
+
+    def _close_container(self) -> None:
+        if self._stack:
+            self._stack.pop()
+        self._after_comma = False
+        if self._stack:
+            self._state = _AFTER
+        else:
+            self.complete = True
+            self._state = _DONE
+
+    def _finish_truncated(self) -> None:
+        if self._state == _STRING:
+            if self._string_is_key:
+                self._repair("dropped_incomplete_member")
+            else:
+                self._repair("truncated_string")
+                self._finish_string()
+        elif self._state == _TOKEN:
+            token = self._buf[self._pos:].strip()
+            if token:
+                self._emit_token(token, truncated=True)
+        if self._stack and isinstance(self._stack[-1][0], dict) and self._stack[-1][1] is not None:
+            self._repair("dropped_incomplete_member")
+            self._stack[-1][1] = None
+        if self._stack:
+            self._repair("closed_containers")
+            self._stack = []
+            self.complete = True
+            self._state = _DONE
+
+
+class ContinuationStitcher:
+    """
+    Joins a model continuation onto the text it continues.
+
+    Models asked to "continue exactly where you stopped" often open with a
+    code fence or repeat the last few words. The first `window` characters of
+    the continuation are held back until that can be decided, then the fence
+    and any overlap with the end of the previous text are dropped; everything
+    after passes straight through.
+    """
+
+    def __init__(self, previous_text: str, window: int = 200):
+        self.window = window
+        self._previous_tail = previous_text[-window:]
+        self._pending = ""
+        self._released = False
+
+    def feed(self, text: str) -> str:
+        if self._released:
+            return text
+        self._pending += text
+        if len(self._pending) < self.window:
+            return ""
+        return self.flush()
+
+    def flush(self) -> str:
+        if self._released:
+            return ""
+        self._released = True
+        head = self._pending
+        self._pending = ""
+        fence = re.match(r"\s*```(?:json)?[ \t]*\n?", head)
+        if fence:
+            head = head[fence.end():]
+        return head[self._overlap(head):]
+
+    def _overlap(self, head: str) -> int:
+        # Longest prefix of the continuation that repeats the end of the previous text
+        for size in range(min(len(head), len(self._previous_tail)), 7, -1):
+            if self._previous_tail.endswith(head[:size]):
+                return size
+        return 0
+
+
+def parse_tolerant_json(raw_text: str) -> Tuple[Any, Dict[str, int]]:
+    """One-shot helper: returns (value, repairs) for a complete model response."""
+    parser = TolerantJsonParser()
+    parser.feed(raw_text)
+    return parser.close(), parser.repairs
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Any, BinaryIO, Optional
+
+from starlette.exceptions import HTTPException
+
+logger = logging.getLogger(__name__)
+
+MAX_FILE_BYTES = int(os.getenv("MAX_FILE_BYTES", str(10 * 1024 * 1024)))
+MAX_TOTAL_BYTES = int(os.getenv("MAX_TOTAL_BYTES", str(20 * 1024 * 1024)))
+# Raw request bodies also carry multipart boundaries and the metadata field
+MAX_REQUEST_BYTES = MAX_TOTAL_BYTES + 1024 * 1024
+UPLOAD_CHUNK_BYTES = 256 * 1024
+# Slack per multipart part for its Content-Disposition / Content-Type headers
+_PART_HEADER_BYTES = 16 * 1024
+
+
+class UploadTooLarge(Exception):
+    """Raised as soon as an upload crosses the per-file or total byte limit."""
+
+
+class UploadBudget:
+    """Running per-request byte counter shared by every file in the request."""
+
+    def __init__(self, initial_bytes: int = 0, max_file_bytes: int = MAX_FILE_BYTES, max_total_bytes: int = MAX_TOTAL_BYTES):
+        self.total_bytes = initial_bytes
+        self.max_file_bytes = max_file_bytes
+        self.max_total_bytes = max_total_bytes
+
+    def consume(self, filename: str, file_bytes_so_far: int, chunk_size: int) -> None:
+        if file_bytes_so_far > self.max_file_bytes:
+            raise UploadTooLarge(f"File {filename} exceeds {self.max_file_bytes // (1024 * 1024)}MB limit.")
+        self.total_bytes += chunk_size
+        if self.total_bytes > self.max_total_bytes:
+            raise UploadTooLarge(f"Total payload size exceeds {self.max_total_bytes // (1024 * 1024)}MB limit.")
+
+
+class SpooledUpload:
+    """
+    A validated upload whose bytes stay in the framework's spooled temp file.
+
+    Starlette and Werkzeug both spool multipart files to disk past a small
+    in-memory threshold, so validation streams over that file in chunks and the
+    payload is only materialized once, when the Gemini Part is built.
+    """
+
+    def __init__(self, file: BinaryIO, filename: str, mime_type: str, size: int, sha256: str):
+        self.file = file
+        self.filename = filename
+        self.mime_type = mime_type
+        self.size = size
+        self.sha256 = sha256
+
+    def read_payload(self) -> bytes:
+        # google.genai's Blob model only accepts bytes, so one copy is unavoidable
+        self.file.seek(0)
+        return self.file.read()
+
+
+async def spool_upload(upload: Any, budget: UploadBudget) -> SpooledUpload:
+    """Validates a FastAPI UploadFile chunk by chunk, aborting at the first byte over budget."""
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        size += len(chunk)
+        budget.consume(upload.filename, size, len(chunk))
+        digest.update(chunk)
+    mime_type = upload.content_type or "application/octet-stream"
+    return SpooledUpload(upload.file, upload.filename, mime_type, size, digest.hexdigest())
+
+
+def spool_file_storage(storage: Any, budget: UploadBudget) -> SpooledUpload:
+    """Synchronous twin of spool_upload for Werkzeug FileStorage (Cloud Function path)."""
+    digest = hashlib.sha256()
+    size = 0
+    stream = storage.stream
+    while True:
+        chunk = stream.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        size += len(chunk)
+        budget.consume(storage.filename, size, len(chunk))
+        digest.update(chunk)
+    mime_type = storage.content_type or "application/octet-stream"
+    return SpooledUpload(stream, storage.filename, mime_type, size, digest.hexdigest())
+
+
+class _MultipartPartMeter:
+    """
+    Tracks the size of the multipart part currently streaming in, by scanning
+    the raw body for the boundary delimiter (which may straddle chunks).
+    """
+
+    def __init__(self, boundary: bytes):
+        # The first delimiter has no leading CRLF; feeding one up front makes every delimiter look alike
+        self.delimiter = b"\r\n--" + boundary
+        self._tail = b"\r\n"
+        self.part_bytes = 0
+        self.largest_part = 0
+
+    def feed(self, chunk: bytes) -> None:
+        data = self._tail + chunk
+        start = 0
+        while True:
+            index = data.find(self.delimiter, start)
+            if index == -1:
+                break
+            self.part_bytes += index - start
+            self.largest_part = max(self.largest_part, self.part_bytes)
+            self.part_bytes = 0
+            start = index + len(self.delimiter)
+        # Hold back a possible delimiter prefix; those bytes are counted once the next chunk shows what they are
+        end = max(start, len(data) - (len(self.delimiter) - 1))
+        self.part_bytes += end - start
+        self.largest_part = max(self.largest_part, self.part_bytes)
+        self._tail = data[end:]
+
+
+def _multipart_boundary(content_type: str) -> Optional[bytes]:
+    if not content_type.lower().startswith("multipart/"):
+        return None
+    for param in content_type.split(";")[1:]:
+        name, _, value = param.strip().partition("=")
+        if name.lower() == "boundary" and value:
+            return value.strip('"').encode("latin-1")
+    return None
+
+
+class RequestSizeLimitMiddleware:
+    """
+    ASGI middleware that rejects oversized upload requests before they are parsed.
+
+    A declared Content-Length over the limit is refused immediately; otherwise the
+    body stream is counted as it arrives and the request is aborted mid-stream by
+    raising a 413 HTTPException out of receive(), which FastAPI's body parser
+    re-raises untouched. On multipart bodies each part is measured as well, so a
+    single oversized file is refused before the rest of it is spooled.
+    """
+
+    def __init__(self, app, max_request_bytes: int = MAX_REQUEST_BYTES, max_file_bytes: int = MAX_FILE_BYTES, paths: Optional[tuple] = None):
+        self.app = app
+        self.max_request_bytes = max_request_bytes
+        self.max_file_bytes = max_file_bytes
+        self.paths = paths or ("/analyze",)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        meter = None
+        for name, value in scope.get("headers", []):
+            if name == b"content-length" and value.isdigit() and int(value) > self.max_request_bytes:
+                logger.warning(f"Rejected {scope['path']} upload: declared {int(value)} bytes")
+                await self._reject(send)
+                return
+            if name == b"content-type":
+                boundary = _multipart_boundary(value.decode("latin-1"))
+                meter = _MultipartPartMeter(boundary) if boundary else None
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                received += len(body)
+                if received > self.max_request_bytes:
+                    logger.warning(f"Aborted {scope['path']} upload after {received} bytes")
+                    raise HTTPException(status_code=413, detail=f"Total payload size exceeds {MAX_TOTAL_BYTES // (1024 * 1024)}MB limit.")
+                if meter is not None:
+                    meter.feed(body)
+                    if meter.largest_part > self.max_file_bytes + _PART_HEADER_BYTES:
+                        logger.warning(f"Aborted {scope['path']} upload: a part passed {meter.largest_part} bytes")
+                        raise HTTPException(status_code=413, detail=f"File exceeds {self.max_file_bytes // (1024 * 1024)}MB limit.")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    async def _reject(self, send):
+        body = json.dumps({"error": f"Total payload size exceeds {MAX_TOTAL_BYTES // (1024 * 1024)}MB limit."}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
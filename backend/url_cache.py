@@ -0,0 +1,154 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Same /tmp rule as the community database: Cloud Run only allows writes there
+_IS_CLOUD_RUN = os.environ.get('K_SERVICE') is not None
+_DEFAULT_CACHE_PATH = '/tmp/url_cache.db' if _IS_CLOUD_RUN else 'url_cache.db'
+
+URL_CACHE_PATH = os.getenv("URL_CACHE_PATH", _DEFAULT_CACHE_PATH)
+URL_CACHE_MAX_AGE_SECONDS = int(os.getenv("URL_CACHE_MAX_AGE_SECONDS", "900"))
+URL_CACHE_MAX_BYTES = int(os.getenv("URL_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+class UrlCache:
+    """
+    Disk-backed cache of fetched page content keyed by normalized URL.
+
+    Entries younger than max_age are served as-is. Older entries that carry an
+    ETag or Last-Modified validator are revalidated with a conditional GET, so a
+    304 costs a round trip but no body. The table is trimmed least-recently-used
+    first whenever the stored content exceeds max_bytes.
+    """
+
+    def __init__(self, db_path: str = URL_CACHE_PATH, max_age_seconds: int = URL_CACHE_MAX_AGE_SECONDS, max_bytes: int = URL_CACHE_MAX_BYTES):
+        self.db_path = db_path
+        self.max_age_seconds = max_age_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "revalidated": 0, "misses": 0, "stores": 0, "evictions": 0, "bytes_saved": 0}
+        self._total_bytes = 0
+        self._connection = None
+        try:
+            self._connection = sqlite3.connect(db_path, check_same_thread=False)
+            self._connection.row_factory = sqlite3.Row
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS url_cache (
+                    url_key TEXT PRIMARY KEY,
+                    content TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    body_bytes INTEGER NOT NULL,
+                    stored_bytes INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._connection.execute("CREATE INDEX IF NOT EXISTS idx_url_cache_last_access ON url_cache(last_access)")
+            self._connection.commit()
+            self._total_bytes = self._connection.execute("SELECT COALESCE(SUM(stored_bytes), 0) FROM url_cache").fetchone()[0]
+        except sqlite3.Error as e:
+            # Fetching still works without the cache; every URL is simply downloaded
+            logger.error(f"URL cache disabled: {e}")
+            self._connection = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._connection is not None
+
+    def lookup(self, url_key: str) -> Optional[Dict[str, Any]]:
+        """Returns the stored entry for url_key (fresh or stale), or None."""
+        if self._connection is None:
+            return None
+        with self._lock:
+            try:
+                row = self._connection.execute("SELECT * FROM url_cache WHERE url_key = ?", (url_key,)).fetchone()
+            except sqlite3.Error as e:
+                logger.error(f"URL cache read failed: {e}")
+                return None
+        return dict(row) if row else None
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry["fetched_at"] < self.max_age_seconds
+
+    def conditional_headers(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Validator headers for revalidating a stale entry."""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def record_hit(self, entry: Dict[str, Any], revalidated: bool = False) -> None:
+        """Counts a served entry and refreshes its recency (and age, after a 304)."""
+        now = time.time()
+        with self._lock:
+            self._stats["revalidated" if revalidated else "hits"] += 1
+            self._stats["bytes_saved"] += entry["body_bytes"]
+            if self._connection is None:
+                return
+            try:
+                if revalidated:
+                    self._connection.execute("UPDATE url_cache SET fetched_at = ?, last_access = ? WHERE url_key = ?", (now, now, entry["url_key"]))
+                else:
+                    self._connection.execute("UPDATE url_cache SET last_access = ? WHERE url_key = ?", (now, entry["url_key"]))
+                self._connection.commit()
+            except sqlite3.Error as e:
+                logger.error(f"URL cache write failed: {e}")
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self._stats["misses"] += 1
+
+    def store(self, url_key: str, content: str, body_bytes: int, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Stores freshly downloaded content and trims the cache to its byte budget."""
+        stored_bytes = len(content.encode("utf-8"))
+        if self._connection is None or stored_bytes > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                previous = self._connection.execute("SELECT stored_bytes FROM url_cache WHERE url_key = ?", (url_key,)).fetchone()
+                self._connection.execute("""
+                    INSERT OR REPLACE INTO url_cache
+                    (url_key, content, etag, last_modified, body_bytes, stored_bytes, fetched_at, last_access)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (url_key, content, etag, last_modified, body_bytes, stored_bytes, now, now))
+                if previous:
+                    self._total_bytes -= previous["stored_bytes"]
+                self._total_bytes += stored_bytes
+                self._stats["stores"] += 1
+                self._evict_over_budget()
+                self._connection.commit()
+            except sqlite3.Error as e:
+                logger.error(f"URL cache write failed: {e}")
+                self._connection.rollback()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["stored_bytes"] = self._total_bytes
+        stats["enabled"] = self.enabled
+        served = stats["hits"] + stats["revalidated"]
+        lookups = served + stats["misses"]
+        stats["hit_ratio"] = round(served / lookups, 4) if lookups else 0.0
+        return stats
+
+    def _evict_over_budget(self) -> None:
+        while self._total_bytes > self.max_bytes:
+            row = self._connection.execute(
+                "SELECT url_key, stored_bytes FROM url_cache ORDER BY last_access ASC LIMIT 1"
+            ).fetchone()
+            if row is None:
+                self._total_bytes = 0
+                return
+            self._connection.execute("DELETE FROM url_cache WHERE url_key = ?", (row["url_key"],))
+            self._total_bytes -= row["stored_bytes"]
+            self._stats["evictions"] += 1
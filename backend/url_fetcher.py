@@ -0,0 +1,211 @@
+import asyncio
+import codecs
+import logging
+import os
+import re
+import threading
+import urllib.parse
+import weakref
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import httpx
+
+from html_extractor import ArticleExtractor
+from url_cache import UrlCache
+
+logger = logging.getLogger(__name__)
+
+URL_FETCH_TIMEOUT_SECONDS = float(os.getenv("URL_FETCH_TIMEOUT_SECONDS", "10"))
+URL_FETCH_MAX_CONNECTIONS = int(os.getenv("URL_FETCH_MAX_CONNECTIONS", "64"))
+URL_FETCH_PER_HOST_LIMIT = int(os.getenv("URL_FETCH_PER_HOST_LIMIT", "4"))
+URL_FETCH_MAX_BYTES = int(os.getenv("URL_FETCH_MAX_BYTES", str(2 * 1024 * 1024)))
+URL_CONTENT_MAX_CHARS = 5000
+
+# HTTP/2 needs the optional h2 package (httpx[http2]); fall back to HTTP/1.1 keep-alive
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+
+def normalize_url(url: str) -> str:
+    """Normalizes a URL for comparison by removing protocol, www, and trailing slashes."""
+    if not url:
+        return ""
+    # Strip protocol
+    url = re.sub(r'^https?://', '', url.lower())
+    # Strip www.
+    url = re.sub(r'^www\.', '', url)
+    # Strip trailing slash
+    url = url.rstrip('/')
+    # Strip query params/fragments for aggressive matching if needed,
+    # but for now let's keep it simple
+    return url
+
+
+class FetchedUrl(NamedTuple):
+    url: str
+    content: str   # page text, or a placeholder the model can read when the fetch failed
+    ok: bool       # False when the fetch errored (timeout, HTTP error), i.e. content is a placeholder
+
+
+class _LoopState:
+    """Client and per-host limits owned by a single event loop."""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+class UrlFetcher:
+    """
+    Shared HTTP client pool for user-supplied URLs.
+
+    One keep-alive (HTTP/2 when available) client is kept per event loop: uvicorn
+    runs a single loop so the pool is effectively process-wide, while the Cloud
+    Function path gets a fresh client for each per-request loop.
+    """
+
+    def __init__(self, timeout: float = URL_FETCH_TIMEOUT_SECONDS, max_connections: int = URL_FETCH_MAX_CONNECTIONS, per_host_limit: int = URL_FETCH_PER_HOST_LIMIT, cache: Optional[UrlCache] = None):
+        self.timeout = timeout
+        self.cache = cache
+        self.max_connections = max_connections
+        self.per_host_limit = max(1, per_host_limit)
+        self._states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._states.get(loop)
+            if state is None:
+                client = httpx.AsyncClient(
+                    timeout=self.timeout,
+                    http2=_HTTP2_AVAILABLE,
+                    follow_redirects=True,
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                        keepalive_expiry=30.0,
+                    ),
+                )
+                state = _LoopState(client)
+                self._states[loop] = state
+            return state
+
+    def client(self) -> httpx.AsyncClient:
+        """The pooled client of the running loop, for other stages that need plain HTTP (e.g. redirect resolution)."""
+        return self._state().client
+
+    def _host_semaphore(self, state: _LoopState, url: str) -> asyncio.Semaphore:
+        host = urllib.parse.urlparse(url).netloc.lower()
+        semaphore = state.host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_host_limit)
+            state.host_semaphores[host] = semaphore
+        return semaphore
+
+    async def fetch(self, url: str) -> str:
+        """Fetches text content from a URL, via the content cache when one is configured."""
+        return (await self._fetch(url)).content
+
+    async def _fetch(self, url: str) -> FetchedUrl:
+        url_key = normalize_url(url)
+        # UrlCache does blocking SQLite I/O (commits, eviction scans): keep it off the loop
+        entry = await asyncio.to_thread(self.cache.lookup, url_key) if self.cache else None
+        if entry and self.cache.is_fresh(entry):
+            await asyncio.to_thread(self.cache.record_hit, entry)
+            return FetchedUrl(url, entry["content"], True)
+
+        state = self._state()
+        try:
+            async with self._host_semaphore(state, url):
+                headers = self.cache.conditional_headers(entry) if self.cache else {}
+                async with state.client.stream("GET", url, headers=headers) as response:
+                    if response.status_code == 304 and entry:
+                        await asyncio.to_thread(self.cache.record_hit, entry, revalidated=True)
+                        return FetchedUrl(url, entry["content"], True)
+                    response.raise_for_status()
+                    content, body_bytes = await self._read_content(response)
+        except Exception as e:
+            logger.error(f"Error fetching URL {url}: {e}")
+            return FetchedUrl(url, f"[Error fetching content from {url}]", False)
+
+        if not content:
+            return FetchedUrl(url, f"[No readable text extracted from {url}]", True)
+
+        if self.cache:
+            self.cache.record_miss()
+            if "no-store" not in response.headers.get("cache-control", "").lower():
+                await asyncio.to_thread(
+                    self.cache.store,
+                    url_key,
+                    content,
+                    body_bytes=body_bytes,
+                    etag=response.headers.get("etag"),
+                    last_modified=response.headers.get("last-modified"),
+                )
+        return FetchedUrl(url, content, True)
+
+    async def _read_content(self, response: httpx.Response) -> Tuple[str, int]:
+        """
+        Streams the body through an incremental decoder, stopping at
+        URL_FETCH_MAX_BYTES or once enough article text has been extracted.
+        Returns (content, bytes read).
+        """
+        encoding = response.charset_encoding or "utf-8"
+        try:
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+        is_html = "html" in response.headers.get("content-type", "").lower()
+        extractor = ArticleExtractor(max_chars=URL_CONTENT_MAX_CHARS) if is_html else None
+        plain_parts: List[str] = []
+        plain_length = 0
+        bytes_read = 0
+
+        async for chunk in response.aiter_bytes():
+            chunk = chunk[:URL_FETCH_MAX_BYTES - bytes_read]
+            bytes_read += len(chunk)
+            text = decoder.decode(chunk)
+            if extractor:
+                extractor.feed(text)
+                if extractor.done:
+                    break
+            else:
+                plain_parts.append(text)
+                plain_length += len(text)
+                if plain_length >= URL_CONTENT_MAX_CHARS:
+                    break
+            if bytes_read >= URL_FETCH_MAX_BYTES:
+                logger.info(f"Stopped reading {response.url} at the {URL_FETCH_MAX_BYTES} byte cap")
+                break
+
+        if extractor:
+            extractor.close()
+            return extractor.text(), bytes_read
+        return "".join(plain_parts)[:URL_CONTENT_MAX_CHARS], bytes_read
+
+    async def fetch_many(self, urls: List[str]) -> List[FetchedUrl]:
+        """
+        Fetches every distinct URL concurrently.
+
+        URLs that normalize to the same address are fetched once. Returns
+        FetchedUrl records in first-seen order; failed fetches carry ok=False.
+        """
+        unique: Dict[str, str] = {}
+        for url in urls:
+            if url and normalize_url(url) not in unique:
+                unique[normalize_url(url)] = url
+        ordered = list(unique.values())
+        return list(await asyncio.gather(*(self._fetch(url) for url in ordered)))
+
+    async def aclose(self) -> None:
+        """Closes the client owned by the running loop, if any."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state: Optional[_LoopState] = self._states.pop(loop, None)
+        if state is not None:
+            await state.client.aclose()
@@ -0,0 +1,36 @@
+from itertools import accumulate
+from typing import List, Optional, Tuple
+
+
+class Utf16Offsets:
+    """
+    Code-point to UTF-16 offset table for one text (Flutter/Dart index strings in UTF-16 units).
+
+    Built with a single linear pass, after which every lookup is O(1). Text
+    without characters outside the BMP (the common case) needs no table at all:
+    both offsets coincide.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.length = len(text.encode('utf-16-le')) // 2
+        self._prefix: Optional[List[int]] = None
+        if self.length != len(text):
+            # Code points outside the BMP take two UTF-16 units
+            self._prefix = [0] + list(accumulate(2 if ord(c) > 0xFFFF else 1 for c in text))
+
+    @classmethod
+    def for_text(cls, text: str, shared: Optional["Utf16Offsets"] = None) -> "Utf16Offsets":
+        """Reuses a table built by an earlier stage when it describes the same text."""
+        if shared is not None and (shared.text is text or shared.text == text):
+            return shared
+        return cls(text)
+
+    def offset(self, index: int) -> int:
+        """UTF-16 offset of code-point index (0..len(text))."""
+        if self._prefix is None:
+            return index
+        return self._prefix[index]
+
+    def span(self, start: int, end: int) -> Tuple[int, int]:
+        return self.offset(start), self.offset(end)
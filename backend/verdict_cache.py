@@ -0,0 +1,187 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from models import AnalysisResponse
+
+logger = logging.getLogger(__name__)
+
+# Same /tmp rule as the community database: Cloud Run only allows writes there
+_IS_CLOUD_RUN = os.environ.get('K_SERVICE') is not None
+_DEFAULT_CACHE_PATH = '/tmp/verdict_cache.db' if _IS_CLOUD_RUN else 'verdict_cache.db'
+
+VERDICT_CACHE_PATH = os.getenv("VERDICT_CACHE_PATH", _DEFAULT_CACHE_PATH)
+VERDICT_CACHE_TTL_SECONDS = int(os.getenv("VERDICT_CACHE_TTL_SECONDS", "3600"))
+VERDICT_CACHE_MAX_ENTRIES = int(os.getenv("VERDICT_CACHE_MAX_ENTRIES", "1024"))
+
+# Bump whenever the system prompt or response post-processing changes,
+# so stale verdicts produced by an older pipeline are never served.
+CACHE_KEY_VERSION = "v7"
+
+# Status verdicts describe a transient failure, not the claim itself
+_UNCACHEABLE_VERDICTS = {"RATE_LIMIT_ERROR", "RECOVERING_FROM_HALLUCINATION"}
+
+
+def normalize_claim_text(text: Optional[str]) -> str:
+    """Collapses whitespace and case so trivially different submissions share a key."""
+    if not text:
+        return ""
+    return " ".join(text.split()).lower()
+
+
+def build_cache_key(text_claim: Optional[str], normalized_urls: Iterable[str], file_digests: Iterable[Tuple[str, str]]) -> str:
+    """
+    Builds the canonical content hash for an analysis request.
+
+    Args:
+        text_claim: The raw text claim (normalized here).
+        normalized_urls: URLs already passed through url_fetcher.normalize_url.
+        file_digests: (sha256 hexdigest, mime type) pairs for every uploaded file.
+    """
+    canonical = {
+        "version": CACHE_KEY_VERSION,
+        "text": normalize_claim_text(text_claim),
+        "urls": sorted({u for u in normalized_urls if u}),
+        "files": sorted([list(d) for d in file_digests]),
+    }
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def is_cacheable(response: AnalysisResponse) -> bool:
+    """Only real verdicts are cached; rate limits and system errors must be retried."""
+    if response.verdict in _UNCACHEABLE_VERDICTS:
+        return False
+    if response.analysis.startswith("System Error:"):
+        return False
+    return True
+
+
+class VerdictCache:
+    """
+    Two-tier cache of AnalysisResponse objects keyed by build_cache_key().
+
+    Tier 1 is an in-process LRU with TTL that returns the stored model object directly.
+    Tier 2 is a SQLite table that survives restarts; hits are promoted back into tier 1.
+    """
+
+    def __init__(self, db_path: str = VERDICT_CACHE_PATH, ttl_seconds: int = VERDICT_CACHE_TTL_SECONDS, max_entries: int = VERDICT_CACHE_MAX_ENTRIES):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, Tuple[float, AnalysisResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._connection = None
+        try:
+            self._connection = sqlite3.connect(db_path, check_same_thread=False)
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS verdict_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            self._connection.commit()
+        except sqlite3.Error as e:
+            # The memory tier still works if the disk is unavailable
+            logger.error(f"Verdict cache disk tier disabled: {e}")
+            self._connection = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, key: str) -> Optional[AnalysisResponse]:
+        """Returns the cached response for key, or None on a miss or expiry."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, response = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return response
+                del self._memory[key]
+
+            response = self._disk_get(key, now)
+            if response is not None:
+                self._memory_put(key, response, now + self.ttl_seconds)
+                self._stats["disk_hits"] += 1
+                return response
+
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key: str, response: AnalysisResponse) -> None:
+        """Stores a response in both tiers if it represents a real verdict."""
+        if not self.enabled or not is_cacheable(response):
+            return
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._memory_put(key, response, expires_at)
+            self._stats["stores"] += 1
+            if self._connection is not None:
+                try:
+                    self._connection.execute(
+                        "INSERT OR REPLACE INTO verdict_cache (cache_key, payload, expires_at) VALUES (?, ?, ?)",
+                        (key, response.model_dump_json(), expires_at),
+                    )
+                    self._connection.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"Verdict cache disk write failed: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_ratio"] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
+
+    def purge_expired(self) -> int:
+        """Drops expired rows from the disk tier. Returns the number removed."""
+        if self._connection is None:
+            return 0
+        with self._lock:
+            cursor = self._connection.execute("DELETE FROM verdict_cache WHERE expires_at <= ?", (time.time(),))
+            self._connection.commit()
+            return cursor.rowcount
+
+    def _memory_put(self, key: str, response: AnalysisResponse, expires_at: float) -> None:
+        self._memory[key] = (expires_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _disk_get(self, key: str, now: float) -> Optional[AnalysisResponse]:
+        if self._connection is None:
+            return None
+        try:
+            row = self._connection.execute(
+                "SELECT payload, expires_at FROM verdict_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Verdict cache disk read failed: {e}")
+            return None
+        if row is None:
+            return None
+        payload, expires_at = row
+        if expires_at <= now:
+            return None
+        try:
+            return AnalysisResponse.model_validate_json(payload)
+        except ValueError as e:
+            logger.warning(f"Discarding unreadable cached verdict {key[:12]}: {e}")
+            return None